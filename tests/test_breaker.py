@@ -0,0 +1,127 @@
+"""
+Copyright 2018, Oath Inc.
+Licensed under the terms of the BSD license. See LICENSE file in project root for terms.
+"""
+
+from __future__ import unicode_literals
+
+import time
+
+import pytest
+
+from yahoo_panoptes_snmp.breaker import CircuitBreaker, CircuitBreakers
+from yahoo_panoptes_snmp.exceptions import (
+    EasySNMPCircuitOpenError, EasySNMPTimeoutError
+)
+from yahoo_panoptes_snmp.session import Session
+
+
+def test_circuit_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.allow()
+    breaker.record(timed_out=True)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    # A response resets the count of consecutive timeouts
+    breaker.allow()
+    breaker.record(timed_out=False)
+    for _ in range(2):
+        breaker.allow()
+        breaker.record(timed_out=True)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(EasySNMPCircuitOpenError):
+        breaker.allow()
+
+    # A single probe is let through after the cool-down
+    time.sleep(0.1)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    probe = breaker.allow()
+    assert probe
+    with pytest.raises(EasySNMPCircuitOpenError):
+        breaker.allow()
+
+    # A probe which times out opens the breaker again
+    breaker.record(timed_out=True, probe=probe)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.1)
+    breaker.abandon(breaker.allow())
+    probe = breaker.allow()
+    breaker.record(timed_out=False, probe=probe)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_circuit_breaker_stale_request():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0.1)
+    stale = breaker.allow()
+    assert not stale
+    breaker.allow()
+    breaker.record(timed_out=True)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # A request allowed before the breaker opened completes while the probe
+    # is in progress, which still excludes other probes
+    time.sleep(0.1)
+    probe = breaker.allow()
+    breaker.record(timed_out=True, probe=stale)
+    with pytest.raises(EasySNMPCircuitOpenError):
+        breaker.allow()
+
+    breaker.record(timed_out=False, probe=probe)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_circuit_breakers():
+    breakers = CircuitBreakers(failure_threshold=5)
+    breaker = breakers.get('udp:localhost:161')
+
+    assert 'udp:localhost:161' in breakers
+    assert breakers.get('udp:localhost:161') is breaker
+    assert breakers.get('udp:localhost:162') is not breaker
+    assert breaker.failure_threshold == 5
+
+
+def test_session_circuit_breaker():
+    breakers = CircuitBreakers(failure_threshold=2, cooldown=0.2)
+    sess = Session(hostname='localhost', remote_port=11162, version=2,
+                   community='public', timeout=0.1, retries=0,
+                   circuit_breakers=breakers)
+
+    for _ in range(2):
+        with pytest.raises(EasySNMPTimeoutError) as excinfo:
+            sess.get('sysContact.0')
+        assert not isinstance(excinfo.value, EasySNMPCircuitOpenError)
+
+    # Requests now fail without waiting for the timeout
+    start = time.time()
+    with pytest.raises(EasySNMPCircuitOpenError):
+        sess.walk('system')
+    assert time.time() - start < 0.05
+
+    # Sessions to the same agent share the breaker
+    other = Session(hostname='localhost', remote_port=11162, version=2,
+                    community='public', circuit_breakers=breakers)
+    assert other.circuit_breaker is sess.circuit_breaker
+    with pytest.raises(EasySNMPCircuitOpenError):
+        other.get('sysContact.0')
+
+    time.sleep(0.2)
+    with pytest.raises(EasySNMPTimeoutError) as excinfo:
+        sess.get('sysContact.0')
+    assert not isinstance(excinfo.value, EasySNMPCircuitOpenError)
+    assert sess.circuit_breaker.state == CircuitBreaker.OPEN
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_session_circuit_breaker_closed(version):
+    breakers = CircuitBreakers(failure_threshold=1)
+    sess = Session(hostname='localhost', remote_port=11161, version=version,
+                   community='public', circuit_breakers=breakers)
+
+    assert sess.get('sysContact.0').value
+    assert len(sess.walk('system')) > 1
+    assert len(sess.bulk_walk('ifDescr')) >= 1
+    assert sess.circuit_breaker.state == CircuitBreaker.CLOSED
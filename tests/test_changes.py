@@ -0,0 +1,39 @@
+"""
+Copyright 2018, Oath Inc.
+Licensed under the terms of the BSD license. See LICENSE file in project root for terms.
+"""
+
+from __future__ import unicode_literals
+
+import pytest
+
+from yahoo_panoptes_snmp.changes import ChangePoller
+from .fixtures import sess_v2, sess_v3
+from .helpers import snmp_set_via_cli
+
+
+@pytest.yield_fixture(autouse=True)
+def reset_values():
+    snmp_set_via_cli('sysLocation.0', 'my original location', 's')
+    yield
+    snmp_set_via_cli('sysLocation.0', 'my original location', 's')
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_change_poller(sess):
+    poller = ChangePoller(sess, ['ifDescr', 'sysLocation'])
+
+    changes = poller.poll()
+    assert len(changes.added) >= 2
+    assert changes.added[-1].value == 'my original location'
+
+    assert not poller.poll()
+
+    snmp_set_via_cli('sysLocation.0', 'my new location', 's')
+    changes = poller.poll()
+    assert [v.value for v in changes.changed] == ['my new location']
+
+    poller.reset()
+    changes = poller.poll()
+    assert len(changes.added) >= 2
+    assert changes.changed == []
@@ -5,7 +5,14 @@ Licensed under the terms of the BSD license. See LICENSE file in project root fo
 
 from __future__ import unicode_literals
 
-from yahoo_panoptes_snmp.helpers import normalize_oid
+import datetime
+import struct
+import time
+
+from yahoo_panoptes_snmp.helpers import (
+    Timestamp, normalize_oid, deadline_to_timestamp, oid_to_tuple,
+    parse_timeticks, unpack_integers
+)
 
 
 def test_normalize_oid_regular():
@@ -32,3 +39,42 @@ def test_normalize_oid_with_index():
     oid, oid_index = normalize_oid('abc', 'def')
     assert oid == 'abc'
     assert oid_index == 'def'
+
+
+def test_deadline_to_timestamp_relative():
+    assert deadline_to_timestamp(None) is None
+    assert abs(deadline_to_timestamp(10) - (time.time() + 10)) < 1
+
+
+def test_deadline_to_timestamp_absolute():
+    deadline = datetime.datetime.now() + datetime.timedelta(seconds=10)
+    assert abs(deadline_to_timestamp(deadline) - (time.time() + 10)) < 1
+
+    # Timestamps are taken as is rather than as seconds from now
+    assert deadline_to_timestamp(Timestamp(1000000000.5)) == 1000000000.5
+
+
+def test_oid_to_tuple():
+    assert oid_to_tuple('.1.3.6.1.2.1.2.2.1.10') == (
+        1, 3, 6, 1, 2, 1, 2, 2, 1, 10
+    )
+    assert oid_to_tuple('ifDescr.1') == ('ifDescr', 1)
+    assert oid_to_tuple('.1.3.6.1.2.1.2.2.1.1') < oid_to_tuple(
+        '.1.3.6.1.2.1.2.2.1.10'
+    )
+
+
+def test_parse_timeticks():
+    assert parse_timeticks('8855579') == 8855579
+    assert parse_timeticks('1:0:35:55.79') == 8855579
+    assert parse_timeticks('Timeticks: (8855579) 1 day, 0:35:55.79') == \
+        8855579
+    assert parse_timeticks('NOSUCHOBJECT') is None
+    assert parse_timeticks(None) is None
+
+
+def test_unpack_integers():
+    data = bytearray(struct.pack(str('=qq'), -1, 2 ** 40))
+    assert list(unpack_integers(data, 'q')) == [-1, 2 ** 40]
+    assert list(unpack_integers(data, 'Q')) == [2 ** 64 - 1, 2 ** 40]
+    assert list(unpack_integers(bytearray(), 'Q')) == []
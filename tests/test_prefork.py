@@ -0,0 +1,83 @@
+"""
+Copyright 2018, Oath Inc.
+Licensed under the terms of the BSD license. See LICENSE file in project root for terms.
+"""
+
+from __future__ import unicode_literals
+
+import os
+
+import pytest
+
+from yahoo_panoptes_snmp.prefork import prefork, shard
+from yahoo_panoptes_snmp.session import Session
+
+
+def test_shard():
+    targets = ['switch{0}'.format(i) for i in range(100)]
+    shards = shard(targets, 4)
+
+    assert len(shards) == 4
+    assert sorted(sum(shards, [])) == sorted(targets)
+    assert all(shards)
+    assert shard(targets, 4) == shards
+
+    # Targets are sharded by their key
+    pairs = [(target, 161) for target in targets]
+    assert shard(pairs, 4, key=lambda pair: pair[0]) == [
+        [(target, 161) for target in targets_shard]
+        for targets_shard in shards
+    ]
+
+    with pytest.raises(ValueError):
+        shard(targets, 0)
+
+
+def test_prefork(tmpdir):
+    def worker(targets):
+        if 'fail' in targets:
+            raise RuntimeError('failed')
+
+        sess = Session(hostname='localhost', remote_port=11161, version=2,
+                       community='public')
+        with open(str(tmpdir.join(str(os.getpid()))), 'w') as f:
+            for target in targets:
+                f.write('{0} {1}\n'.format(
+                    target, sess.get('sysContact.0').value
+                ))
+
+    targets = ['switch{0}'.format(i) for i in range(10)]
+    statuses = prefork(targets, worker, processes=3)
+    assert statuses == [0, 0, 0]
+
+    lines = []
+    for path in tmpdir.listdir():
+        lines.extend(path.read().splitlines())
+    assert sorted(line.split()[0] for line in lines) == sorted(targets)
+
+    assert 1 in prefork(['fail'], worker, processes=2)
+
+
+def test_session_reopened_after_fork():
+    sess = Session(hostname='localhost', remote_port=11161, version=2,
+                   community='public')
+    handle = sess.sess_ptr
+    contact = sess.get('sysContact.0').value
+
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            assert not sess.is_open
+            assert sess.get('sysContact.0').value == contact
+            assert sess.is_open and sess.sess_ptr is not handle
+            status = 0
+        finally:
+            os._exit(status)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+
+    # The parent keeps its own handle
+    assert sess.sess_ptr is handle
+    assert sess.get('sysContact.0').value == contact
@@ -0,0 +1,91 @@
+"""
+Copyright 2018, Oath Inc.
+Licensed under the terms of the BSD license. See LICENSE file in project root for terms.
+"""
+
+from __future__ import unicode_literals
+
+import os
+
+from yahoo_panoptes_snmp.profiles import AgentProfile, ProfileStore
+
+
+def test_agent_profile_limits():
+    profile = AgentProfile()
+    assert profile.max_repetitions('ifTable') is None
+    assert profile.max_varbinds() is None
+
+    profile.limit_repetitions('ifTable', 20)
+    profile.limit_repetitions('ifTable', 40)
+    assert profile.max_repetitions('ifTable') == 20
+    assert profile.max_repetitions(['ifTable']) == 20
+
+    # Limits are kept per request
+    assert profile.max_repetitions('ifXTable') is None
+    profile.limit_repetitions(['ifInOctets', 'ifOutOctets'], 30)
+    assert profile.max_repetitions(['ifInOctets', 'ifOutOctets']) == 30
+    assert profile.max_repetitions('ifInOctets') is None
+
+    profile.limit_varbinds(8)
+    profile.limit_varbinds(4)
+    assert profile.max_varbinds() == 4
+
+
+def test_agent_profile_limits_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('time.time', lambda: now[0])
+
+    profile = AgentProfile(limit_ttl=60)
+    profile.limit_repetitions('ifTable', 5)
+    profile.limit_varbinds(4)
+
+    now[0] += 59
+    assert profile.max_repetitions('ifTable') == 5
+    assert profile.max_varbinds() == 4
+
+    # Expired limits are learned anew, so that they may go up
+    now[0] += 1
+    assert profile.max_repetitions('ifTable') is None
+    assert profile.max_varbinds() is None
+    profile.limit_repetitions('ifTable', 10)
+    assert profile.max_repetitions('ifTable') == 10
+
+
+def test_agent_profile_rtt():
+    profile = AgentProfile()
+    profile.record_rtt(0.1)
+    assert profile.rtt == 0.1
+
+    profile.record_rtt(0.9)
+    assert abs(profile.rtt - 0.2) < 1e-9
+
+
+def test_profile_store_get():
+    store = ProfileStore()
+    assert 'udp:localhost:161' not in store
+
+    profile = store.get('udp:localhost:161')
+    assert store.get('udp:localhost:161') is profile
+    assert len(store) == 1
+
+    store.forget('udp:localhost:161')
+    assert len(store) == 0
+
+
+def test_profile_store_persistence(tmpdir):
+    path = os.path.join(str(tmpdir), 'profiles.json')
+
+    store = ProfileStore(path)
+    profile = store.get('udp:localhost:161')
+    profile.bulk_walk_broken.add('.1.3.6.1.2.1.2.2')
+    profile.limit_repetitions('.1.3.6.1.2.1.2.2', 25)
+    profile.limit_varbinds(16)
+    profile.record_rtt(0.05)
+    store.save()
+
+    profile = ProfileStore(path).get('udp:localhost:161')
+    assert profile.bulk_walk_broken == set(['.1.3.6.1.2.1.2.2'])
+    assert profile.max_repetitions('.1.3.6.1.2.1.2.2') == 25
+    assert profile.max_repetitions('.1.3.6.1.2.1.31.1.1') is None
+    assert profile.max_varbinds() == 16
+    assert profile.rtt == 0.05
@@ -0,0 +1,111 @@
+"""
+Copyright 2018, Oath Inc.
+Licensed under the terms of the BSD license. See LICENSE file in project root for terms.
+"""
+
+from __future__ import unicode_literals
+
+import threading
+import time
+
+import pytest
+
+from yahoo_panoptes_snmp.exceptions import (
+    EasySNMPDeadlineExceededError, EasySNMPTimeoutError
+)
+from yahoo_panoptes_snmp.ratelimit import RateLimiter, RateLimits
+from yahoo_panoptes_snmp.session import Session
+
+
+def test_rate_limiter_invalid():
+    with pytest.raises(ValueError):
+        RateLimiter(rate=0)
+    with pytest.raises(ValueError):
+        RateLimiter(max_in_flight=0)
+
+
+def test_rate_limiter_rate():
+    limiter = RateLimiter(rate=50, burst=1)
+
+    start = time.time()
+    for _ in range(6):
+        limiter.acquire()
+        limiter.release()
+
+    # The first PDU uses the burst and the others wait 20ms each
+    assert time.time() - start >= 0.09
+
+
+def test_rate_limiter_deadline():
+    limiter = RateLimiter(rate=1, burst=1)
+    limiter.acquire()
+    limiter.release()
+
+    with pytest.raises(EasySNMPDeadlineExceededError):
+        limiter.acquire(deadline=time.time() + 0.05)
+    assert limiter.in_flight == 0
+
+
+def test_rate_limiter_max_in_flight():
+    limiter = RateLimiter(max_in_flight=1)
+    limiter.acquire()
+
+    acquired = threading.Event()
+
+    def acquire():
+        limiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=acquire)
+    thread.start()
+    assert not acquired.wait(0.1)
+
+    limiter.release()
+    assert acquired.wait(5)
+    thread.join()
+    assert limiter.in_flight == 1
+
+
+def test_rate_limits_shared():
+    limits = RateLimits(rate=10, group_max_in_flight=2)
+
+    sess1 = Session(hostname='localhost', remote_port=11161, version=2,
+                    community='public', rate_limits=limits)
+    sess2 = Session(hostname='localhost', remote_port=11161, version=2,
+                    community='public', rate_limits=limits)
+    sess3 = Session(hostname='localhost', remote_port=11162, version=2,
+                    community='public', rate_limits=limits)
+
+    assert len(limits.limiters(sess1)) == 2
+    assert limits.limiters(sess1) == limits.limiters(sess2)
+    assert limits.limiters(sess1)[0] is not limits.limiters(sess3)[0]
+    assert limits.limiters(sess1)[1] is limits.limiters(sess3)[1]
+
+    assert RateLimits().limiters(sess1) == []
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_session_rate_limits(version):
+    limits = RateLimits(rate=50, burst=1, max_in_flight=1)
+    sess = Session(hostname='localhost', remote_port=11161, version=version,
+                   community='public', rate_limits=limits)
+    limiter, = limits.limiters(sess)
+
+    start = time.time()
+    for _ in range(6):
+        sess.get('sysContact.0')
+    assert len(sess.walk('system')) > 6
+    assert time.time() - start >= 0.09
+    assert limiter.in_flight == 0
+
+
+def test_session_rate_limits_released_on_error():
+    limits = RateLimits(max_in_flight=1)
+    sess = Session(hostname='localhost', remote_port=11162, version=2,
+                   community='public', timeout=0.1, retries=0,
+                   rate_limits=limits)
+    limiter, = limits.limiters(sess)
+
+    with pytest.raises(EasySNMPTimeoutError):
+        sess.get('sysContact.0')
+    assert limiter.in_flight == 0
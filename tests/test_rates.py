@@ -0,0 +1,193 @@
+"""
+Copyright 2018, Oath Inc.
+Licensed under the terms of the BSD license. See LICENSE file in project root for terms.
+"""
+
+from __future__ import unicode_literals
+
+import math
+
+import pytest
+
+from yahoo_panoptes_snmp.exceptions import EasySNMPDeadlineExceededError
+from yahoo_panoptes_snmp.rates import (
+    CounterSample, counter_rates, sample_rates
+)
+from yahoo_panoptes_snmp.variables import SNMPColumn
+from .fixtures import sess_v2, sess_v3
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+requires_numpy = pytest.mark.skipif(numpy is None,
+                                    reason='NumPy is not installed')
+
+
+def column(snmp_type, values, indexes=None):
+    return SNMPColumn(snmp_type, indexes or list(range(1, len(values) + 1)),
+                      values)
+
+
+def test_counter_rates():
+    rates = counter_rates(column('COUNTER64', [100, 1000]),
+                          column('COUNTER64', [600, 3000]), 10)
+
+    assert rates.indexes == [1, 2]
+    assert list(rates.rates) == [50, 200]
+    assert list(rates.discontinuities) == [False, False]
+    assert dict(rates) == {1: 50, 2: 200}
+
+
+def test_counter_rates_counter32_wrap():
+    rates = counter_rates(column('COUNTER', [2 ** 32 - 50]),
+                          column('COUNTER', [50]), 10)
+
+    assert list(rates.rates) == [10]
+    assert list(rates.discontinuities) == [False]
+
+
+def test_counter_rates_counter64_reset():
+    rates = counter_rates(column('COUNTER64', [5000, 100]),
+                          column('COUNTER64', [10, 200]), 10)
+
+    assert math.isnan(rates.rates[0])
+    assert rates.rates[1] == 10
+    assert list(rates.discontinuities) == [True, False]
+
+
+def test_counter_rates_max_rate():
+    # A Counter32 reset looks like a wrap but gives an impossible rate
+    rates = counter_rates(column('COUNTER', [5000]), column('COUNTER', [10]),
+                          10, max_rate=125000000)
+
+    assert math.isnan(rates.rates[0])
+    assert list(rates.discontinuities) == [True]
+
+
+def test_counter_rates_restarted():
+    rates = counter_rates(column('COUNTER', [100]), column('COUNTER', [200]),
+                          10, restarted=True)
+
+    assert math.isnan(rates.rates[0])
+    assert list(rates.discontinuities) == [True]
+
+
+def test_counter_rates_rows_changed():
+    rates = counter_rates(column('COUNTER', [100, 200], indexes=[1, 2]),
+                          column('COUNTER', [300, 50], indexes=[2, 3]), 10)
+
+    assert rates.indexes == [2, 3]
+    assert rates.rates[0] == 10
+    assert math.isnan(rates.rates[1])
+    assert list(rates.discontinuities) == [False, True]
+
+
+def test_counter_rates_previous_empty():
+    # e.g. the table was empty when the earlier sample was taken
+    rates = counter_rates(column('COUNTER', []),
+                          column('COUNTER', [300, 50], indexes=[2, 3]), 10)
+
+    assert rates.indexes == [2, 3]
+    assert all(math.isnan(rate) for rate in rates.rates)
+    assert list(rates.discontinuities) == [True, True]
+
+
+@requires_numpy
+def test_counter_rates_numpy():
+    rates = counter_rates(
+        column('COUNTER', numpy.array([100, 2 ** 32 - 50], dtype='Q')),
+        column('COUNTER', numpy.array([600, 50], dtype='Q')), 10
+    )
+
+    assert isinstance(rates.rates, numpy.ndarray)
+    assert list(rates.rates) == [50, 10]
+    assert list(rates.discontinuities) == [False, False]
+
+    rates = counter_rates(
+        column('COUNTER64', numpy.array([5000, 100, 200], dtype='Q'),
+               indexes=[1, 2, 3]),
+        column('COUNTER64', numpy.array([10, 300, 50], dtype='Q'),
+               indexes=[1, 2, 4]), 10
+    )
+
+    assert rates.rates[1] == 20
+    assert math.isnan(rates.rates[0]) and math.isnan(rates.rates[2])
+    assert list(rates.discontinuities) == [True, False, True]
+
+
+@requires_numpy
+def test_counter_rates_numpy_previous_empty():
+    rates = counter_rates(
+        column('COUNTER', numpy.array([], dtype='Q')),
+        column('COUNTER', numpy.array([300, 50], dtype='Q'), indexes=[2, 3]),
+        10
+    )
+
+    assert numpy.isnan(rates.rates).all()
+    assert list(rates.discontinuities) == [True, True]
+
+
+def test_counter_rates_invalid():
+    with pytest.raises(ValueError):
+        counter_rates(column('GAUGE', [1]), column('GAUGE', [2]), 10)
+    with pytest.raises(ValueError):
+        counter_rates(column('COUNTER', [1]), column('COUNTER64', [2]), 10)
+    with pytest.raises(ValueError):
+        counter_rates(column('COUNTER', [1]), column('COUNTER', [2]), 0)
+
+
+def test_sample_rates():
+    previous = CounterSample({
+        'ifHCInOctets': column('COUNTER64', [1000]),
+        'ifSpeed': column('GAUGE', [1000000])
+    }, 1000.0, '500000')
+    current = CounterSample({
+        'ifHCInOctets': column('COUNTER64', [2000]),
+        'ifSpeed': column('GAUGE', [1000000])
+    }, 1010.0, '501000')
+
+    rates = sample_rates(previous, current)
+    assert sorted(rates) == ['ifHCInOctets']
+    assert list(rates['ifHCInOctets'].rates) == [100]
+
+
+def test_sample_rates_restarted():
+    previous = CounterSample({'ifInOctets': column('COUNTER', [1000])},
+                             1000.0, 500000)
+
+    # sysUpTime went backwards
+    current = CounterSample({'ifInOctets': column('COUNTER', [2000])},
+                            1010.0, 400000)
+    rates = sample_rates(previous, current)
+    assert list(rates['ifInOctets'].discontinuities) == [True]
+
+    # The agent has been up for less time than elapsed between the samples
+    current = CounterSample({'ifInOctets': column('COUNTER', [2000])},
+                            11000.0, 600000)
+    rates = sample_rates(previous, current)
+    assert list(rates['ifInOctets'].discontinuities) == [True]
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_counter_sample_take(sess):
+    previous = CounterSample.take(sess, 'ifTable', columns=['ifInOctets'])
+    current = CounterSample.take(sess, 'ifTable', columns=['ifInOctets'])
+    current.timestamp = previous.timestamp + 1
+
+    assert current.sys_uptime >= previous.sys_uptime
+    rates = sample_rates(previous, current)
+    assert rates['ifInOctets'].indexes == previous.columns[
+        'ifInOctets'].indexes
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_counter_sample_take_deadline(sess):
+    with pytest.raises(EasySNMPDeadlineExceededError):
+        CounterSample.take(sess, 'ifTable', columns=['ifInOctets'],
+                           deadline=0)
+
+    sample = CounterSample.take(sess, 'ifTable', columns=['ifInOctets'],
+                                deadline=30)
+    assert 'ifInOctets' in sample.columns
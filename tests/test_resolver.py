@@ -0,0 +1,130 @@
+"""
+Copyright 2018, Oath Inc.
+Licensed under the terms of the BSD license. See LICENSE file in project root for terms.
+"""
+
+from __future__ import unicode_literals
+
+import socket
+
+import pytest
+
+from yahoo_panoptes_snmp.easy import snmp_get
+from yahoo_panoptes_snmp.exceptions import EasySNMPConnectionError
+from yahoo_panoptes_snmp.resolver import Resolver
+from yahoo_panoptes_snmp.session import Session
+from yahoo_panoptes_snmp.sweep import sweep
+
+
+def counting_getaddrinfo(monkeypatch):
+    lookups = []
+    getaddrinfo = socket.getaddrinfo
+
+    def counting(host, *args, **kwargs):
+        lookups.append(host)
+        return getaddrinfo(host, *args, **kwargs)
+
+    monkeypatch.setattr(socket, 'getaddrinfo', counting)
+    return lookups
+
+
+def test_resolver(monkeypatch):
+    lookups = counting_getaddrinfo(monkeypatch)
+    resolver = Resolver()
+
+    assert resolver.resolve('localhost') == '127.0.0.1'
+    assert resolver.resolve('localhost') == '127.0.0.1'
+    assert lookups == ['localhost']
+
+    resolver.clear()
+    assert resolver.resolve('localhost') == '127.0.0.1'
+    assert lookups == ['localhost', 'localhost']
+
+
+def test_resolver_ttl(monkeypatch):
+    lookups = counting_getaddrinfo(monkeypatch)
+    resolver = Resolver(ttl=0, negative_ttl=60)
+
+    resolver.resolve('localhost')
+    resolver.resolve('localhost')
+    assert lookups == ['localhost', 'localhost']
+
+    # Failures are cached for the negative TTL
+    for _ in range(2):
+        with pytest.raises(EasySNMPConnectionError):
+            resolver.resolve('invalid.host.name.')
+    assert lookups.count('invalid.host.name.') == 1
+
+
+def test_resolver_resolve_many(monkeypatch):
+    lookups = counting_getaddrinfo(monkeypatch)
+    resolver = Resolver()
+
+    addresses = resolver.resolve_many(
+        ['localhost', '127.0.0.2', 'invalid.host.name.', 'localhost']
+    )
+    assert addresses == {
+        'localhost': '127.0.0.1', '127.0.0.2': '127.0.0.2',
+        'invalid.host.name.': None
+    }
+    assert sorted(lookups) == ['127.0.0.2', 'invalid.host.name.',
+                               'localhost']
+
+    resolver.resolve_many(['localhost'])
+    resolver.resolve('127.0.0.2')
+    assert len(lookups) == 3
+
+
+def test_session_create_many_resolver(monkeypatch):
+    lookups = counting_getaddrinfo(monkeypatch)
+    resolver = Resolver()
+    resolve_many = resolver.resolve_many
+    calls = []
+
+    def recording_resolve_many(hostnames):
+        calls.append(list(hostnames))
+        return resolve_many(hostnames)
+
+    monkeypatch.setattr(resolver, 'resolve_many', recording_resolve_many)
+    sessions = Session.create_many([
+        dict(hostname='localhost', remote_port=11161, version=2,
+             community='public', resolver=resolver),
+        dict(hostname='localhost:11161', version=2, community='public',
+             resolver=resolver)
+    ])
+
+    assert calls == [['localhost', 'localhost']]
+    assert lookups == ['localhost']
+    assert [sess.address for sess in sessions] == ['127.0.0.1'] * 2
+    assert all(sess.get('sysContact.0').value for sess in sessions)
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_session_resolver(version):
+    resolver = Resolver()
+    sess = Session(hostname='localhost', remote_port=11161, version=version,
+                   community='public', resolver=resolver)
+
+    assert sess.address == '127.0.0.1'
+    assert sess.connect_address == 'udp:127.0.0.1:11161'
+    assert sess.connect_hostname == 'udp:localhost:11161'
+    assert sess.get('sysContact.0').value
+
+    # The easy functions pass the resolver on to their session
+    assert snmp_get('sysContact.0', hostname='localhost', remote_port=11161,
+                    version=version, community='public',
+                    resolver=resolver).value
+
+    with pytest.raises(EasySNMPConnectionError):
+        Session(hostname='invalid.host.name.', version=version,
+                resolver=resolver)
+
+
+def test_sweep_resolver():
+    resolver = Resolver()
+    results = sweep(['localhost:11161', 'invalid.host.name.'],
+                    timeout=0.2, resolver=resolver)
+
+    assert results[0].reachable
+    assert results[1].error.startswith('unable to resolve')
+    assert len(resolver) == 2
@@ -0,0 +1,154 @@
+"""
+Copyright 2018, Oath Inc.
+Licensed under the terms of the BSD license. See LICENSE file in project root for terms.
+"""
+
+from __future__ import unicode_literals
+
+import threading
+import time
+
+import pytest
+
+from yahoo_panoptes_snmp.exceptions import (
+    EasySNMPDeadlineExceededError, EasySNMPUnknownObjectIDError
+)
+from yahoo_panoptes_snmp.scheduler import PollJob, PollScheduler
+from yahoo_panoptes_snmp.session import Session
+
+
+def make_session():
+    return Session(hostname='localhost', remote_port=11161, version=2,
+                   community='public')
+
+
+class Recorder(object):
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, job, variables, error):
+        self.calls.append((job, variables, error))
+
+
+def test_poll_job_invalid():
+    with pytest.raises(ValueError):
+        PollJob(make_session(), 0, Recorder(), walks=['ifDescr'])
+    with pytest.raises(ValueError):
+        PollJob(make_session(), 60, Recorder())
+
+
+def test_poll_scheduler_coalesces_jobs():
+    session = make_session()
+    scheduler = PollScheduler(jitter=0, coalesce_window=5)
+    counters = Recorder()
+    inventory = Recorder()
+
+    counters_job = scheduler.add_job(
+        session, 60, counters, scalars=['sysUpTime.0'], walks=['ifInOctets']
+    )
+    inventory_job = scheduler.add_job(
+        session, 3600, inventory, scalars=['sysUpTime.0'], walks=['ifDescr']
+    )
+    assert len(scheduler) == 2
+
+    now = time.time()
+    assert scheduler.run_pending(now) == 1
+
+    (job, variables, error), = counters.calls
+    assert job is counters_job
+    assert error is None
+    assert variables[0].oid == 'sysUpTimeInstance'
+    assert [v.oid for v in variables[1:]] == ['ifInOctets'] * (
+        len(variables) - 1
+    )
+
+    (job, variables, error), = inventory.calls
+    assert job is inventory_job
+    assert variables[0].oid == 'sysUpTimeInstance'
+    assert variables[1].value == 'lo'
+
+    # Neither job is due again yet
+    assert scheduler.run_pending(now + 30) == 0
+    assert counters_job.next_run == pytest.approx(now + 60, abs=1)
+    assert inventory_job.next_run == pytest.approx(now + 3600, abs=1)
+
+    # Only the counters job is due a minute later
+    assert scheduler.run_pending(now + 60) == 1
+    assert len(counters.calls) == 2
+    assert len(inventory.calls) == 1
+
+    scheduler.remove_job(counters_job)
+    assert scheduler.run_pending(now + 120) == 0
+
+
+def test_poll_scheduler_coalesces_sessions_of_target():
+    scheduler = PollScheduler(jitter=0)
+    counters = Recorder()
+    inventory = Recorder()
+    numeric = Recorder()
+
+    # Separate sessions to the same target are polled together, unless
+    # their options change how the variables are rendered
+    scheduler.add_job(make_session(), 60, counters, walks=['ifInOctets'])
+    scheduler.add_job(make_session(), 60, inventory, walks=['ifDescr'])
+    numeric_session = make_session()
+    numeric_session.use_numeric = True
+    scheduler.add_job(numeric_session, 60, numeric,
+                      walks=['.1.3.6.1.2.1.2.2.1.2'])
+
+    assert scheduler.run_pending() == 2
+
+    (_, variables, error), = inventory.calls
+    assert error is None
+    assert variables[0].oid == 'ifDescr'
+    assert len(counters.calls) == 1
+
+    (_, variables, error), = numeric.calls
+    assert variables[0].oid == '.1.3.6.1.2.1.2.2.1.2'
+
+
+def test_poll_scheduler_deadline():
+    job = PollJob(make_session(), 60, Recorder(), walks=['ifDescr'])
+    assert job.deadline == 60
+
+    scheduler = PollScheduler(jitter=0)
+    recorder = Recorder()
+    scheduler.add_job(make_session(), 60, recorder, walks=['ifDescr'],
+                      deadline=0)
+
+    scheduler.run_pending()
+
+    (_, variables, error), = recorder.calls
+    assert variables == []
+    assert isinstance(error, EasySNMPDeadlineExceededError)
+
+
+def test_poll_scheduler_error():
+    scheduler = PollScheduler(jitter=0)
+    recorder = Recorder()
+    scheduler.add_job(make_session(), 60, recorder, walks=['gimmeTable'])
+
+    scheduler.run_pending()
+
+    (_, variables, error), = recorder.calls
+    assert variables == []
+    assert isinstance(error, EasySNMPUnknownObjectIDError)
+
+
+def test_poll_scheduler_run():
+    scheduler = PollScheduler(workers=2, jitter=0)
+    stop = threading.Event()
+    polled = threading.Event()
+
+    def callback(job, variables, error):
+        polled.set()
+
+    scheduler.add_job(make_session(), 60, callback, scalars=['sysUpTime.0'])
+
+    thread = threading.Thread(target=scheduler.run, args=(stop,))
+    thread.start()
+    try:
+        assert polled.wait(5)
+    finally:
+        stop.set()
+        thread.join()
@@ -5,17 +5,29 @@ Licensed under the terms of the BSD license. See LICENSE file in project root fo
 
 from __future__ import unicode_literals
 
+import os
 import platform
 import re
+import subprocess
+import sys
+import threading
+import time
 
 import pytest
 from yahoo_panoptes_snmp.exceptions import (
     EasySNMPError, EasySNMPConnectionError, EasySNMPTimeoutError,
     EasySNMPNoSuchObjectError, EasySNMPNoSuchInstanceError,
-    EasySNMPNoSuchNameError
+    EasySNMPNoSuchNameError, EasySNMPDeadlineExceededError,
+    EasySNMPCancelledError, EasySNMPNonIncreasingOIDError,
+    EasySNMPUnknownObjectIDError
 )
 
-from yahoo_panoptes_snmp.session import Session
+from yahoo_panoptes_snmp import interface
+from yahoo_panoptes_snmp.profiles import ProfileStore
+from yahoo_panoptes_snmp.session import (
+    Session, build_varlist, decode_index, init, oid_follows, scalar_object
+)
+from yahoo_panoptes_snmp.variables import SNMPVariable
 from .fixtures import sess_v2, sess_v3
 from .helpers import snmp_set_via_cli
 
@@ -61,6 +73,101 @@ def test_session_invalid_port(version):
         session.get('sysContact.0')
 
 
+def test_session_create_many():
+    sessions = Session.create_many([
+        dict(hostname='localhost', remote_port=11161, version=2,
+             community='public'),
+        dict(hostname='invalid.host.name.', version=2, community='public'),
+        dict(hostname='localhost', remote_port=11161, version=3),
+        dict(hostname='localhost', version=4),
+        dict(hostname='localhost:11161', version=2, community='public'),
+        dict(hostname='localhost', remote_port=11161, version=2,
+             community='public', timeout=2)
+    ])
+
+    assert len(sessions) == 6
+    assert isinstance(sessions[1], EasySNMPConnectionError)
+    assert isinstance(sessions[3], ValueError)
+    for session in (sessions[0], sessions[2], sessions[4], sessions[5]):
+        assert isinstance(session, Session)
+        assert session.get('sysContact.0').value
+    assert sessions[5].timeout == 2
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_session_lazy(version):
+    sess = Session(hostname='localhost', remote_port=11161, version=version,
+                   community='public', lazy=True)
+    assert not sess.is_open
+
+    assert sess.get('sysContact.0').value
+    assert sess.is_open
+
+    # Closing releases the handle and using the session reopens it
+    sess.close()
+    assert not sess.is_open
+    assert sess.get('sysContact.0').value
+
+    sess.close()
+    with sess as opened:
+        assert opened is sess
+        assert sess.is_open
+        assert sess.get('sysContact.0').value
+    assert not sess.is_open
+
+
+def test_session_lazy_invalid_hostname():
+    sess = Session(hostname='invalid.host.name.', version=2, lazy=True)
+    with pytest.raises(EasySNMPConnectionError):
+        sess.get('sysContact.0')
+    with pytest.raises(EasySNMPConnectionError):
+        sess.open()
+
+
+def test_session_create_many_lazy():
+    sessions = Session.create_many([
+        dict(hostname='localhost', remote_port=11161, version=2,
+             community='public', lazy=True),
+        dict(hostname='localhost', remote_port=11161, version=2,
+             community='public')
+    ])
+
+    assert not sessions[0].is_open
+    assert sessions[1].is_open
+    assert sessions[0].get('sysContact.0').value
+
+
+FAST_INIT_SCRIPT = """
+from yahoo_panoptes_snmp import Session, init
+from yahoo_panoptes_snmp.exceptions import EasySNMPUnknownObjectIDError
+
+sess = Session(hostname='localhost', remote_port=11161, version=2,
+               community='public')
+assert sess.get('.1.3.6.1.2.1.1.4.0').value
+try:
+    sess.get('sysContact.0')
+except EasySNMPUnknownObjectIDError:
+    pass
+else:
+    raise AssertionError('MIBs were loaded')
+assert not init(fast=False)
+"""
+
+
+def test_init_fast():
+    # The library is initialised once per process
+    subprocess.check_call(
+        [sys.executable, '-c', FAST_INIT_SCRIPT],
+        env=dict(os.environ, PANOPTES_SNMP_FAST_INIT='1')
+    )
+
+
+def test_init_already_initialised():
+    Session(hostname='localhost', remote_port=11161, version=2,
+            community='public')
+    assert not init()
+
+
 # TODO: Determine how to test this more than once without a problem
 # @pytest.mark.parametrize('sess', [sess_v1(), sess_v2(), sess_v3()])
 @pytest.mark.parametrize('sess', [sess_v2()])
@@ -160,6 +267,38 @@ def test_session_get_use_numeric(sess):
     assert res.snmp_type == 'OCTETSTR'
 
 
+def test_session_oid_formats_concurrently():
+    expected = {
+        (False, False): 'sysContact',
+        (True, False): '.iso.org.dod.internet.mgmt.mib-2.system.sysContact',
+        (False, True): '.1.3.6.1.2.1.1.4',
+    }
+    oids = dict((formats, set()) for formats in expected)
+
+    def poll(formats):
+        sess = Session(hostname='localhost', remote_port=11161, version=2,
+                       community='public', use_long_names=formats[0],
+                       use_numeric=formats[1])
+        for _ in range(50):
+            oids[formats].add(sess.get('sysContact.0').oid)
+            oids[formats].update(
+                v.oid for v in sess.walk('sysContact') + sess.bulk_walk(
+                    'sysContact'
+                )
+            )
+
+    threads = [threading.Thread(target=poll, args=(formats,))
+               for formats in expected]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Sessions' formats don't leak into each other's results
+    for formats, oid in expected.items():
+        assert oids[formats] == set([oid])
+
+
 @pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
 def test_session_get_use_sprint_value(sess):
     sess.use_sprint_value = True
@@ -171,6 +310,24 @@ def test_session_get_use_sprint_value(sess):
     assert res.snmp_type == 'TICKS'
 
 
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_use_sprint_value_use_numeric(sess):
+    sess.use_sprint_value = True
+    sess.use_numeric = True
+
+    # OID values are rendered in the session's format too
+    values = [
+        sess.get('.1.3.6.1.2.1.1.2.0').value,
+        sess.get_next('.1.3.6.1.2.1.1.2').value,
+        sess.walk('.1.3.6.1.2.1.1.2')[0].value,
+        sess.bulk_walk('.1.3.6.1.2.1.1.2')[0].value
+    ]
+    assert values == ['.1.3.6.1.4.1.8072.3.2.10'] * 4
+
+    sess.use_numeric = False
+    assert sess.get('sysObjectID.0').value == 'linux'
+
+
 @pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
 def test_session_get_use_enums(sess):
     sess.use_enums = True
@@ -311,6 +468,88 @@ def test_session_get_invalid_object_with_abort_enabled(sess):
             sess.get('iso')
 
 
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_get_oids(sess):
+    oids = [
+        'sysUpTime.0', (1, 3, 6, 1, 2, 1, 1, 4, 0), '.1.3.6.1.2.1.1.5.0',
+        'SNMPv2-MIB::sysLocation.0', 'sysDescr.99'
+    ]
+    res = sess.get_oids(oids)
+    expected = sess.get([
+        'sysUpTime.0', 'sysContact.0', 'sysName.0', 'sysLocation.0',
+        'sysDescr.99'
+    ])
+
+    assert len(res) == 5
+    for variable, expected_variable in zip(res, expected):
+        assert variable.oid == expected_variable.oid
+        assert variable.oid_index == expected_variable.oid_index
+        assert variable.snmp_type == expected_variable.snmp_type
+    assert res[1].value == 'G. S. Marzot <gmarzot@marzot.net>'
+    assert res[2].value == platform.node()
+    assert res[3].value == 'my original location'
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_get_oids_invalid(sess):
+    with pytest.raises(EasySNMPUnknownObjectIDError):
+        sess.get_oids(['sysNope.0'])
+    with pytest.raises(ValueError):
+        sess.get_oids([()])
+    with pytest.raises(TypeError):
+        sess.get_oids([1])
+    with pytest.raises(TypeError):
+        sess.get_oids('sysContact.0')
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_get_next_oids(sess):
+    res = sess.get_next_oids(['sysContact', (1, 3, 6, 1, 2, 1, 1, 5)])
+
+    assert len(res) == 2
+
+    assert res[0].oid == 'sysContact'
+    assert res[0].oid_index == '0'
+    assert res[0].value == 'G. S. Marzot <gmarzot@marzot.net>'
+
+    assert res[1].oid == 'sysName'
+    assert res[1].oid_index == '0'
+    assert res[1].value == platform.node()
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_get_bulk_oids(sess):
+    oids = ['sysUpTime', 'sysORLastChange', 'sysORID', 'sysORDescr',
+            'sysORUpTime']
+    res = sess.get_bulk_oids(oids, 2, 8)
+    expected = sess.get_bulk(oids, 2, 8)
+
+    assert len(res) == 26
+    assert [(v.oid, v.oid_index) for v in res] == \
+        [(v.oid, v.oid_index) for v in expected]
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_none_refcount(sess):
+    # Every request returning None must give back the reference it takes,
+    # or the interpreter eventually deallocates None and aborts
+    def requests():
+        sess.get('sysDescr.0')
+        sess.get_next('sysDescr.0')
+        sess.get_bulk(['ifDescr'], 0, 5)
+        sess.get_bulk_oids(['.1.3.6.1.2.1.2.2.1.2'], 0, 5)
+        sess.walk('system')
+        sess.bulk_walk('system')
+
+    for _ in range(20):
+        requests()
+
+    refcount = sys.getrefcount(None)
+    for _ in range(200):
+        requests()
+    assert abs(sys.getrefcount(None) - refcount) < 100
+
+
 @pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
 def test_session_walk(sess):
     res = sess.walk('system')
@@ -368,3 +607,635 @@ def test_session_walk_all(sess):
         assert res[5].oid_index == '0'
         assert res[5].value == 'my original location'
         assert res[5].snmp_type == 'OCTETSTR'
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_walk_resume_from(sess):
+    res = sess.walk('system', resume_from='sysContact.0')
+
+    assert len(res) >= 3
+
+    assert res[0].oid == 'sysName'
+    assert res[0].oid_index == '0'
+    assert res[0].value == platform.node()
+    assert res[0].snmp_type == 'OCTETSTR'
+
+    assert res[1].oid == 'sysLocation'
+    assert res[1].oid_index == '0'
+    assert res[1].value == 'my original location'
+    assert res[1].snmp_type == 'OCTETSTR'
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_walk_resume_from_multiple_oids(sess):
+    with pytest.raises(ValueError):
+        sess.walk(['system', 'ifTable'], resume_from='sysContact.0')
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_session_walk_partial_results(version):
+    session = Session(
+        remote_port=1234, version=version, timeout=0.2, retries=1
+    )
+
+    with pytest.raises(EasySNMPTimeoutError) as excinfo:
+        session.walk('system')
+
+    assert excinfo.value.partial_results == []
+    assert excinfo.value.resume_from is None
+
+    res = session.walk('system', return_partial=True)
+    assert res == []
+    assert session.error_string
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_bulk_walk_resume_from(sess):
+    sess.use_numeric = True
+    res = sess.bulk_walk('.1.3.6.1.2.1.1', resume_from='.1.3.6.1.2.1.1.4.0')
+
+    assert len(res) >= 2
+
+    assert res[0].oid == '.1.3.6.1.2.1.1.5'
+    assert res[0].oid_index == '0'
+    assert res[0].value == platform.node()
+    assert res[0].snmp_type == 'OCTETSTR'
+
+    assert res[1].oid == '.1.3.6.1.2.1.1.6'
+    assert res[1].oid_index == '0'
+    assert res[1].value == 'my original location'
+    assert res[1].snmp_type == 'OCTETSTR'
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_session_bulk_walk_partial_results(version):
+    session = Session(
+        remote_port=1234, version=version, timeout=0.2, retries=1,
+        use_numeric=True
+    )
+
+    with pytest.raises(EasySNMPTimeoutError) as excinfo:
+        session.bulk_walk('.1.3.6.1.2.1.1',
+                          resume_from='.1.3.6.1.2.1.1.4.0')
+
+    assert excinfo.value.partial_results == []
+    assert excinfo.value.resume_from == '.1.3.6.1.2.1.1.4.0'
+
+    res = session.bulk_walk('.1.3.6.1.2.1.1', return_partial=True)
+    assert res == []
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_walk_deadline_exceeded(sess):
+    with pytest.raises(EasySNMPDeadlineExceededError) as excinfo:
+        sess.walk('system', deadline=0)
+
+    assert excinfo.value.partial_results == []
+    assert sess._deadline is None
+    assert not sess._pdu_checks
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_walk_cancelled(sess):
+    cancel = threading.Event()
+    cancel.set()
+
+    with pytest.raises(EasySNMPCancelledError):
+        sess.walk('system', cancel=cancel)
+
+    res = sess.walk('system', return_partial=True, cancel=cancel)
+    assert res == []
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_walk_nested(sess):
+    # Walking the session from within a walk of it can't use the working
+    # memory the outer walk holds
+    nested = []
+
+    class WalkingEvent(object):
+        walking = False
+
+        def is_set(self):
+            if not self.walking:
+                self.walking = True
+                nested.append(sess.bulk_walk('sysORDescr'))
+            return False
+
+    expected = sess.walk(['system', 'ifDescr'])
+    res = sess.walk(['system', 'ifDescr'], cancel=WalkingEvent())
+
+    assert [(v.oid, v.oid_index) for v in res] == \
+        [(v.oid, v.oid_index) for v in expected]
+    assert [v.oid for v in nested[0]] == ['sysORDescr'] * len(nested[0])
+    assert len(nested[0]) >= 1
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_walk_deadline_not_reached(sess):
+    res = sess.walk('system', deadline=30, cancel=threading.Event())
+    assert len(res) >= 7
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_session_walk_deadline_bounds_retries(version):
+    session = Session(
+        remote_port=1234, version=version, timeout=1, retries=3
+    )
+
+    start = time.time()
+    with pytest.raises(EasySNMPTimeoutError):
+        session.walk('system', deadline=0.3)
+    assert time.time() - start < 1
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_session_bulk_walk_deadline_exceeded(version):
+    session = Session(
+        hostname='localhost', remote_port=11161, version=version,
+        community='public', use_numeric=True
+    )
+
+    with pytest.raises(EasySNMPDeadlineExceededError):
+        session.bulk_walk('.1.3.6.1.2.1.1', deadline=0)
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_bulk_walk_excludes_siblings(sess):
+    sess.use_numeric = True
+    res = sess.bulk_walk('.1.3.6.1.2.1.2.2.1.1')
+
+    assert len(res) >= 1
+    for variable in res:
+        assert variable.oid == '.1.3.6.1.2.1.2.2.1.1'
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_session_bulk_walk_non_increasing(version, monkeypatch):
+    sess = Session(
+        hostname='localhost', remote_port=11161, version=version,
+        community='public', use_numeric=True
+    )
+    looping = [
+        SNMPVariable('.1.3.6.1.2.1.1.2', '0', '.1.3.6.1.4.1.8072', 'OBJECTID'),
+        SNMPVariable('.1.3.6.1.2.1.1.1', '0', 'Linux', 'OCTETSTR')
+    ]
+    monkeypatch.setattr(sess, 'get_bulk', lambda *args, **kwargs: looping)
+
+    res = sess.bulk_walk('.1.3.6.1.2.1.1')
+    assert len(res) == 1
+    assert res[0].oid == '.1.3.6.1.2.1.1.2'
+
+    sess.abort_on_nonincreasing = True
+    with pytest.raises(EasySNMPNonIncreasingOIDError) as excinfo:
+        sess.bulk_walk('.1.3.6.1.2.1.1')
+
+    assert len(excinfo.value.partial_results) == 1
+    assert excinfo.value.resume_from == '.1.3.6.1.2.1.1.2.0'
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_session_walk_non_increasing_keeps_response(version):
+    sess = Session(
+        hostname='localhost', remote_port=11161, version=version,
+        community='public', use_numeric=True, abort_on_nonincreasing=True
+    )
+
+    # The agent truncates the sub-identifier past 2 ** 32 and so returns an
+    # earlier OID for the second column, in the same response as sysDescr.0
+    varlist, _ = build_varlist(['.1.3.6.1.2.1.1.1', '.1.3.6.1.2.1.1.9.1.4'])
+    start_varlist, _ = build_varlist([
+        '.1.3.6.1.2.1.1.1', '.1.3.6.1.2.1.1.9.1.4.4294967297'
+    ])
+    with pytest.raises(EasySNMPNonIncreasingOIDError):
+        interface.walk(sess, varlist, start_varlist)
+
+    assert [(v.oid, v.oid_index) for v in varlist] == [
+        ('.1.3.6.1.2.1.1.1', '0')
+    ]
+
+
+def test_oid_follows():
+    assert oid_follows((1, 3, 6, 1, 10), (1, 3, 6, 1, 9), set())
+    assert not oid_follows((1, 3, 6, 1, 9), (1, 3, 6, 1, 9), set())
+    assert not oid_follows((1, 3, 6, 1), (1, 3, 6, 1, 9), set())
+
+    seen = set()
+    assert oid_follows(('ifDescr', 1), ('ifDescr',), seen)
+    assert oid_follows(('ifDescr', 2), ('ifDescr', 1), seen)
+    assert not oid_follows(('ifDescr', 1), ('ifDescr', 2), seen)
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_session_bulk_walk_fallback_empty(version, monkeypatch):
+    sess = Session(
+        hostname='localhost', remote_port=11161, version=version,
+        community='public', use_numeric=True, bulk_walk_fallback=True
+    )
+    expected = sess.walk('.1.3.6.1.2.1.1')
+
+    calls = []
+
+    def get_bulk(*args, **kwargs):
+        calls.append(kwargs)
+        return []
+
+    monkeypatch.setattr(sess, 'get_bulk', get_bulk)
+
+    res = sess.bulk_walk('.1.3.6.1.2.1.1')
+    assert [(r.oid, r.oid_index) for r in res] == [
+        (r.oid, r.oid_index) for r in expected
+    ]
+    assert sess.bulk_walk_broken == set(['.1.3.6.1.2.1.1'])
+    assert len(calls) == 1
+
+    # The broken subtree is walked using GETNEXT straight away from now on
+    res = sess.bulk_walk('.1.3.6.1.2.1.1')
+    assert len(res) == len(expected)
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_session_bulk_walk_fallback_too_big(version, monkeypatch):
+    sess = Session(
+        hostname='localhost', remote_port=11161, version=version,
+        community='public', use_numeric=True, bulk_walk_fallback=True
+    )
+    expected = sess.walk('.1.3.6.1.2.1.1')
+
+    repetitions = []
+
+    def get_bulk(oids, non_repeaters, max_repetitions):
+        repetitions.append(max_repetitions)
+        sess.error_number = 1
+        raise EasySNMPError('(tooBig) Response message would have been too '
+                            'large.')
+
+    monkeypatch.setattr(sess, 'get_bulk', get_bulk)
+
+    res = sess.bulk_walk('.1.3.6.1.2.1.1', max_repetitions=10)
+    assert repetitions == [10, 5, 2, 1]
+    assert len(res) == len(expected)
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_session_profile_repetition_limits(version, monkeypatch):
+    store = ProfileStore()
+    sess = Session(
+        hostname='localhost', remote_port=11161, version=version,
+        community='public', use_numeric=True, profile_store=store
+    )
+    get_bulk = sess.get_bulk
+    repetitions = []
+
+    def get_bulk_too_big(oids, non_repeaters, max_repetitions):
+        repetitions.append((oids, max_repetitions))
+        if oids == '.1.3.6.1.2.1.2.2' and max_repetitions > 4:
+            sess.error_number = 1
+            raise EasySNMPError('(tooBig) Response message would have been '
+                                'too large.')
+        return get_bulk(oids, non_repeaters, max_repetitions)
+
+    monkeypatch.setattr(sess, 'get_bulk', get_bulk_too_big)
+
+    sess.bulk_walk('.1.3.6.1.2.1.2.2')
+    assert repetitions[:3] == [('.1.3.6.1.2.1.2.2', 10),
+                               ('.1.3.6.1.2.1.2.2', 5),
+                               ('.1.3.6.1.2.1.2.2', 2)]
+    assert sess.profile.max_repetitions('.1.3.6.1.2.1.2.2') == 2
+
+    # A tooBig for one subtree doesn't limit the walks of others
+    del repetitions[:]
+    sess.bulk_walk('.1.3.6.1.2.1.1')
+    assert repetitions[0] == ('.1.3.6.1.2.1.1', 10)
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_session_bulk_walk_fallback_non_increasing(version, monkeypatch):
+    sess = Session(
+        hostname='localhost', remote_port=11161, version=version,
+        community='public', use_numeric=True, bulk_walk_fallback=True,
+        abort_on_nonincreasing=True
+    )
+    expected = sess.walk('.1.3.6.1.2.1.1')
+
+    looping = [
+        SNMPVariable('.1.3.6.1.2.1.1.1', '0', 'Linux', 'OCTETSTR'),
+        SNMPVariable('.1.3.6.1.2.1.1.1', '0', 'Linux', 'OCTETSTR')
+    ]
+    monkeypatch.setattr(sess, 'get_bulk', lambda *args, **kwargs: looping)
+
+    res = sess.bulk_walk('.1.3.6.1.2.1.1')
+    assert [(r.oid, r.oid_index) for r in res] == [
+        (r.oid, r.oid_index) for r in expected
+    ]
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_session_profile_store(version):
+    store = ProfileStore()
+    sess = Session(
+        hostname='localhost', remote_port=11161, version=version,
+        community='public', profile_store=store
+    )
+
+    profile = store.get('udp:localhost:11161')
+    assert sess.profile is profile
+    assert sess.bulk_walk_broken is profile.bulk_walk_broken
+
+    profile.limit_varbinds(1)
+    res = sess.get(['sysContact.0', 'sysLocation.0', 'sysName.0'])
+
+    assert [r.oid for r in res] == ['sysContact', 'sysLocation', 'sysName']
+    assert res[1].value == 'my original location'
+    assert profile.rtt is not None
+
+    with pytest.raises(EasySNMPDeadlineExceededError):
+        sess.get(['sysContact.0', 'sysLocation.0'], deadline=0)
+    assert sess._deadline is None
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_bulk_walk_with_scalars(sess):
+    sess.use_numeric = False
+    expected = [
+        (v.oid, v.oid_index, v.value)
+        for v in sess.bulk_walk(['ifDescr', 'ifType'])
+    ]
+
+    for max_repetitions in [1, 10]:
+        scalars, res = sess.bulk_walk_with_scalars(
+            ['sysUpTime.0', ('sysContact', 0)], ['ifDescr', 'ifType'],
+            max_repetitions=max_repetitions
+        )
+
+        assert len(scalars) == 2
+        assert scalars[0].oid == 'sysUpTimeInstance'
+        assert int(scalars[0].value) > 0
+        assert scalars[1].oid == 'sysContact'
+        assert scalars[1].oid_index == '0'
+        assert scalars[1].value == 'G. S. Marzot <gmarzot@marzot.net>'
+
+        assert [(v.oid, v.oid_index, v.value) for v in res] == expected
+
+
+def test_scalar_object():
+    assert scalar_object('sysUpTime.0') == 'sysUpTime'
+    assert scalar_object(('sysUpTime', 0)) == 'sysUpTime'
+    assert scalar_object('.1.3.6.1.2.1.1.3.0') == '.1.3.6.1.2.1.1.3'
+    assert scalar_object('ifNumber') == 'ifNumber'
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_bulk_walk_changes(sess):
+    sess.use_numeric = False
+    changes = sess.bulk_walk_changes(['sysContact', 'sysLocation'])
+
+    assert [(v.oid, v.value) for v in changes.added] == [
+        ('sysContact', 'G. S. Marzot <gmarzot@marzot.net>'),
+        ('sysLocation', 'my original location')
+    ]
+    assert changes.changed == []
+    assert changes.removed == []
+    assert sorted(changes.state) == [
+        '.1.3.6.1.2.1.1.4.0', '.1.3.6.1.2.1.1.6.0'
+    ]
+
+    # Nothing changed
+    state = changes.state
+    changes = sess.bulk_walk_changes(['sysContact', 'sysLocation'],
+                                     state=state)
+    assert not changes
+    assert changes.state == state
+
+    snmp_set_via_cli('sysLocation.0', 'my new location', 's')
+    changes = sess.bulk_walk_changes(['sysContact', 'sysLocation'],
+                                     state=state)
+    assert changes.added == []
+    assert [(v.oid, v.value) for v in changes.changed] == [
+        ('sysLocation', 'my new location')
+    ]
+    assert changes.removed == []
+
+    changes = sess.bulk_walk_changes('sysLocation', state=state)
+    assert changes.removed == ['.1.3.6.1.2.1.1.4.0']
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_session_bulk_walk_if_changed(version, monkeypatch):
+    sess = Session(hostname='localhost', remote_port=11161, version=version,
+                   community='public')
+    bulk_walk = sess.bulk_walk
+    walks = []
+
+    def counting_bulk_walk(*args, **kwargs):
+        walks.append(args)
+        return bulk_walk(*args, **kwargs)
+
+    monkeypatch.setattr(sess, 'bulk_walk', counting_bulk_walk)
+
+    res = sess.bulk_walk_if_changed('sysLocation', 'sysLocation.0')
+    assert [v.value for v in res] == ['my original location']
+    assert len(walks) == 1
+
+    # Copies of the cached variables are returned while the indicator is
+    # unchanged, so that changing a result leaves the cache alone
+    res[0].value = 'changed'
+    cached = sess.bulk_walk_if_changed('sysLocation', 'sysLocation.0')
+    assert [v.value for v in cached] == ['my original location']
+    assert cached[0] is not res[0]
+    assert len(walks) == 1
+
+    sess.bulk_walk_if_changed('sysLocation', 'sysLocation.0', refresh=True)
+    assert len(walks) == 2
+
+    snmp_set_via_cli('sysLocation.0', 'my new location', 's')
+    res = sess.bulk_walk_if_changed('sysLocation', 'sysLocation.0')
+    assert [v.value for v in res] == ['my new location']
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_session_bulk_walk_if_changed_sprint_value(version, monkeypatch):
+    sess = Session(hostname='localhost', remote_port=11161, version=version,
+                   community='public', use_sprint_value=True)
+
+    # sysUpTime.0 is decoded whichever way it is rendered
+    res = sess.bulk_walk_if_changed('sysLocation', 'sysLocation.0')
+    monkeypatch.setattr(sess, 'bulk_walk', None)
+    cached = sess.bulk_walk_if_changed('sysLocation', 'sysLocation.0')
+    assert [v.value for v in cached] == [v.value for v in res]
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_session_bulk_walk_if_changed_missing_uptime(version, monkeypatch):
+    sess = Session(hostname='localhost', remote_port=11161, version=version,
+                   community='public')
+    get = sess.get
+
+    def get_without_uptime(oids):
+        return [get(oids[0]), SNMPVariable('sysUpTime', '0', 'NOSUCHOBJECT',
+                                           'NOSUCHOBJECT')]
+
+    monkeypatch.setattr(sess, 'get', get_without_uptime)
+
+    # The OIDs are walked every time
+    res = sess.bulk_walk_if_changed('sysLocation', 'sysLocation.0')
+    again = sess.bulk_walk_if_changed('sysLocation', 'sysLocation.0')
+    assert [v.value for v in again] == [v.value for v in res]
+    assert sess._walk_cache == {}
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_session_bulk_walk_if_changed_missing_indicator(version):
+    sess = Session(hostname='localhost', remote_port=11161, version=version,
+                   community='public')
+
+    res = sess.bulk_walk_if_changed('sysLocation', 'sysLocation.1')
+    again = sess.bulk_walk_if_changed('sysLocation', 'sysLocation.1')
+    assert again[0] is not res[0]
+    assert again[0].value == res[0].value
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_get_table(sess):
+    sess.use_numeric = False
+    res = sess.get_table('ifTable')
+
+    assert len(res) >= 1
+    assert res['1']['ifIndex'] == '1'
+    assert res['1']['ifDescr'] == 'lo'
+    assert 'ifInOctets' in res['1']
+
+    for index, row in res.items():
+        assert row['ifIndex'] == index
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_get_table_deadline(sess):
+    with pytest.raises(EasySNMPDeadlineExceededError):
+        sess.get_table('ifTable', deadline=0)
+
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(EasySNMPCancelledError):
+        sess.get_table('ifTable', cancel=cancel)
+    assert not sess._pdu_checks
+
+    assert sess.get_table('ifTable', deadline=30)['1']['ifIndex'] == '1'
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_get_table_columns(sess):
+    sess.use_numeric = False
+    res = sess.get_table('ifTable', columns=['ifDescr', 3])
+
+    assert res['1'] == {'ifDescr': 'lo', 'ifType': '24'}
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_get_table_numeric(sess):
+    sess.use_numeric = True
+    res = sess.get_table('.1.3.6.1.2.1.2.2', columns=[2], max_repetitions=1)
+    sess.use_numeric = False
+
+    assert res['1'] == {'.1.3.6.1.2.1.2.2.1.2': 'lo'}
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_get_table_invalid_column(sess):
+    with pytest.raises(ValueError):
+        sess.get_table('ifTable', columns=['sysDescr'])
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_get_table_unknown(sess):
+    with pytest.raises(EasySNMPUnknownObjectIDError):
+        sess.get_table('gimmeTable')
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_get_table_index_schema_mib(sess):
+    res = sess.get_table('ipAddrTable', columns=['ipAdEntIfIndex'],
+                         index_schema=True)
+
+    assert res[('127.0.0.1',)] == {'ipAdEntIfIndex': '1'}
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_get_table_index_schema(sess):
+    res = sess.get_table('ifTable', columns=['ifDescr'],
+                         index_schema=['INTEGER'])
+    assert res[(1,)] == {'ifDescr': 'lo'}
+
+    # Indexes which do not match the schema are left undecoded
+    res = sess.get_table('ifTable', columns=['ifDescr'],
+                         index_schema=['INTEGER', 'INTEGER'])
+    assert res['1'] == {'ifDescr': 'lo'}
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_get_table_as_arrays(sess):
+    sess.use_numeric = False
+    rows = sess.get_table('ifTable', columns=['ifDescr', 'ifInOctets'])
+    res = sess.get_table('ifTable', columns=['ifDescr', 'ifInOctets'],
+                         index_schema=['INTEGER'], as_arrays=True)
+
+    assert sorted(res) == ['ifDescr', 'ifInOctets']
+
+    descr = res['ifDescr']
+    assert descr.snmp_type == 'OCTETSTR'
+    assert descr.indexes[0] == (1,)
+    assert list(descr.values) == [row['ifDescr'] for row in rows.values()]
+
+    octets = res['ifInOctets']
+    assert octets.snmp_type == 'COUNTER'
+    assert len(octets) == len(rows)
+    assert octets.indexes == descr.indexes
+    assert all(int(value) >= 0 for value in octets.values)
+
+
+@pytest.mark.parametrize('sess', [sess_v2(), sess_v3()])
+def test_session_get_table_as_arrays_signed(sess):
+    res = sess.get_table('ifTable', columns=['ifType'], as_arrays=True)
+
+    assert res['ifType'].snmp_type == 'INTEGER'
+    assert dict(res['ifType'])['1'] == 24
+
+
+def test_decode_index():
+    assert decode_index('1.4.10.0.0.1', ['INTEGER', 'INETADDRESS']) == (
+        1, '10.0.0.1'
+    )
+    assert decode_index(
+        '2.16.254.128.0.0.0.0.0.0.0.0.0.0.0.0.0.1', ['INTEGER', 'INETADDRESS']
+    ) == (2, 'fe80::1')
+    assert decode_index('10.0.0.1', 'IPADDR') == ('10.0.0.1',)
+    assert decode_index('3.97.98.99.7', ['OCTETSTR', 'INTEGER']) == (
+        'abc', 7
+    )
+    assert decode_index('97.98.99', 'IMPLIED OCTETSTR') == ('abc',)
+    assert decode_index('1.2.3.4.5.255', 'MACADDR') == ('01:02:03:04:05:ff',)
+    assert decode_index('3.1.3.6.9', ['OBJECTID', 'INTEGER']) == (
+        '.1.3.6', 9
+    )
+
+
+def test_decode_index_invalid():
+    with pytest.raises(ValueError):
+        decode_index('1.2', 'INTEGER')
+
+    with pytest.raises(ValueError):
+        decode_index('5.1', 'OCTETSTR')
+
+    with pytest.raises(ValueError):
+        decode_index('1', 'FLOAT')
+
+
+def test_decode_index_huge_length():
+    # A length prefix wrapping around when added to the position mustn't
+    # pass for one within the index
+    for schema in (['INTEGER', 'OCTETSTR'], ['INTEGER', 'OBJECTID']):
+        with pytest.raises(ValueError):
+            decode_index('1.18446744073709551615.97', schema)
+        with pytest.raises(ValueError):
+            decode_index('1.18446744073709551614.97.98', schema)
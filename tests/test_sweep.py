@@ -0,0 +1,125 @@
+"""
+Copyright 2018, Oath Inc.
+Licensed under the terms of the BSD license. See LICENSE file in project root for terms.
+"""
+
+from __future__ import unicode_literals
+
+import errno
+import importlib
+import socket
+import time
+
+import pytest
+
+from yahoo_panoptes_snmp.sweep import (
+    SYS_UPTIME_OID, TAG_OCTET_STRING, TAG_RESPONSE, TAG_SEQUENCE,
+    TAG_TIMETICKS, _decode_response, _encode_get, _encode_integer,
+    _encode_oid, _encode_tlv, sweep
+)
+
+
+def test_encode_get():
+    # The request an agent would decode for sysUpTime.0 over SNMPv2c
+    assert _encode_get(2, 'public', 1) == bytes(bytearray([
+        0x30, 0x26, 0x02, 0x01, 0x01, 0x04, 0x06, 0x70, 0x75, 0x62, 0x6c,
+        0x69, 0x63, 0xa0, 0x19, 0x02, 0x01, 0x01, 0x02, 0x01, 0x00, 0x02,
+        0x01, 0x00, 0x30, 0x0e, 0x30, 0x0c, 0x06, 0x08, 0x2b, 0x06, 0x01,
+        0x02, 0x01, 0x01, 0x03, 0x00, 0x05, 0x00
+    ]))
+
+
+def test_decode_response():
+    varbind = _encode_tlv(
+        TAG_SEQUENCE,
+        _encode_oid(SYS_UPTIME_OID) +
+        _encode_tlv(TAG_TIMETICKS, bytearray([0x00, 0xff, 0xff, 0xff, 0xff]))
+    )
+    pdu = _encode_tlv(
+        TAG_RESPONSE,
+        _encode_integer(300) + _encode_integer(0) + _encode_integer(0) +
+        _encode_tlv(TAG_SEQUENCE, varbind)
+    )
+    response = _encode_tlv(
+        TAG_SEQUENCE,
+        _encode_integer(1) + _encode_tlv(TAG_OCTET_STRING,
+                                         bytearray(b'public')) + pdu
+    )
+
+    assert _decode_response(bytes(response)) == (300, 0, TAG_TIMETICKS,
+                                                 2 ** 32 - 1)
+
+
+def test_decode_response_invalid():
+    with pytest.raises(ValueError):
+        _decode_response(b'\x30\x26\x02')
+    with pytest.raises(ValueError):
+        # A request rather than a response
+        _decode_response(_encode_get(2, 'public', 1))
+
+
+@pytest.mark.parametrize('version', [1, 2])
+def test_sweep(version):
+    results = sweep(
+        ['localhost:11161', ('localhost', 11162), 'localhost:11161',
+         'invalid.host.name.'],
+        version=version, timeout=0.2, retries=1
+    )
+
+    assert [result.target for result in results] == [
+        'localhost:11161', ('localhost', 11162), 'localhost:11161',
+        'invalid.host.name.'
+    ]
+    for result in (results[0], results[2]):
+        assert result.reachable
+        assert result.rtt < 0.2
+        assert result.sys_uptime > 0
+        assert result.error is None
+
+    assert not results[1].reachable
+    assert results[1].error == 'timed out'
+    assert not results[3].reachable
+    assert results[3].error.startswith('unable to resolve')
+
+
+def test_sweep_many():
+    results = sweep(['localhost:11161'] * 200, timeout=1, max_in_flight=50,
+                    sockets=2)
+    assert all(result.reachable for result in results)
+
+
+def test_sweep_full_buffers(monkeypatch):
+    # The package's sweep function hides the module of the same name
+    sweep_module = importlib.import_module('yahoo_panoptes_snmp.sweep')
+    open_socket = sweep_module._open_socket
+    blocked_until = time.time() + 0.1
+    attempts = []
+
+    class FullSocket(object):
+        """
+        A socket whose interface queue is full for a while.
+        """
+
+        def __init__(self, family):
+            self.sock = open_socket(family)
+
+        def __getattr__(self, name):
+            return getattr(self.sock, name)
+
+        def sendto(self, message, address):
+            attempts.append(time.time())
+            if time.time() < blocked_until:
+                raise socket.error(errno.ENOBUFS, 'No buffer space available')
+            return self.sock.sendto(message, address)
+
+    monkeypatch.setattr(sweep_module, '_open_socket', FullSocket)
+
+    # Sending is retried without spinning while nothing is in flight
+    results = sweep(['localhost:11161'], timeout=1)
+    assert results[0].reachable
+    assert len(attempts) < 0.1 / sweep_module.SEND_RETRY_DELAY + 5
+
+
+def test_sweep_invalid_version():
+    with pytest.raises(ValueError):
+        sweep(['localhost:11161'], version=3)
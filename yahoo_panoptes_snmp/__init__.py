@@ -3,6 +3,8 @@ Copyright 2018, Oath Inc.
 Licensed under the terms of the BSD license. See LICENSE file in project root for terms.
 """
 
+from .breaker import CircuitBreaker, CircuitBreakers  # noqa
+from .changes import ChangePoller  # noqa
 from .easy import (  # noqa
     snmp_get, snmp_set, snmp_set_multiple, snmp_get_next, snmp_get_bulk,
     snmp_walk
@@ -10,7 +12,15 @@ from .easy import (  # noqa
 from .exceptions import (  # noqa
     EasySNMPError, EasySNMPConnectionError, EasySNMPTimeoutError,
     EasySNMPUnknownObjectIDError, EasySNMPNoSuchObjectError,
-    EasySNMPNoSuchInstanceError, EasySNMPUndeterminedTypeError
+    EasySNMPNoSuchInstanceError, EasySNMPUndeterminedTypeError,
+    EasySNMPDeadlineExceededError, EasySNMPCancelledError,
+    EasySNMPNonIncreasingOIDError, EasySNMPCircuitOpenError
 )
-from .session import Session  # noqa
-from .variables import SNMPVariable  # noqa
+from .prefork import prefork, shard  # noqa
+from .profiles import AgentProfile, ProfileStore  # noqa
+from .ratelimit import RateLimiter, RateLimits  # noqa
+from .resolver import Resolver  # noqa
+from .scheduler import PollJob, PollScheduler  # noqa
+from .session import Session, init  # noqa
+from .sweep import SweepResult, sweep  # noqa
+from .variables import SNMPChanges, SNMPColumn, SNMPVariable  # noqa
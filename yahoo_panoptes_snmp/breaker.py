@@ -0,0 +1,158 @@
+"""
+Copyright 2018, Oath Inc.
+Licensed under the terms of the BSD license. See LICENSE file in project root for terms.
+"""
+
+from __future__ import unicode_literals
+
+import threading
+import time
+
+from .exceptions import EasySNMPCircuitOpenError
+
+
+class CircuitBreaker(object):
+    """
+    A thread-safe circuit breaker which stops requests to an agent after a
+    number of consecutive timeouts; it may be shared by all the sessions to
+    the agent.
+
+    Once open, requests fail immediately with EasySNMPCircuitOpenError
+    until the cool-down period has elapsed, after which a single request is
+    let through as a probe: the breaker closes again if the probe gets a
+    response or stays open for another cool-down period if it times out.
+
+    :param failure_threshold: the number of consecutive timeouts which open
+                              the breaker
+    :param cooldown: the number of seconds the breaker stays open before
+                     letting a probe through
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold=3, cooldown=60):
+        if failure_threshold < 1:
+            raise ValueError('the failure threshold must be at least 1')
+
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened = None
+        self._probing = False
+
+    def __repr__(self):
+        return '<{0} state={1} failures={2}>'.format(
+            self.__class__.__name__, self.state, self._failures
+        )
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened is None:
+                return self.CLOSED
+            if self._probing or time.time() - self._opened >= self.cooldown:
+                return self.HALF_OPEN
+            return self.OPEN
+
+    def allow(self):
+        """
+        Checks whether a request may be sent; each request allowed must be
+        followed by a call to record() or abandon(), passing on what this
+        returned.
+
+        :return: True if the request is the probe of a half-open breaker,
+                 False otherwise
+        :raises EasySNMPCircuitOpenError: if the breaker is open or a probe
+                                          is already in progress
+        """
+
+        with self._lock:
+            if self._opened is None:
+                return False
+
+            if (not self._probing and
+                    time.time() - self._opened >= self.cooldown):
+                self._probing = True
+                return True
+
+        raise EasySNMPCircuitOpenError(
+            'the circuit breaker is open after {0} consecutive '
+            'timeouts'.format(self._failures)
+        )
+
+    def record(self, timed_out, probe=False):
+        """
+        Records the outcome of a request allowed by allow().
+
+        :param timed_out: whether the request timed out
+        :param probe: what allow() returned for the request; requests
+                      allowed before the breaker opened may complete while
+                      the probe is in progress, which only the probe ends
+        """
+
+        with self._lock:
+            if not timed_out:
+                self._failures = 0
+                self._opened = None
+            else:
+                self._failures += 1
+                if ((probe and self._opened is not None) or
+                        self._failures >= self.failure_threshold):
+                    self._opened = time.time()
+            if probe:
+                self._probing = False
+
+    def abandon(self, probe=False):
+        """
+        Records that a request allowed by allow() was not sent after all,
+        letting another request through as the probe if it was the probe.
+
+        :param probe: what allow() returned for the request
+        """
+
+        if probe:
+            with self._lock:
+                self._probing = False
+
+
+class CircuitBreakers(object):
+    """
+    The circuit breakers shared by all the sessions of a process, one per
+    target; pass it to a Session as circuit_breakers.
+
+    :param failure_threshold: see CircuitBreaker
+    :param cooldown: see CircuitBreaker
+    """
+
+    def __init__(self, failure_threshold=3, cooldown=60):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self._lock = threading.Lock()
+        self._breakers = {}
+
+    def __contains__(self, target):
+        with self._lock:
+            return target in self._breakers
+
+    def get(self, target):
+        """
+        Retrieves the circuit breaker of a target, creating it if the target
+        is not yet known.
+
+        :param target: a session's connect_hostname (e.g.
+                       'udp:localhost:161')
+        :return: the CircuitBreaker of the target
+        """
+
+        with self._lock:
+            breaker = self._breakers.get(target)
+            if breaker is None:
+                breaker = self._breakers[target] = CircuitBreaker(
+                    self.failure_threshold, self.cooldown
+                )
+            return breaker
@@ -0,0 +1,61 @@
+"""
+Copyright 2018, Oath Inc.
+Licensed under the terms of the BSD license. See LICENSE file in project root for terms.
+"""
+
+from __future__ import unicode_literals
+
+
+class ChangePoller(object):
+    """
+    Polls the same OIDs repeatedly, returning only the variables which were
+    added, changed or removed since the previous poll (see
+    Session.bulk_walk_changes). The previous values are kept in a compact
+    form: the raw value of each variable keyed by its numeric OID.
+
+    :param session: the Session to poll with
+    :param oids: the OIDs to walk on each poll (see Session.bulk_walk)
+    :param non_repeaters: see Session.bulk_walk
+    :param max_repetitions: see Session.bulk_walk
+    """
+
+    def __init__(self, session, oids, non_repeaters=0, max_repetitions=None):
+        self.session = session
+        self.oids = oids
+        self.non_repeaters = non_repeaters
+        self.max_repetitions = max_repetitions
+        self.state = None
+
+    def __repr__(self):
+        return '<{0} oids={1} variables={2}>'.format(
+            self.__class__.__name__, self.oids, len(self.state or ())
+        )
+
+    def poll(self, deadline=None, cancel=None):
+        """
+        Walks the OIDs and compares the variables retrieved with those of
+        the previous poll; the first poll returns every variable as added.
+
+        A poll which fails leaves the previous state untouched so that the
+        next poll reports the changes since the last successful one.
+
+        :param deadline: see Session.bulk_walk
+        :param cancel: see Session.bulk_walk
+        :return: an SNMPChanges object
+        """
+
+        changes = self.session.bulk_walk_changes(
+            self.oids, state=self.state, non_repeaters=self.non_repeaters,
+            max_repetitions=self.max_repetitions, deadline=deadline,
+            cancel=cancel
+        )
+        self.state = changes.state
+        return changes
+
+    def reset(self):
+        """
+        Forgets the previous poll so that the next one returns every
+        variable as added, e.g. after the agent restarted.
+        """
+
+        self.state = None
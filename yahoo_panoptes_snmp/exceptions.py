@@ -54,3 +54,33 @@ class EasySNMPUndeterminedTypeError(EasySNMPError):
     Raised when the type cannot be determine when setting the value of an OID.
     """
     pass
+
+
+class EasySNMPDeadlineExceededError(EasySNMPTimeoutError):
+    """
+    Raised when an operation spanning multiple requests (such as a walk)
+    does not complete before its deadline.
+    """
+    pass
+
+
+class EasySNMPCancelledError(EasySNMPError):
+    """Raised when an operation is cancelled from another thread."""
+    pass
+
+
+class EasySNMPNonIncreasingOIDError(EasySNMPError):
+    """
+    Raised during a walk when the agent returns an OID which is not
+    lexicographically greater than the one requested, which would otherwise
+    cause the walk to loop (only when abort_on_nonincreasing is enabled).
+    """
+    pass
+
+
+class EasySNMPCircuitOpenError(EasySNMPTimeoutError):
+    """
+    Raised without sending a request when the agent's circuit breaker is
+    open, i.e. its recent requests timed out.
+    """
+    pass
@@ -5,7 +5,12 @@ Licensed under the terms of the BSD license. See LICENSE file in project root fo
 
 from __future__ import unicode_literals
 
+import array
+import calendar
+import datetime
 import re
+import struct
+import time
 
 # This regular expression is used to extract the index from an OID
 OID_INDEX_RE = re.compile(
@@ -39,3 +44,125 @@ def normalize_oid(oid, oid_index=None):
             oid, oid_index = match.group(1, 2)
 
     return oid, oid_index
+
+
+def oid_to_tuple(oid):
+    """
+    Splits an OID into a tuple of its sub-identifiers so that OIDs may be
+    compared component by component rather than as strings; numeric
+    sub-identifiers are converted to integers so that numeric OIDs compare
+    in SNMP (lexicographic) order.
+
+    :param oid: the OID to split (e.g. '.1.3.6.1.2.1.2.2.1.10' or
+                'ifDescr.1')
+    :return: a tuple of sub-identifiers (e.g. (1, 3, 6, 1, 2, 1, 2, 2, 1, 10)
+             or ('ifDescr', 1))
+    """
+
+    return tuple(
+        int(part) if part.isdigit() else part
+        for part in oid.strip('.').split('.')
+    )
+
+
+class Timestamp(float):
+    """
+    An absolute point in time in seconds since the epoch (as returned by
+    time.time()), which may be given as an operation's deadline instead of
+    a number of seconds from now; unlike a naive datetime, it is not
+    affected by changes of the local time's UTC offset.
+    """
+
+
+def deadline_to_timestamp(deadline):
+    """
+    Converts an operation deadline into an absolute timestamp which may be
+    compared with time.time().
+
+    :param deadline: the number of seconds from now, a Timestamp or a
+                     datetime object representing an absolute point in time
+                     (naive datetime objects are taken to be in local time)
+    :return: the deadline in seconds since the epoch, or None if no
+             deadline was given
+    """
+
+    if deadline is None:
+        return None
+
+    if isinstance(deadline, Timestamp):
+        return float(deadline)
+
+    if isinstance(deadline, datetime.datetime):
+        if deadline.tzinfo is not None:
+            timestamp = calendar.timegm(deadline.utctimetuple())
+        else:
+            timestamp = time.mktime(deadline.timetuple())
+        return timestamp + deadline.microsecond / 1000000.0
+
+    return time.time() + deadline
+
+
+# Timeticks rendered by snprint_value (e.g. '2:3:04:05.67' for 2 days, 3
+# hours, 4 minutes and 5.67 seconds, possibly preceded by the raw value in
+# parentheses)
+TIMETICKS_RE = re.compile(
+    r'(?:.*\((\d+)\).*|(\d+):(\d+):(\d+):(\d+)\.(\d+))$'
+)
+
+
+def parse_timeticks(value):
+    """
+    Converts the value of a TimeTicks variable into hundredths of a second,
+    whether or not it was rendered with use_sprint_value.
+
+    :param value: the value of the variable (e.g. '8855579' or
+                  '1:0:35:55.79')
+    :return: the number of hundredths of a second, or None if the value is
+             not a TimeTicks value (e.g. 'NOSUCHOBJECT')
+    """
+
+    if value is None:
+        return None
+    if value.isdigit():
+        return int(value)
+
+    match = TIMETICKS_RE.match(value)
+    if not match:
+        return None
+    if match.group(1) is not None:
+        return int(match.group(1))
+
+    days, hours, minutes, seconds, hundredths = (
+        int(part) for part in match.group(2, 3, 4, 5, 6)
+    )
+    return ((((days * 24 + hours) * 60 + minutes) * 60 + seconds) * 100 +
+            hundredths)
+
+
+def unpack_integers(data, typecode):
+    """
+    Converts integers packed by the C interface into a NumPy array if NumPy
+    is available, or otherwise an array.array (or, where the array module
+    lacks 64 bit typecodes, a list).
+
+    :param data: a bytearray of native 64 bit integers
+    :param typecode: 'q' for signed integers or 'Q' for unsigned ones
+    :return: the sequence of integers
+    """
+
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+
+    if numpy is not None:
+        return numpy.frombuffer(bytes(data), dtype=numpy.dtype(typecode))
+
+    if typecode in getattr(array, 'typecodes', ''):
+        values = array.array(typecode)
+        values.frombytes(bytes(data))
+        return values
+
+    return list(struct.unpack(
+        str('={0}{1}').format(len(data) // 8, typecode), bytes(data)
+    ))
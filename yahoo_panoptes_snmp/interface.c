@@ -84,6 +84,13 @@ Licensed under the terms of the BSD license. See LICENSE file in project root fo
 #define FAIL_ON_NULL_IID (0x01)
 #define NO_FLAGS         (0x00)
 
+/* alignment of the blocks allocated from a session_arena */
+#define ARENA_ALIGN       (sizeof(oid) > sizeof(void *) ? sizeof(oid) : \
+                           sizeof(void *))
+#define ARENA_ROUND(x)    (((x) + ARENA_ALIGN - 1) / ARENA_ALIGN * ARENA_ALIGN)
+/* arenas which outgrow this are freed after use rather than kept */
+#define ARENA_KEEP_SIZE   (1024 * 1024)
+
 #define SAFE_FREE(x)                                                          \
     do                                                                        \
     {                                                                         \
@@ -95,6 +102,53 @@ Licensed under the terms of the BSD license. See LICENSE file in project root fo
     while (0)
 
 typedef netsnmp_session SnmpSession;
+
+/*
+ * The varbinds of a response kept by a request, rendered into C strings by
+ * __decode_response().  They are decoded with the GIL released, so that
+ * other threads run meanwhile, and only turned into SNMPVariables once it
+ * is reacquired.
+ */
+struct decoded_varbind
+{
+    netsnmp_variable_list *vars;
+    /* offsets of the NUL terminated strings in decoded_response.strings */
+    size_t oid;
+    size_t oid_index;
+    size_t value;
+    /* values may hold NUL bytes */
+    size_t value_len;
+    char type_str[MAX_TYPE_NAME_LEN];
+};
+
+struct decoded_response
+{
+    struct decoded_varbind *varbinds;
+    size_t varbinds_len;
+    size_t varbinds_size;
+    char *strings;
+    size_t strings_len;
+    size_t strings_size;
+};
+
+/*
+ * Working memory kept by a session between operations, so that walks carve
+ * their state out of it rather than allocating it afresh on every call.
+ * It grows whenever an operation reserves more than it holds (see
+ * __arena_acquire()) and is kept until the session is deleted, unless it
+ * outgrows ARENA_KEEP_SIZE.
+ */
+struct session_arena
+{
+    char *buf;
+    size_t size;
+    size_t used;
+    /* the varbinds of responses being decoded, whose memory is reused too */
+    struct decoded_response decoded;
+    /* set while an operation uses the arena */
+    int busy;
+};
+
 /*
  * This structure is attached to the yahoo_panoptes_snmp.Session
  * object as a Python Capsule (or CObject).
@@ -115,6 +169,8 @@ struct session_capsule_ctx
      * won't ever change in Net-SNMP.
      */
     netsnmp_session *handle;
+    /* per-PDU timeout (microseconds) the session was created with */
+    long timeout;
     /* buf is reusable and stores OID values and names */
     u_char buf[MAX_VALUE_SIZE];
     /* err_str is used to fetch the error message from net-snmp libs */
@@ -129,7 +185,10 @@ struct session_capsule_ctx
      */
     unsigned char invalid_oids_buf[MAX_INVALID_OIDS / CHAR_BIT];
     bitarray *invalid_oids;
+    /* working memory of walks and decoded responses */
+    struct session_arena arena;
 };
+
 static PyObject *create_session_capsule(SnmpSession *ss);
 static void *get_session_handle_from_capsule(PyObject *session_capsule);
 #ifdef USE_DEPRECATED_COBJECT_API
@@ -144,12 +203,29 @@ static int __translate_appl_type(char *typestr);
 static int __translate_asn_type(int type);
 static int __snprint_value(char *buf, size_t buf_len,
                            netsnmp_variable_list *var,
-                           struct tree *tp, int type, int flag);
+                           struct tree *tp, int type, int flag,
+                           int getlabel_flag);
 static int __sprint_num_objid(char *buf, oid *objid, int len);
 static int __scan_num_objid(char *buf, oid *objid, size_t *len);
 static int __get_type_str(int type, char *str, int log_error);
 static int __get_label_iid(char *name, char **last_label, char **iid,
                            int flag);
+static struct tree *__sprint_objid(char *buf, size_t buf_len,
+                                   const oid *name, size_t name_len,
+                                   int flag);
+static int __add_decoded_varbind(struct decoded_response *decoded,
+                                 netsnmp_variable_list *vars);
+static int __decode_response(struct decoded_response *decoded,
+                             int getlabel_flag, int sprintval_flag,
+                             char *buf, size_t buf_len);
+static void __free_decoded_response(struct decoded_response *decoded);
+static struct session_arena *__arena_acquire(
+    struct session_capsule_ctx *session_ctx, struct session_arena *scratch,
+    size_t size);
+static void *__arena_alloc(struct session_arena *arena, size_t size);
+static void __arena_release(struct session_capsule_ctx *session_ctx,
+                            struct session_arena *arena);
+static void __free_arena(struct session_arena *arena);
 static struct tree *__tag2oid(char *tag, char *iid, oid *oid_arr,
                               int *oid_arr_len, int *type, int best_guess);
 static int __concat_oid_str(oid *doid_arr, int *doid_arr_len, char *soid_str);
@@ -173,6 +249,7 @@ static PyObject *EasySNMPNoSuchNameError = NULL;
 static PyObject *EasySNMPUnknownObjectIDError = NULL;
 static PyObject *EasySNMPNoSuchObjectError = NULL;
 static PyObject *EasySNMPUndeterminedTypeError = NULL;
+static PyObject *EasySNMPNonIncreasingOIDError = NULL;
 
 /*
  * Ripped wholesale from library/tools.h from Net-SNMP 5.7.3
@@ -193,13 +270,23 @@ static void *compat_netsnmp_memdup(const void *from, size_t size)
     return to;
 }
 
-void __libraries_init(char *appname)
+/*
+ * Initialises the Net-SNMP library once per process.
+ *
+ * @param[in] appname The application name used to find configuration files
+ * @param[in] fast Whether to skip reading configuration and persistent files
+ *                 and loading MIBs, leaving only numeric OIDs usable
+ *
+ * @return 1 if the library was initialised, 0 if it already was
+ */
+int __libraries_init(char *appname, int fast)
 {
     static int have_inited = 0;
+    char *mibs = NULL;
 
     if (have_inited)
     {
-        return;
+        return 0;
     }
     have_inited = 1;
 
@@ -208,14 +295,49 @@ void __libraries_init(char *appname)
     /* completely disable logging otherwise it will default to stderr */
     netsnmp_register_loghandler(NETSNMP_LOGHANDLER_NONE, 0);
 
+    if (fast)
+    {
+        netsnmp_ds_set_boolean(NETSNMP_DS_LIBRARY_ID,
+                               NETSNMP_DS_LIB_DONT_READ_CONFIGS, 1);
+        netsnmp_ds_set_boolean(NETSNMP_DS_LIBRARY_ID,
+                               NETSNMP_DS_LIB_DISABLE_PERSISTENT_LOAD, 1);
+        netsnmp_ds_set_boolean(NETSNMP_DS_LIBRARY_ID,
+                               NETSNMP_DS_LIB_DISABLE_PERSISTENT_SAVE, 1);
+
+        /*
+         * Net-SNMP reads the MIB modules listed in $MIBS (or its defaults)
+         * from the MIB directories; list none while the library initialises
+         */
+        netsnmp_set_mib_directory("");
+        if (getenv("MIBS"))
+        {
+            mibs = strdup(getenv("MIBS"));
+        }
+        setenv("MIBS", "", 1);
+    }
+
     init_snmp(appname);
 
+    if (fast)
+    {
+        if (mibs)
+        {
+            setenv("MIBS", mibs, 1);
+            free(mibs);
+        }
+        else
+        {
+            unsetenv("MIBS");
+        }
+    }
+
     netsnmp_ds_set_boolean(NETSNMP_DS_LIBRARY_ID,
                            NETSNMP_DS_LIB_DONT_BREAKDOWN_OIDS, 1);
     netsnmp_ds_set_int(NETSNMP_DS_LIBRARY_ID,
                        NETSNMP_DS_LIB_PRINT_SUFFIX_ONLY, 1);
     netsnmp_ds_set_int(NETSNMP_DS_LIBRARY_ID, NETSNMP_DS_LIB_OID_OUTPUT_FORMAT,
                        NETSNMP_OID_OUTPUT_SUFFIX);
+    return 1;
 }
 
 static int __is_numeric_oid(char *oidstr)
@@ -408,14 +530,22 @@ static int __translate_asn_type(int type)
 #define USE_SPRINT_VALUE (2)
 static int __snprint_value(char *buf, size_t buf_len,
                            netsnmp_variable_list *var,
-                           struct tree *tp, int type, int flag)
+                           struct tree *tp, int type, int flag,
+                           int getlabel_flag)
 {
     int len = 0;
     u_char *ip;
     struct enum_list *ep;
 
     buf[0] = '\0';
-    if (flag == USE_SPRINT_VALUE)
+    if (flag == USE_SPRINT_VALUE && var->type == ASN_OBJECT_ID)
+    {
+        /* in the session's OID format rather than the library-wide one */
+        __sprint_objid(buf, buf_len, (oid *) var->val.objid,
+                       var->val_len / sizeof(oid), getlabel_flag);
+        len = STRLEN(buf);
+    }
+    else if (flag == USE_SPRINT_VALUE)
     {
         snprint_value(buf, buf_len, var->name, var->name_length, var);
         len = STRLEN(buf);
@@ -797,6 +927,344 @@ static int __get_label_iid(char *name, char **last_label, char **iid,
     return SUCCESS;
 }
 
+/*
+ * Renders an OID as netsnmp_sprint_realloc_objid_tree would with the
+ * numeric, full or suffix output format (chosen by flag), without reading
+ * the library-wide output format -- so sessions using different formats
+ * don't have to set it around each request.  Indexes are always rendered
+ * numerically, as DONT_BREAKDOWN_OIDS is set at initialisation.  Returns
+ * the deepest node of the MIB tree in the OID (or NULL if none is).
+ */
+static struct tree *__sprint_objid(char *buf, size_t buf_len,
+                                   const oid *name, size_t name_len,
+                                   int flag)
+{
+    struct tree *subtree = get_tree_head();
+    struct tree *tp = NULL;
+    size_t out_len = 0;
+    size_t label_off = 0;
+    size_t known;
+    ssize_t cp;
+    int len;
+
+    if (buf_len < 2)
+    {
+        return NULL;
+    }
+    buf[out_len++] = '.';
+    buf[out_len] = '\0';
+
+    /* the labels (or numbers) of the nodes found in the MIB tree */
+    for (known = 0; known < name_len && subtree; known++)
+    {
+        while (subtree && subtree->subid != name[known])
+        {
+            subtree = subtree->next_peer;
+        }
+        if (!subtree)
+        {
+            break;
+        }
+        /* the last of duplicate nodes wins, as it does in Net-SNMP */
+        while (subtree->next_peer &&
+               subtree->next_peer->subid == name[known])
+        {
+            subtree = subtree->next_peer;
+        }
+        tp = subtree;
+        label_off = out_len;
+
+        if ((flag & USE_NUMERIC_OIDS) ||
+            !strncmp(subtree->label, ANON, ANON_LEN))
+        {
+            len = snprintf(buf + out_len, buf_len - out_len, "%lu%s",
+                           subtree->subid,
+                           known + 1 < name_len ? "." : "");
+        }
+        else
+        {
+            len = snprintf(buf + out_len, buf_len - out_len, "%s%s",
+                           subtree->label,
+                           known + 1 < name_len ? "." : "");
+        }
+        if (len < 0 || (size_t) len >= buf_len - out_len)
+        {
+            buf[buf_len - 1] = '\0';
+            return tp;
+        }
+        out_len += len;
+        subtree = subtree->child_list;
+    }
+
+    /* the rest (usually the index) numerically */
+    for (cp = known; (size_t) cp < name_len; cp++)
+    {
+        len = snprintf(buf + out_len, buf_len - out_len, "%lu%s",
+                       (unsigned long) name[cp],
+                       (size_t) cp + 1 < name_len ? "." : "");
+        if (len < 0 || (size_t) len >= buf_len - out_len)
+        {
+            buf[buf_len - 1] = '\0';
+            return tp;
+        }
+        out_len += len;
+    }
+
+    if (flag & (USE_NUMERIC_OIDS | USE_LONG_NAMES))
+    {
+        return tp;
+    }
+
+    /* only keep the last label and what follows it */
+    if (known < name_len)
+    {
+        cp = known ? (ssize_t) label_off : 0;
+    }
+    else
+    {
+        cp = out_len - 1;
+        while (cp >= 0 && !isalpha((int) buf[cp]))
+        {
+            cp--;
+        }
+        while (cp >= 0 && buf[cp] != '.')
+        {
+            cp--;
+        }
+        cp++;
+    }
+    memmove(buf, buf + cp, out_len - cp + 1);
+
+    return tp;
+}
+
+/*
+ * Adds a varbind of a response to those __decode_response() renders.
+ *
+ * @return SUCCESS, or FAILURE if memory can't be allocated
+ */
+static int __add_decoded_varbind(struct decoded_response *decoded,
+                                 netsnmp_variable_list *vars)
+{
+    struct decoded_varbind *varbinds;
+    size_t size;
+
+    if (decoded->varbinds_len == decoded->varbinds_size)
+    {
+        size = decoded->varbinds_size ? decoded->varbinds_size * 2 : 64;
+        varbinds = realloc(decoded->varbinds,
+                           size * sizeof(struct decoded_varbind));
+        if (!varbinds)
+        {
+            return FAILURE;
+        }
+        decoded->varbinds = varbinds;
+        decoded->varbinds_size = size;
+    }
+
+    decoded->varbinds[decoded->varbinds_len++].vars = vars;
+
+    return SUCCESS;
+}
+
+/* appends a string to decoded->strings, setting offset to where it is */
+static int __append_decoded_string(struct decoded_response *decoded,
+                                   const char *str, size_t len,
+                                   size_t *offset)
+{
+    char *strings;
+    size_t size;
+
+    if (decoded->strings_len + len + 1 > decoded->strings_size)
+    {
+        size = decoded->strings_size ? decoded->strings_size : STR_BUF_SIZE;
+        while (decoded->strings_len + len + 1 > size)
+        {
+            size *= 2;
+        }
+        strings = realloc(decoded->strings, size);
+        if (!strings)
+        {
+            return FAILURE;
+        }
+        decoded->strings = strings;
+        decoded->strings_size = size;
+    }
+
+    *offset = decoded->strings_len;
+    if (len)
+    {
+        memcpy(decoded->strings + decoded->strings_len, str, len);
+    }
+    decoded->strings[decoded->strings_len + len] = '\0';
+    decoded->strings_len += len + 1;
+
+    return SUCCESS;
+}
+
+/*
+ * Renders the varbinds added to decoded since it was last emptied, reusing
+ * its memory.  Nothing here calls into Python (bar logging errors, which
+ * takes the GIL itself), so it may be called with the GIL released.
+ *
+ * @param[in] buf Scratch space, whose size also bounds the length of values
+ *
+ * @return SUCCESS, or FAILURE if memory can't be allocated
+ */
+static int __decode_response(struct decoded_response *decoded,
+                             int getlabel_flag, int sprintval_flag,
+                             char *buf, size_t buf_len)
+{
+    netsnmp_variable_list *vars;
+    struct decoded_varbind *varbind;
+    struct tree *tp;
+    char *tag;
+    char *iid;
+    size_t varbind_ind;
+    int type;
+    int len;
+
+    decoded->strings_len = 0;
+
+    for (varbind_ind = 0; varbind_ind < decoded->varbinds_len; varbind_ind++)
+    {
+        varbind = &decoded->varbinds[varbind_ind];
+        vars = varbind->vars;
+
+        tp = __sprint_objid(buf, buf_len, vars->name, vars->name_length,
+                            getlabel_flag);
+        if (__is_leaf(tp))
+        {
+            getlabel_flag &= ~NON_LEAF_NAME;
+        }
+        else
+        {
+            getlabel_flag |= NON_LEAF_NAME;
+        }
+
+        __get_label_iid(buf, &tag, &iid, getlabel_flag);
+        if (__append_decoded_string(decoded, tag, STRLEN(tag),
+                                    &varbind->oid) != SUCCESS ||
+            __append_decoded_string(decoded, iid, STRLEN(iid),
+                                    &varbind->oid_index) != SUCCESS)
+        {
+            return FAILURE;
+        }
+
+        type = __translate_asn_type(vars->type);
+        __get_type_str(type, varbind->type_str, 1);
+
+        len = __snprint_value(buf, buf_len, vars, tp, type, sprintval_flag,
+                              getlabel_flag);
+        varbind->value_len = len;
+        if (__append_decoded_string(decoded, buf, len,
+                                    &varbind->value) != SUCCESS)
+        {
+            return FAILURE;
+        }
+    }
+
+    return SUCCESS;
+}
+
+static void __free_decoded_response(struct decoded_response *decoded)
+{
+    SAFE_FREE(decoded->varbinds);
+    SAFE_FREE(decoded->strings);
+    memset(decoded, 0, sizeof(struct decoded_response));
+}
+
+/*
+ * Takes the arena of a session for an operation, growing it to hold at least
+ * size bytes, which are then handed out by __arena_alloc().  Should the
+ * arena already be in use (e.g. by a walk calling back into Python which
+ * uses the same session), the temporary arena scratch is used instead.
+ *
+ * @return the arena to use, to be given back with __arena_release(), or
+ *         NULL if memory can't be allocated
+ */
+static struct session_arena *__arena_acquire(
+    struct session_capsule_ctx *session_ctx, struct session_arena *scratch,
+    size_t size)
+{
+    struct session_arena *arena = &session_ctx->arena;
+
+    if (arena->busy)
+    {
+        memset(scratch, 0, sizeof(struct session_arena));
+        arena = scratch;
+    }
+
+    if (arena->size < size)
+    {
+        /* nothing is allocated from an arena which isn't in use */
+        SAFE_FREE(arena->buf);
+        arena->size = 0;
+        if (!(arena->buf = malloc(size)))
+        {
+            return NULL;
+        }
+        arena->size = size;
+    }
+
+    arena->used = 0;
+    arena->busy = 1;
+
+    return arena;
+}
+
+/*
+ * Allocates from the memory reserved by __arena_acquire(), which must
+ * account for each block rounded up by ARENA_ROUND().  The memory is not
+ * cleared.
+ */
+static void *__arena_alloc(struct session_arena *arena, size_t size)
+{
+    void *block;
+
+    size = ARENA_ROUND(size);
+    if (size > arena->size - arena->used)
+    {
+        return NULL;
+    }
+    block = arena->buf + arena->used;
+    arena->used += size;
+
+    return block;
+}
+
+/* gives back an arena taken with __arena_acquire() */
+static void __arena_release(struct session_capsule_ctx *session_ctx,
+                            struct session_arena *arena)
+{
+    struct decoded_response *decoded = &arena->decoded;
+
+    arena->used = 0;
+    arena->busy = 0;
+    decoded->varbinds_len = 0;
+    decoded->strings_len = 0;
+
+    if (arena != &session_ctx->arena || arena->size > ARENA_KEEP_SIZE)
+    {
+        SAFE_FREE(arena->buf);
+        arena->buf = NULL;
+        arena->size = 0;
+    }
+    if (arena != &session_ctx->arena ||
+        decoded->varbinds_size * sizeof(struct decoded_varbind) +
+        decoded->strings_size > ARENA_KEEP_SIZE)
+    {
+        __free_decoded_response(decoded);
+    }
+}
+
+static void __free_arena(struct session_arena *arena)
+{
+    SAFE_FREE(arena->buf);
+    __free_decoded_response(&arena->decoded);
+    memset(arena, 0, sizeof(struct session_arena));
+}
+
 /* Convert a tag (string) to an OID array              */
 /* Tag can be either a symbolic name, or an OID string */
 static struct tree *__tag2oid(char *tag, char *iid, oid *oid_arr,
@@ -1433,6 +1901,88 @@ static int py_netsnmp_attr_set_string(PyObject *obj, char *attr_name,
     return ret;
 }
 
+/*
+ * Decodes the varbinds added to decoded with the GIL released, appends
+ * their SNMPVariables to the list varbinds and empties decoded for the
+ * next response.
+ *
+ * An exception already set (by a walk stopped part way through a response)
+ * is kept, so that the variables retrieved before it are still appended.
+ *
+ * @return 0, or -1 with an exception set
+ */
+static int py_netsnmp_append_decoded(struct decoded_response *decoded,
+                                     PyObject *varbinds, int getlabel_flag,
+                                     int sprintval_flag, char *buf,
+                                     size_t buf_len)
+{
+    struct decoded_varbind *decoded_varbind;
+    PyObject *varbind;
+    PyObject *err_type;
+    PyObject *err_value;
+    PyObject *err_traceback;
+    char *strings;
+    size_t varbind_ind;
+    int status;
+    int ret = -1;
+
+    PyErr_Fetch(&err_type, &err_value, &err_traceback);
+
+    Py_BEGIN_ALLOW_THREADS
+    status = __decode_response(decoded, getlabel_flag, sprintval_flag, buf,
+                               buf_len);
+    Py_END_ALLOW_THREADS
+
+    if (status != SUCCESS)
+    {
+        PyErr_NoMemory();
+        goto done;
+    }
+
+    strings = decoded->strings;
+    for (varbind_ind = 0; varbind_ind < decoded->varbinds_len; varbind_ind++)
+    {
+        decoded_varbind = &decoded->varbinds[varbind_ind];
+
+        varbind = py_netsnmp_construct_varbind();
+        if (!varbind)
+        {
+            goto done;
+        }
+
+        if (py_netsnmp_attr_set_string(
+                varbind, "oid", strings + decoded_varbind->oid,
+                strlen(strings + decoded_varbind->oid)) < 0 ||
+            py_netsnmp_attr_set_string(
+                varbind, "oid_index", strings + decoded_varbind->oid_index,
+                strlen(strings + decoded_varbind->oid_index)) < 0 ||
+            py_netsnmp_attr_set_string(
+                varbind, "snmp_type", decoded_varbind->type_str,
+                strlen(decoded_varbind->type_str)) < 0 ||
+            py_netsnmp_attr_set_string(
+                varbind, "value", strings + decoded_varbind->value,
+                decoded_varbind->value_len) < 0 ||
+            PyList_Append(varbinds, varbind) < 0)
+        {
+            Py_DECREF(varbind);
+            goto done;
+        }
+        Py_DECREF(varbind);
+    }
+    ret = 0;
+
+done:
+    decoded->varbinds_len = 0;
+    if (err_type)
+    {
+        /* the earlier error is the one reported */
+        PyErr_Clear();
+        PyErr_Restore(err_type, err_value, err_traceback);
+        ret = -1;
+    }
+    return ret;
+}
+
 /**
  * Update python session object error attributes.
  *
@@ -1462,6 +2012,14 @@ static void __py_netsnmp_update_session_errors(PyObject *session,
                                                int err_ind)
 {
     PyObject *tmp_for_conversion;
+    PyObject *err_type, *err_value, *err_traceback;
+
+    /*
+     * The exception raised by __send_sync_pdu must survive the calls below;
+     * a garbage collection triggered by any of these allocations would
+     * otherwise report and clear it.
+     */
+    PyErr_Fetch(&err_type, &err_value, &err_traceback);
 
     py_netsnmp_attr_set_string(session, "error_string", err_str,
                                STRLEN(err_str));
@@ -1469,7 +2027,7 @@ static void __py_netsnmp_update_session_errors(PyObject *session,
     tmp_for_conversion = PyLong_FromLong(err_num);
     if (!tmp_for_conversion)
     {
-        return; /* nothing better to do? */
+        goto done; /* nothing better to do? */
     }
     PyObject_SetAttrString(session, "error_number", tmp_for_conversion);
     Py_DECREF(tmp_for_conversion);
@@ -1477,25 +2035,164 @@ static void __py_netsnmp_update_session_errors(PyObject *session,
     tmp_for_conversion = PyLong_FromLong(err_ind);
     if (!tmp_for_conversion)
     {
-        return; /* nothing better to do? */
+        goto done; /* nothing better to do? */
     }
     PyObject_SetAttrString(session, "error_index", tmp_for_conversion);
     Py_DECREF(tmp_for_conversion);
+
+done:
+    PyErr_Restore(err_type, err_value, err_traceback);
 }
 
-/*
- * Returns a new reference to a python capsule object containing
- * a newly allocated session_capsule_ctx.
+/**
+ * Apply the session level controls before a request PDU is sent.
  *
- * This function will raise an exception on failure.
+ * When the session has _pdu_checks enabled (e.g. an operation deadline or
+ * cancellation event is in effect), Session._check_pdu() is called before
+ * every PDU. It returns the timeout (in microseconds) to use for this PDU,
+ * or None for the timeout the session was created with, and raises an
+ * exception when the operation must not continue.
+ *
+ * Multi-PDU operations such as walks call this between PDUs so that they
+ * can be bounded as a whole rather than per PDU.
+ *
+ * @param[in] session The python object that represents our current Session
+ * @param[in] session_ctx The session context holding the net-snmp handle
+ *
+ * @return 0 on success, -1 with an exception set otherwise
  */
-static PyObject *create_session_capsule(SnmpSession *session)
+static int __py_netsnmp_before_pdu(PyObject *session,
+                                   struct session_capsule_ctx *session_ctx)
 {
-    void *handle = NULL;
-    struct session_capsule_ctx *ctx = NULL;
-    PyObject *capsule = NULL;
-    /* create a long lived handle from throwaway session object */
-    if (!(handle = snmp_sess_open(session)))
+    netsnmp_session *sptr = snmp_sess_session(session_ctx->handle);
+    PyObject *timeout = NULL;
+    long pdu_timeout = session_ctx->timeout;
+
+    if (py_netsnmp_attr_long(session, "_pdu_checks") > 0)
+    {
+        timeout = PyObject_CallMethod(session, "_check_pdu", NULL);
+        if (!timeout)
+        {
+            return -1;
+        }
+        if (timeout != Py_None)
+        {
+            pdu_timeout = PyLong_AsLong(timeout);
+        }
+        Py_DECREF(timeout);
+
+        if (PyErr_Occurred())
+        {
+            return -1;
+        }
+    }
+
+    if (sptr)
+    {
+        sptr->timeout = pdu_timeout;
+    }
+
+    return 0;
+}
+
+/**
+ * Notify the python Session that the PDU sent after
+ * __py_netsnmp_before_pdu() has completed, successfully or not, by calling
+ * its _pdu_done() method while _pdu_checks is set; this releases what
+ * _check_pdu() acquired for the PDU (e.g. a rate limiter's in-flight slot)
+ * and tells whether the request timed out.
+ *
+ * Any exception already set by the request is preserved.
+ *
+ * @param[in] session The python object that represents our current Session
+ */
+static void __py_netsnmp_after_pdu(PyObject *session)
+{
+    PyObject *err_type = NULL;
+    PyObject *err_value = NULL;
+    PyObject *err_traceback = NULL;
+    PyObject *result = NULL;
+    int timed_out;
+
+    PyErr_Fetch(&err_type, &err_value, &err_traceback);
+    timed_out = (err_type &&
+                 PyErr_GivenExceptionMatches(err_type, EasySNMPTimeoutError));
+
+    if (py_netsnmp_attr_long(session, "_pdu_checks") > 0)
+    {
+        result = PyObject_CallMethod(session, "_pdu_done", "i", timed_out);
+        Py_XDECREF(result);
+    }
+
+    /* _pdu_done() must not fail, but a request's error takes precedence */
+    if (PyErr_Occurred())
+    {
+        if (err_type)
+        {
+            PyErr_Clear();
+        }
+        else
+        {
+            PyErr_Fetch(&err_type, &err_value, &err_traceback);
+        }
+    }
+    PyErr_Restore(err_type, err_value, err_traceback);
+}
+
+/**
+ * Check that an OID returned while walking lexicographically follows the
+ * OID previously requested, as required for GETNEXT and GETBULK responses.
+ *
+ * Agents which return the same or a smaller OID would otherwise cause the
+ * walk to request the same data forever.
+ *
+ * @param[in] name The OID returned by the agent
+ * @param[in] name_len The length of name
+ * @param[in] prev The OID previously requested or returned
+ * @param[in] prev_len The length of prev
+ * @param[in] abort_on_nonincreasing Whether to raise rather than just stop
+ *
+ * @return 1 if the walk may continue, 0 if it must stop and -1 when it must
+ *         stop with an EasySNMPNonIncreasingOIDError set
+ */
+static int __check_oid_increasing(oid *name, size_t name_len,
+                                  oid *prev, size_t prev_len,
+                                  int abort_on_nonincreasing)
+{
+    char name_buf[STR_BUF_SIZE];
+
+    if (snmp_oid_compare(name, name_len, prev, prev_len) > 0)
+    {
+        return 1;
+    }
+
+    __sprint_num_objid(name_buf, name, name_len);
+    py_log_msg(DEBUG, "walk: agent returned non-increasing OID %s",
+               name_buf);
+
+    if (!abort_on_nonincreasing)
+    {
+        return 0;
+    }
+
+    PyErr_Format(EasySNMPNonIncreasingOIDError,
+                 "the agent returned a non-increasing OID (%s)", name_buf);
+    return -1;
+}
+
+/*
+ * Returns a new reference to a python capsule object containing
+ * a newly allocated session_capsule_ctx.
+ *
+ * This function will raise an exception on failure.
+ */
+static PyObject *create_session_capsule(SnmpSession *session)
+{
+    void *handle = NULL;
+    struct session_capsule_ctx *ctx = NULL;
+    PyObject *capsule = NULL;
+    /* create a long lived handle from throwaway session object */
+    if (!(handle = snmp_sess_open(session)))
     {
         PyErr_SetString(EasySNMPConnectionError,
                         "couldn't create SNMP handle");
@@ -1520,8 +2217,10 @@ static PyObject *create_session_capsule(SnmpSession *session)
     }
     /* init session context variables */
     ctx->handle = handle;
+    ctx->timeout = session->timeout;
     ctx->invalid_oids = (bitarray *) ctx->invalid_oids_buf;
     bitarray_buf_init(ctx->invalid_oids, sizeof(ctx->invalid_oids_buf));
+    memset(&ctx->arena, 0, sizeof(ctx->arena));
     return (capsule);
 done:
     if (handle)
@@ -1541,8 +2240,12 @@ static void *get_session_handle_from_capsule(PyObject *session_capsule)
 {
     if (!session_capsule)
     {
-        PyErr_SetString(PyExc_RuntimeError,
-                        "NULL arg calling get_session_handle_from_capsule");
+        /* Keep the error raised opening a lazy session */
+        if (!PyErr_Occurred())
+        {
+            PyErr_SetString(PyExc_RuntimeError,
+                            "NULL arg calling get_session_handle_from_capsule");
+        }
         return NULL;
     }
     /* raises exception on failure. */
@@ -1557,6 +2260,7 @@ static void *get_session_handle_from_capsule(PyObject *session_capsule)
         if (ctx)
         {
             snmp_sess_close(ctx->handle);
+            __free_arena(&ctx->arena);
             free(ctx);
         }
     }
@@ -1569,47 +2273,79 @@ static void *get_session_handle_from_capsule(PyObject *session_capsule)
         if (ctx)
         {
             snmp_sess_close(ctx->handle);
+            __free_arena(&ctx->arena);
             free(ctx);
         }
     }
 #endif /* USE_DEPRECATED_COBJECT_API */
 
 
-static PyObject *netsnmp_create_session(PyObject *self, PyObject *args)
+static PyObject *netsnmp_init(PyObject *self, PyObject *args)
 {
-    int version;
-    char *community;
-    char *peer;
-    int lport;
-    int retries;
-    int timeout;
-    SnmpSession session = {0};
+    int fast;
 
-    if (!PyArg_ParseTuple(args, "issiii", &version, &community, &peer, &lport,
-                          &retries, &timeout))
+    if (!PyArg_ParseTuple(args, "i", &fast))
     {
-        goto done;
+        return NULL;
     }
 
-    snmp_sess_init(&session);
+    if (__libraries_init("python", fast))
+    {
+        py_log_msg(DEBUG, "initialised the netsnmp library (fast: %d)",
+                   fast);
+        Py_RETURN_TRUE;
+    }
+    Py_RETURN_FALSE;
+}
 
-    session.version = -1;
+/*
+ * Maps the SNMP version given to the session functions to the Net-SNMP
+ * session version.
+ *
+ * @param[in] version 1, 2 (for 2c) or 3
+ *
+ * @return the Net-SNMP version, or -1 if it is not supported
+ */
+static long __session_version(int version)
+{
 #ifndef DISABLE_SNMPV1
     if (version == 1)
     {
-        session.version = SNMP_VERSION_1;
+        return SNMP_VERSION_1;
     }
 #endif
 #ifndef DISABLE_SNMPV2C
     if (version == 2)
     {
-        session.version = SNMP_VERSION_2c;
+        return SNMP_VERSION_2c;
     }
 #endif
     if (version == 3)
     {
-        session.version = SNMP_VERSION_3;
+        return SNMP_VERSION_3;
+    }
+    return -1;
+}
+
+static PyObject *netsnmp_create_session(PyObject *self, PyObject *args)
+{
+    int version;
+    char *community;
+    char *peer;
+    int lport;
+    int retries;
+    int timeout;
+    SnmpSession session = {0};
+
+    if (!PyArg_ParseTuple(args, "issiii", &version, &community, &peer, &lport,
+                          &retries, &timeout))
+    {
+        goto done;
     }
+
+    snmp_sess_init(&session);
+
+    session.version = __session_version(version);
     if (session.version == -1)
     {
         PyErr_Format(PyExc_ValueError, "unsupported SNMP version (%d)",
@@ -1632,6 +2368,108 @@ done:
 
 }
 
+/*
+ * Opens a session to each of many peers sharing the same SNMP version 1 or
+ * 2c settings, which are parsed and initialised once for all of them.
+ *
+ * Failing to open a session doesn't stop the others from being opened: the
+ * exception is returned in its place.
+ *
+ * @return a list holding the session capsule or the exception of each peer
+ */
+static PyObject *netsnmp_create_sessions_bulk(PyObject *self, PyObject *args)
+{
+    int version;
+    char *community;
+    PyObject *peers;
+    int lport;
+    int retries;
+    int timeout;
+    SnmpSession template = {0};
+    SnmpSession session;
+    PyObject *peers_seq = NULL;
+    PyObject *results = NULL;
+    PyObject *result;
+    char *peer;
+    PyObject *err_type;
+    PyObject *err_value;
+    PyObject *err_traceback;
+    Py_ssize_t peers_len;
+    Py_ssize_t i;
+
+    if (!PyArg_ParseTuple(args, "isOiii", &version, &community, &peers,
+                          &lport, &retries, &timeout))
+    {
+        goto done;
+    }
+
+    snmp_sess_init(&template);
+
+    template.version = __session_version(version);
+    if (template.version == -1 || template.version == SNMP_VERSION_3)
+    {
+        PyErr_Format(PyExc_ValueError, "unsupported SNMP version (%d)",
+                     version);
+        goto done;
+    }
+
+    template.community_len = STRLEN((char *)community);
+    template.community = (u_char *)community;
+    template.local_port = lport;
+    template.retries = retries;
+    template.timeout = timeout;
+    template.authenticator = NULL;
+
+    peers_seq = PySequence_Fast(peers, "expected a sequence of peers");
+    if (!peers_seq)
+    {
+        goto done;
+    }
+    peers_len = PySequence_Fast_GET_SIZE(peers_seq);
+
+    results = PyList_New(peers_len);
+    if (!results)
+    {
+        goto done;
+    }
+
+    for (i = 0; i < peers_len; i++)
+    {
+        if (!PyArg_Parse(PySequence_Fast_GET_ITEM(peers_seq, i), "s",
+                         &peer))
+        {
+            Py_CLEAR(results);
+            goto done;
+        }
+
+        session = template;
+        session.peername = peer;
+        result = create_session_capsule(&session);
+
+        if (!result)
+        {
+            /* Report the failure in place of the session */
+            PyErr_Fetch(&err_type, &err_value, &err_traceback);
+            PyErr_NormalizeException(&err_type, &err_value, &err_traceback);
+            py_log_msg(DEBUG, "sessions_bulk: couldn't open session %d",
+                       (int)i);
+            Py_XDECREF(err_type);
+            Py_XDECREF(err_traceback);
+            if (!err_value)
+            {
+                Py_CLEAR(results);
+                goto done;
+            }
+            result = err_value;
+        }
+        PyList_SET_ITEM(results, i, result);
+    }
+
+done:
+    Py_XDECREF(peers_seq);
+    return results;
+}
+
 static PyObject *netsnmp_create_session_v3(PyObject *self, PyObject *args)
 {
     int version;
@@ -1903,7 +2741,6 @@ static PyObject *netsnmp_get(PyObject *self, PyObject *args)
     oid *oid_arr = NULL;
     int oid_arr_len = 0;
     u_char *str_buf = NULL;
-    u_char *str_bufp = NULL;
     char *err_str = NULL;
     bitarray *invalid_oids = NULL;
 
@@ -1915,12 +2752,10 @@ static PyObject *netsnmp_get(PyObject *self, PyObject *args)
     int type;
     char type_str[MAX_TYPE_NAME_LEN];
     int status;
-    int buf_over = 0;
     char *tag = NULL;
     char *iid = NULL;
     int getlabel_flag = NO_FLAGS;
     int sprintval_flag = USE_BASIC;
-    int old_format;
     int best_guess;
     int retry_nosuch;
     int err_ind;
@@ -1948,6 +2783,7 @@ static PyObject *netsnmp_get(PyObject *self, PyObject *args)
 
     if (!session_ctx)
     {
+        error = 1;
         goto done;
     }
 
@@ -1955,7 +2791,6 @@ static PyObject *netsnmp_get(PyObject *self, PyObject *args)
     invalid_oids = session_ctx->invalid_oids;
     oid_arr = session_ctx->oid_arr;
     str_buf = session_ctx->buf;
-    str_bufp = str_buf;
     err_str = session_ctx->err_str;
 
     snmp_version = py_netsnmp_attr_long(session, "version");
@@ -2044,8 +2879,16 @@ static PyObject *netsnmp_get(PyObject *self, PyObject *args)
         bitarray_clear_bits(invalid_oids, (size_t) varlist_len);
     }
 
+    if (__py_netsnmp_before_pdu(session, session_ctx) < 0)
+    {
+        error = 1;
+        snmp_free_pdu(pdu);
+        goto done;
+    }
+
     status = __send_sync_pdu(ss, pdu, &response, retry_nosuch, err_str,
                              &err_num, &err_ind, invalid_oids);
+    __py_netsnmp_after_pdu(session);
 
     __py_netsnmp_update_session_errors(session, err_str, err_num, err_ind);
     if (status != 0)
@@ -2054,37 +2897,10 @@ static PyObject *netsnmp_get(PyObject *self, PyObject *args)
         goto done;
     }
 
-    /*
-     * Set up for numeric or full OID's, if necessary.  Save the old
-     * output format so that it can be restored when we finish -- this
-     * is a library-wide global, and has to be set/restored for each
-     * session.
-     */
-    old_format = netsnmp_ds_get_int(NETSNMP_DS_LIBRARY_ID,
-                                    NETSNMP_DS_LIB_OID_OUTPUT_FORMAT);
-
-    if (py_netsnmp_attr_long(session, "use_long_names"))
-    {
-        getlabel_flag |= USE_LONG_NAMES;
-
-        netsnmp_ds_set_int(NETSNMP_DS_LIBRARY_ID,
-                           NETSNMP_DS_LIB_OID_OUTPUT_FORMAT,
-                           NETSNMP_OID_OUTPUT_FULL);
-    }
-    /*
-     * Setting use_numeric forces use_long_names on so check for
-     * use_numeric after use_long_names (above) to make sure the final
-     * outcome of NETSNMP_DS_LIB_OID_OUTPUT_FORMAT is
-     * NETSNMP_OID_OUTPUT_NUMERIC
-     */
-    if (py_netsnmp_attr_long(session, "use_numeric"))
+    /* numeric OIDs are always rendered in full */
+    if (getlabel_flag & USE_NUMERIC_OIDS)
     {
         getlabel_flag |= USE_LONG_NAMES;
-        getlabel_flag |= USE_NUMERIC_OIDS;
-
-        netsnmp_ds_set_int(NETSNMP_DS_LIBRARY_ID,
-                           NETSNMP_DS_LIB_OID_OUTPUT_FORMAT,
-                           NETSNMP_OID_OUTPUT_NUMERIC);
     }
 
 
@@ -2149,22 +2965,9 @@ static PyObject *netsnmp_get(PyObject *self, PyObject *args)
         }
         else if (PyObject_HasAttrString(varbind, "oid"))
         {
-            size_t str_buf_len = sizeof(session_ctx->buf);
-            size_t out_len = 0;
-
-            *str_buf = '.';
-            *(str_buf + 1) = '\0';
-            out_len = 0;
-            tp = netsnmp_sprint_realloc_objid_tree(&str_bufp, &str_buf_len,
-                                                   &out_len, 0, &buf_over,
-                                                   vars->name,
-                                                   vars->name_length);
-
-            py_log_msg(DEBUG, "netsnmp_get: str_bufp: %s:%lu:%lu",
-                       str_bufp, str_buf_len, out_len);
-
-            /* clamp value */
-            str_buf[sizeof(session_ctx->buf) - 1] = '\0';
+            tp = __sprint_objid((char *) str_buf, sizeof(session_ctx->buf),
+                                vars->name, vars->name_length,
+                                getlabel_flag);
 
             type = __translate_asn_type(vars->type);
 
@@ -2193,7 +2996,8 @@ static PyObject *netsnmp_get(PyObject *self, PyObject *args)
                                        strlen(type_str));
 
             len = __snprint_value((char *) str_buf, sizeof(session_ctx->buf),
-                                  vars, tp, type, sprintval_flag);
+                                  vars, tp, type, sprintval_flag,
+                                  getlabel_flag);
             str_buf[len] = '\0';
             py_netsnmp_attr_set_string(varbind, "value",
                                        (char *) str_buf, len);
@@ -2216,11 +3020,6 @@ static PyObject *netsnmp_get(PyObject *self, PyObject *args)
         }
     }
 
-    /* Reset the library's behavior for numeric/symbolic OID's. */
-    netsnmp_ds_set_int(NETSNMP_DS_LIBRARY_ID,
-                       NETSNMP_DS_LIB_OID_OUTPUT_FORMAT,
-                       old_format);
-
 done:
     Py_XDECREF(sess_ptr);
     if (response)
@@ -2233,7 +3032,7 @@ done:
     {
         return NULL;
     }
-    return Py_None;
+    Py_RETURN_NONE;
 }
 
 static PyObject *netsnmp_getnext(PyObject *self, PyObject *args)
@@ -2257,15 +3056,10 @@ static PyObject *netsnmp_getnext(PyObject *self, PyObject *args)
     char type_str[MAX_TYPE_NAME_LEN];
     int status;
     u_char str_buf[STR_BUF_SIZE];
-    u_char *str_bufp = str_buf;
-    size_t str_buf_len = sizeof(str_buf);
-    size_t out_len = 0;
-    int buf_over = 0;
     char *tag;
     char *iid = NULL;
     int getlabel_flag = NO_FLAGS;
     int sprintval_flag = USE_BASIC;
-    int old_format;
     int best_guess;
     int retry_nosuch;
     int err_ind;
@@ -2293,6 +3087,7 @@ static PyObject *netsnmp_getnext(PyObject *self, PyObject *args)
 
         if (!session_ctx)
         {
+            error = 1;
             goto done;
         }
 
@@ -2395,8 +3190,16 @@ static PyObject *netsnmp_getnext(PyObject *self, PyObject *args)
             }
         }
 
+        if (__py_netsnmp_before_pdu(session, session_ctx) < 0)
+        {
+            error = 1;
+            snmp_free_pdu(pdu);
+            goto done;
+        }
+
         status = __send_sync_pdu(ss, pdu, &response, retry_nosuch, err_str,
                                  &err_num, &err_ind, invalid_oids);
+        __py_netsnmp_after_pdu(session);
 
         __py_netsnmp_update_session_errors(session, err_str, err_num, err_ind);
         if (status != 0)
@@ -2405,35 +3208,10 @@ static PyObject *netsnmp_getnext(PyObject *self, PyObject *args)
             goto done;
         }
 
-        /*
-        ** Set up for numeric or full OID's, if necessary.  Save the old
-        ** output format so that it can be restored when we finish -- this
-        ** is a library-wide global, and has to be set/restored for each
-        ** session.
-        */
-        old_format = netsnmp_ds_get_int(NETSNMP_DS_LIBRARY_ID,
-                                        NETSNMP_DS_LIB_OID_OUTPUT_FORMAT);
-
-        if (py_netsnmp_attr_long(session, "use_long_names"))
-        {
-            getlabel_flag |= USE_LONG_NAMES;
-
-            netsnmp_ds_set_int(NETSNMP_DS_LIBRARY_ID,
-                               NETSNMP_DS_LIB_OID_OUTPUT_FORMAT,
-                               NETSNMP_OID_OUTPUT_FULL);
-        }
-        /* Setting use_numeric forces use_long_names on so check for
-           use_numeric after use_long_names (above) to make sure the final
-           outcome of NETSNMP_DS_LIB_OID_OUTPUT_FORMAT is
-           NETSNMP_OID_OUTPUT_NUMERIC */
-        if (py_netsnmp_attr_long(session, "use_numeric"))
+        /* numeric OIDs are always rendered in full */
+        if (getlabel_flag & USE_NUMERIC_OIDS)
         {
             getlabel_flag |= USE_LONG_NAMES;
-            getlabel_flag |= USE_NUMERIC_OIDS;
-
-            netsnmp_ds_set_int(NETSNMP_DS_LIBRARY_ID,
-                               NETSNMP_DS_LIB_OID_OUTPUT_FORMAT,
-                               NETSNMP_OID_OUTPUT_NUMERIC);
         }
 
         /*
@@ -2473,14 +3251,9 @@ static PyObject *netsnmp_getnext(PyObject *self, PyObject *args)
 
             if (!no_such_name && PyObject_HasAttrString(varbind, "oid"))
             {
-                *str_buf = '.';
-                *(str_buf + 1) = '\0';
-                out_len = 0;
-                tp = netsnmp_sprint_realloc_objid_tree(&str_bufp, &str_buf_len,
-                                                       &out_len, 0, &buf_over,
-                                                       vars->name,
-                                                       vars->name_length);
-                str_buf[sizeof(str_buf) - 1] = '\0';
+                tp = __sprint_objid((char *) str_buf, sizeof(str_buf),
+                                    vars->name, vars->name_length,
+                                    getlabel_flag);
 
                 type = __translate_asn_type(vars->type);
 
@@ -2512,7 +3285,8 @@ static PyObject *netsnmp_getnext(PyObject *self, PyObject *args)
                                            strlen(type_str));
 
                 len = __snprint_value((char *) str_buf, sizeof(str_buf),
-                                      vars, tp, type, sprintval_flag);
+                                      vars, tp, type, sprintval_flag,
+                                      getlabel_flag);
                 str_buf[len] = '\0';
 
                 py_netsnmp_attr_set_string(varbind, "value", (char *) str_buf,
@@ -2548,11 +3322,6 @@ static PyObject *netsnmp_getnext(PyObject *self, PyObject *args)
                 vars = vars->next_variable;
             }
         }
-
-        /* Reset the library's behavior for numeric/symbolic OID's. */
-        netsnmp_ds_set_int(NETSNMP_DS_LIBRARY_ID,
-                           NETSNMP_DS_LIB_OID_OUTPUT_FORMAT,
-                           old_format);
     }
 
 done:
@@ -2573,7 +3342,7 @@ done:
     {
         return NULL;
     }
-    return Py_None;
+    Py_RETURN_NONE;
 }
 
 static PyObject *netsnmp_walk(PyObject *self, PyObject *args)
@@ -2581,6 +3350,7 @@ static PyObject *netsnmp_walk(PyObject *self, PyObject *args)
     PyObject *session = NULL;
     PyObject *sess_ptr = NULL;
     PyObject *varlist = NULL;
+    PyObject *start_varlist = NULL;
     PyObject *varlist_iter;
     PyObject *varbind;
     PyObject *varbinds  = NULL;
@@ -2598,25 +3368,18 @@ static PyObject *netsnmp_walk(PyObject *self, PyObject *args)
     ** somewhere in the Net-SNMP library
     */
     netsnmp_variable_list *vars;//, *oldvars;
-    struct tree *tp;
-    int len;
     oid **oid_arr = NULL;
     int *oid_arr_len = NULL;
     oid **oid_arr_broken_check = NULL;
     int *oid_arr_broken_check_len = NULL;
-    int type;
-    char type_str[MAX_TYPE_NAME_LEN];
+    oid *oid_buf;
+    oid *oid_broken_check_buf;
     int status;
     u_char str_buf[STR_BUF_SIZE];
-    u_char *str_bufp = str_buf;
-    size_t str_buf_len = sizeof(str_buf);
-    size_t out_len = 0;
-    int buf_over = 0;
     char *tag;
     char *iid = NULL;
     int getlabel_flag = NO_FLAGS;
     int sprintval_flag = USE_BASIC;
-    int old_format;
     int best_guess;
     int retry_nosuch;
     int err_ind;
@@ -2626,10 +3389,15 @@ static PyObject *netsnmp_walk(PyObject *self, PyObject *args)
     char *tmpstr;
     Py_ssize_t tmplen;
     int error = 0;
+    int check;
+    int abort_on_nonincreasing;
+    struct session_arena scratch;
+    struct session_arena *arena = NULL;
 
     if (args)
     {
-        if (!PyArg_ParseTuple(args, "OO", &session, &varlist))
+        if (!PyArg_ParseTuple(args, "OO|O", &session, &varlist,
+                              &start_varlist))
         {
             goto done;
         }
@@ -2639,6 +3407,11 @@ static PyObject *netsnmp_walk(PyObject *self, PyObject *args)
             goto done;
         }
 
+        if (start_varlist == Py_None)
+        {
+            start_varlist = NULL;
+        }
+
         if ((varbinds = PyObject_GetAttrString(varlist, "varbinds")) == NULL)
         {
             goto done;
@@ -2648,6 +3421,7 @@ static PyObject *netsnmp_walk(PyObject *self, PyObject *args)
 
         if (!session_ctx)
         {
+            error = 1;
             goto done;
         }
 
@@ -2679,6 +3453,8 @@ static PyObject *netsnmp_walk(PyObject *self, PyObject *args)
         }
         best_guess = py_netsnmp_attr_long(session, "best_guess");
         retry_nosuch = py_netsnmp_attr_long(session, "retry_no_such");
+        abort_on_nonincreasing = (
+            py_netsnmp_attr_long(session, "abort_on_nonincreasing") > 0);
 
         pdu = snmp_pdu_create(SNMP_MSG_GETNEXT);
 
@@ -2692,17 +3468,39 @@ static PyObject *netsnmp_walk(PyObject *self, PyObject *args)
         }
         Py_XDECREF(varlist_iter);
 
-        oid_arr_len              = calloc(varlist_len, sizeof(int));
-        oid_arr_broken_check_len = calloc(varlist_len, sizeof(int));
+        /* the working state of the walk is kept in the session's arena */
+        arena = __arena_acquire(
+            session_ctx, &scratch,
+            2 * (ARENA_ROUND(varlist_len * sizeof(int)) +
+                 ARENA_ROUND(varlist_len * sizeof(oid *)) +
+                 ARENA_ROUND(varlist_len * MAX_OID_LEN * sizeof(oid))));
+        if (!arena)
+        {
+            PyErr_NoMemory();
+            error = 1;
+            goto done;
+        }
+
+        oid_arr_len              = __arena_alloc(arena,
+                                                 varlist_len * sizeof(int));
+        oid_arr_broken_check_len = __arena_alloc(arena,
+                                                 varlist_len * sizeof(int));
+
+        oid_arr                  = __arena_alloc(arena,
+                                                 varlist_len * sizeof(oid *));
+        oid_arr_broken_check     = __arena_alloc(arena,
+                                                 varlist_len * sizeof(oid *));
 
-        oid_arr                  = calloc(varlist_len, sizeof(oid *));
-        oid_arr_broken_check     = calloc(varlist_len, sizeof(oid *));
+        oid_buf              = __arena_alloc(
+            arena, varlist_len * MAX_OID_LEN * sizeof(oid));
+        oid_broken_check_buf = __arena_alloc(
+            arena, varlist_len * MAX_OID_LEN * sizeof(oid));
 
         for (varlist_ind = 0; varlist_ind < varlist_len; varlist_ind++)
         {
-            oid_arr[varlist_ind] = calloc(MAX_OID_LEN, sizeof(oid));
-            oid_arr_broken_check[varlist_ind] = calloc(MAX_OID_LEN,
-                                                       sizeof(oid));
+            oid_arr[varlist_ind] = oid_buf + varlist_ind * MAX_OID_LEN;
+            oid_arr_broken_check[varlist_ind] =
+                oid_broken_check_buf + varlist_ind * MAX_OID_LEN;
 
             oid_arr_len[varlist_ind]              = MAX_OID_LEN;
             oid_arr_broken_check_len[varlist_ind] = MAX_OID_LEN;
@@ -2720,9 +3518,9 @@ static PyObject *netsnmp_walk(PyObject *self, PyObject *args)
             }
             else
             {
-                tp = __tag2oid(tag, iid,
-                               oid_arr[varlist_ind], &oid_arr_len[varlist_ind],
-                               NULL, best_guess);
+                __tag2oid(tag, iid,
+                          oid_arr[varlist_ind], &oid_arr_len[varlist_ind],
+                          NULL, best_guess);
             }
 
             if (oid_arr_len[varlist_ind])
@@ -2730,8 +3528,15 @@ static PyObject *netsnmp_walk(PyObject *self, PyObject *args)
                 py_log_msg(DEBUG, "netsnmp_walk: filling request: %s:%s:%d:%d",
                            tag, iid, oid_arr_len[varlist_ind], best_guess);
 
-                snmp_add_null_var(pdu, oid_arr[varlist_ind],
-                                  oid_arr_len[varlist_ind]);
+                /*
+                 * When resuming, the request is filled from start_varlist
+                 * below; the root OID is still needed to bound the walk.
+                 */
+                if (!start_varlist)
+                {
+                    snmp_add_null_var(pdu, oid_arr[varlist_ind],
+                                      oid_arr_len[varlist_ind]);
+                }
             }
             else
             {
@@ -2752,47 +3557,72 @@ static PyObject *netsnmp_walk(PyObject *self, PyObject *args)
 
         Py_XDECREF(varlist_iter);
 
-        if (PyErr_Occurred())
-        {
-            error = 1;
-            snmp_free_pdu(pdu);
-            pdu = NULL;
-            goto done;
-        }
-
         /*
-        ** Set up for numeric or full OID's, if necessary.  Save the old
-        ** output format so that it can be restored when we finish -- this
-        ** is a library-wide global, and has to be set/restored for each
-        ** session.
-        */
-        old_format = netsnmp_ds_get_int(NETSNMP_DS_LIBRARY_ID,
-                                        NETSNMP_DS_LIB_OID_OUTPUT_FORMAT);
-
-        if (py_netsnmp_attr_long(session, "use_long_names"))
+         * Resume a previously interrupted walk: the request starts at the
+         * last OID that was successfully retrieved while the subtree checks
+         * still use the original root OIDs.
+         */
+        varlist_iter = (start_varlist ? PyObject_GetIter(start_varlist) : NULL);
+        varlist_ind = 0;
+        while (varlist_iter && (varbind = PyIter_Next(varlist_iter)))
         {
-            getlabel_flag |= USE_LONG_NAMES;
-
-            netsnmp_ds_set_int(NETSNMP_DS_LIBRARY_ID,
-                               NETSNMP_DS_LIB_OID_OUTPUT_FORMAT,
-                               NETSNMP_OID_OUTPUT_FULL);
-        }
+            int start_oid_len = MAX_OID_LEN;
+            oid start_oid[MAX_OID_LEN];
 
-        /*
-        ** Setting use_numeric forces use_long_names on so check for
-        ** use_numeric after use_long_names (above) to make sure the final
-        ** outcome of NETSNMP_DS_LIB_OID_OUTPUT_FORMAT is
-        ** NETSNMP_OID_OUTPUT_NUMERIC
-        */
-        if (py_netsnmp_attr_long(session, "use_numeric"))
-        {
-            getlabel_flag |= USE_LONG_NAMES;
-            getlabel_flag |= USE_NUMERIC_OIDS;
+            if (varlist_ind >= varlist_len ||
+                py_netsnmp_attr_string(varbind, "oid", &tag, NULL) < 0 ||
+                py_netsnmp_attr_string(varbind, "oid_index", &iid, NULL) < 0)
+            {
+                start_oid_len = 0;
+            }
+            else
+            {
+                __tag2oid(tag, iid, start_oid, &start_oid_len, NULL,
+                          best_guess);
+            }
 
-            netsnmp_ds_set_int(NETSNMP_DS_LIBRARY_ID,
-                               NETSNMP_DS_LIB_OID_OUTPUT_FORMAT,
-                               NETSNMP_OID_OUTPUT_NUMERIC);
-        }
+            if (!start_oid_len)
+            {
+                PyErr_Format(EasySNMPUnknownObjectIDError,
+                             "unknown object id to resume from (%s)",
+                             (tag ? tag : "<null>"));
+                error = 1;
+                snmp_free_pdu(pdu);
+                pdu = NULL;
+                Py_DECREF(varlist_iter);
+                Py_DECREF(varbind);
+                goto done;
+            }
+
+            py_log_msg(DEBUG, "netsnmp_walk: resuming from: %s:%s", tag, iid);
+
+            snmp_add_null_var(pdu, start_oid, start_oid_len);
+            Py_DECREF(varbind);
+            varlist_ind++;
+        }
+
+        Py_XDECREF(varlist_iter);
+
+        if (start_varlist && varlist_ind != varlist_len)
+        {
+            PyErr_SetString(PyExc_ValueError,
+                            "the number of OIDs to resume from must match "
+                            "the number of OIDs being walked");
+        }
+
+        if (PyErr_Occurred())
+        {
+            error = 1;
+            snmp_free_pdu(pdu);
+            pdu = NULL;
+            goto done;
+        }
+
+        /* numeric OIDs are always rendered in full */
+        if (getlabel_flag & USE_NUMERIC_OIDS)
+        {
+            getlabel_flag |= USE_LONG_NAMES;
+        }
 
         /* delete the existing varbinds that we'll replace */
         PySequence_DelSlice(varbinds, 0, PySequence_Length(varbinds));
@@ -2818,8 +3648,16 @@ static PyObject *netsnmp_walk(PyObject *self, PyObject *args)
         }
 
         while (notdone) {
+            if (__py_netsnmp_before_pdu(session, session_ctx) < 0)
+            {
+                /* pdu is released when done */
+                error = 1;
+                goto done;
+            }
+
             status = __send_sync_pdu(ss, pdu, &response, retry_nosuch,
                                      err_str, &err_num, &err_ind, NULL);
+            __py_netsnmp_after_pdu(session);
             __py_netsnmp_update_session_errors(session, err_str, err_num,
                                                err_ind);
             if (status != 0)
@@ -2871,89 +3709,33 @@ static PyObject *netsnmp_walk(PyObject *self, PyObject *args)
                         break;
                     }
 
-                    if (snmp_oid_compare(vars->name, vars->name_length,
-                                         oid_arr_broken_check[varlist_ind],
-                                         oid_arr_broken_check_len[varlist_ind]) <= 0)
+                    /*
+                     * The agent must respond with an OID lexicographically
+                     * greater than the one requested; give up otherwise as
+                     * an infinite loop will result.
+                     */
+                    check = __check_oid_increasing(
+                        vars->name, vars->name_length,
+                        oid_arr_broken_check[varlist_ind],
+                        oid_arr_broken_check_len[varlist_ind],
+                        abort_on_nonincreasing);
+                    if (check <= 0)
                     {
-                        /*
-                           The agent responded with an illegal response
-                           as the returning OID was lexograghically less
-                           then or equal to the requested OID...
-                           We need to give up here because an infinite
-                           loop will result otherwise.
-
-                           XXX: this really should be an option to
-                           continue like the -Cc option to the snmpwalk
-                           application.
-                        */
+                        if (check < 0)
+                        {
+                            error = 1;
+                        }
                         notdone = 0;
                         break;
                     }
 
-                    varbind = py_netsnmp_construct_varbind();
-
-                    if (PyObject_HasAttrString(varbind, "oid"))
-                    {
-                        str_buf[0] = '.';
-                        str_buf[1] = '\0';
-                        out_len = 0;
-                        tp = netsnmp_sprint_realloc_objid_tree(&str_bufp,
-                                                               &str_buf_len,
-                                                               &out_len, 0,
-                                                               &buf_over,
-                                                               vars->name,
-                                                               vars->name_length);
-                        str_buf[sizeof(str_buf) - 1] = '\0';
-
-                        type = __translate_asn_type(vars->type);
-
-                        if (__is_leaf(tp))
-                        {
-                            getlabel_flag &= ~NON_LEAF_NAME;
-                            py_log_msg(DEBUG, "netsnmp_walk: is_leaf: %d", tp->type);
-                        }
-                        else
-                        {
-                            getlabel_flag |= NON_LEAF_NAME;
-                            py_log_msg(DEBUG, "netsnmp_walk: !is_leaf: %d", tp->type);
-                        }
-
-                        py_log_msg(DEBUG, "netsnmp_walk: str_buf: %s", str_buf);
-
-                        __get_label_iid((char *) str_buf, &tag, &iid,
-                                        getlabel_flag);
-
-                        py_log_msg(DEBUG,
-                                   "netsnmp_walk: filling response: %s:%s",
-                                   tag, iid);
-
-                        py_netsnmp_attr_set_string(varbind, "oid", tag,
-                                                   STRLEN(tag));
-                        py_netsnmp_attr_set_string(varbind, "oid_index", iid,
-                                                   STRLEN(iid));
-
-                        __get_type_str(type, type_str, 1);
-
-                        py_netsnmp_attr_set_string(varbind, "snmp_type",
-                                                   type_str, strlen(type_str));
-
-                        len = __snprint_value((char *) str_buf,
-                                              sizeof(str_buf), vars, tp,
-                                              type, sprintval_flag);
-                        str_buf[len] = '\0';
-
-                        py_netsnmp_attr_set_string(varbind, "value",
-                                                   (char *) str_buf, len);
-
-                        /* push the varbind onto the return varbinds */
-                        PyList_Append(varbinds, varbind);
-                    }
-                    else
+                    if (__add_decoded_varbind(&arena->decoded, vars) != SUCCESS)
                     {
-                        py_log_msg(DEBUG, "netsnmp_walk: bad varbind (%d)",
-                                   varlist_ind);
+                        PyErr_NoMemory();
+                        error = 1;
+                        notdone = 0;
+                        break;
                     }
-                    Py_XDECREF(varbind);
 
                     memcpy(oid_arr_broken_check[varlist_ind], vars->name,
                            sizeof(oid) * vars->name_length);
@@ -2962,6 +3744,15 @@ static PyObject *netsnmp_walk(PyObject *self, PyObject *args)
                     snmp_add_null_var(pdu, vars->name, vars->name_length);
                 }
 
+                /* including those retrieved before an error */
+                if (py_netsnmp_append_decoded(&arena->decoded, varbinds,
+                                              getlabel_flag, sprintval_flag,
+                                              (char *) str_buf,
+                                              sizeof(str_buf)) < 0)
+                {
+                    error = 1;
+                    notdone = 0;
+                }
             }
             if (response)
             {
@@ -2970,12 +3761,6 @@ static PyObject *netsnmp_walk(PyObject *self, PyObject *args)
             }
         }
 
-        /* Reset the library's behavior for numeric/symbolic OIDs. */
-        netsnmp_ds_set_int(NETSNMP_DS_LIBRARY_ID,
-                           NETSNMP_DS_LIB_OID_OUTPUT_FORMAT,
-                           old_format);
-
-
         if (PyErr_Occurred())
         {
             error = 1;
@@ -2983,17 +3768,12 @@ static PyObject *netsnmp_walk(PyObject *self, PyObject *args)
     }
 
 done:
-    Py_XDECREF(sess_ptr);
-    Py_XDECREF(varbinds);
-    SAFE_FREE(oid_arr_len);
-    SAFE_FREE(oid_arr_broken_check_len);
-    for (varlist_ind = 0; varlist_ind < varlist_len; varlist_ind++)
+    if (arena)
     {
-        SAFE_FREE(oid_arr[varlist_ind]);
-        SAFE_FREE(oid_arr_broken_check[varlist_ind]);
+        __arena_release(session_ctx, arena);
     }
-    SAFE_FREE(oid_arr);
-    SAFE_FREE(oid_arr_broken_check);
+    Py_XDECREF(sess_ptr);
+    Py_XDECREF(varbinds);
     if (pdu)
     {
         snmp_free_pdu(pdu);
@@ -3003,7 +3783,7 @@ done:
     {
         return NULL;
     }
-    return Py_None;
+    Py_RETURN_NONE;
 }
 
 static PyObject *netsnmp_getbulk(PyObject *self, PyObject *args)
@@ -3016,29 +3796,19 @@ static PyObject *netsnmp_getbulk(PyObject *self, PyObject *args)
     PyObject *varbinds = NULL;
     PyObject *varbind;
     PyObject *varbinds_iter;
-    int varbind_ind;
     struct session_capsule_ctx *session_ctx = NULL;
     netsnmp_session *ss;
     netsnmp_pdu *pdu = NULL;
     netsnmp_pdu *response = NULL;
     netsnmp_variable_list *vars;
-    struct tree *tp;
-    int len;
     oid *oid_arr;
     int oid_arr_len = MAX_OID_LEN;
-    int type;
-    char type_str[MAX_TYPE_NAME_LEN];
     int status;
     u_char str_buf[STR_BUF_SIZE];
-    u_char *str_bufp = str_buf;
-    size_t str_buf_len = sizeof(str_buf);
-    size_t out_len = 0;
-    int buf_over = 0;
     char *tag;
     char *iid;
     int getlabel_flag = NO_FLAGS;
     int sprintval_flag = USE_BASIC;
-    int old_format;
     int best_guess;
     int retry_nosuch;
     int err_ind;
@@ -3047,6 +3817,8 @@ static PyObject *netsnmp_getbulk(PyObject *self, PyObject *args)
     char *tmpstr;
     Py_ssize_t tmplen;
     int error = 0;
+    struct session_arena scratch;
+    struct session_arena *arena = NULL;
 
     oid_arr = calloc(MAX_OID_LEN, sizeof(oid));
 
@@ -3066,11 +3838,20 @@ static PyObject *netsnmp_getbulk(PyObject *self, PyObject *args)
 
             if (!session_ctx)
             {
+                error = 1;
                 goto done;
             }
 
             ss = session_ctx->handle;
 
+            /* decode the response in the session's arena */
+            if (!(arena = __arena_acquire(session_ctx, &scratch, 0)))
+            {
+                PyErr_NoMemory();
+                error = 1;
+                goto done;
+            }
+
             if (py_netsnmp_attr_string(session, "error_string", &tmpstr, &tmplen) < 0)
             {
                 goto done;
@@ -3114,8 +3895,8 @@ static PyObject *netsnmp_getbulk(PyObject *self, PyObject *args)
                 }
                 else
                 {
-                    tp = __tag2oid(tag, iid, oid_arr, &oid_arr_len, NULL,
-                                   best_guess);
+                    __tag2oid(tag, iid, oid_arr, &oid_arr_len, NULL,
+                              best_guess);
                 }
 
                 if (oid_arr_len)
@@ -3139,7 +3920,8 @@ static PyObject *netsnmp_getbulk(PyObject *self, PyObject *args)
 
             Py_XDECREF(varbinds_iter);
 
-            if (PyErr_Occurred())
+            if (PyErr_Occurred() ||
+                __py_netsnmp_before_pdu(session, session_ctx) < 0)
             {
                 error = 1;
                 snmp_free_pdu(pdu);
@@ -3149,6 +3931,7 @@ static PyObject *netsnmp_getbulk(PyObject *self, PyObject *args)
 
             status = __send_sync_pdu(ss, pdu, &response, retry_nosuch,
                                      err_str, &err_num, &err_ind, NULL);
+            __py_netsnmp_after_pdu(session);
             __py_netsnmp_update_session_errors(session, err_str, err_num,
                                                err_ind);
             if (status != 0)
@@ -3162,37 +3945,10 @@ static PyObject *netsnmp_getbulk(PyObject *self, PyObject *args)
                 goto done;
             }
 
-            /*
-             * Set up for numeric or full OID's, if necessary.  Save the old
-             * output format so that it can be restored when we finish -- this
-             * is a library-wide global, and has to be set/restored for each
-             * session.
-             */
-            old_format = netsnmp_ds_get_int(NETSNMP_DS_LIBRARY_ID,
-                                            NETSNMP_DS_LIB_OID_OUTPUT_FORMAT);
-
-            if (py_netsnmp_attr_long(session, "use_long_names"))
-            {
-                getlabel_flag |= USE_LONG_NAMES;
-
-                netsnmp_ds_set_int(NETSNMP_DS_LIBRARY_ID,
-                                   NETSNMP_DS_LIB_OID_OUTPUT_FORMAT,
-                                   NETSNMP_OID_OUTPUT_FULL);
-            }
-            /*
-             * Setting use_numeric forces use_long_names on so check for
-             * use_numeric after use_long_names (above) to make sure the final
-             * outcome of NETSNMP_DS_LIB_OID_OUTPUT_FORMAT is
-             *  NETSNMP_OID_OUTPUT_NUMERIC
-             */
-            if (py_netsnmp_attr_long(session, "use_numeric"))
+            /* numeric OIDs are always rendered in full */
+            if (getlabel_flag & USE_NUMERIC_OIDS)
             {
                 getlabel_flag |= USE_LONG_NAMES;
-                getlabel_flag |= USE_NUMERIC_OIDS;
-
-                netsnmp_ds_set_int(NETSNMP_DS_LIBRARY_ID,
-                                   NETSNMP_DS_LIB_OID_OUTPUT_FORMAT,
-                                   NETSNMP_OID_OUTPUT_NUMERIC);
             }
 
             if(response && response->variables)
@@ -3213,86 +3969,27 @@ static PyObject *netsnmp_getbulk(PyObject *self, PyObject *args)
                     goto done;
                 }
 
-                for (vars = response->variables, varbind_ind=0;
-                     vars;
-                     vars = vars->next_variable, varbind_ind++)
+                for (vars = response->variables; vars;
+                     vars = vars->next_variable)
                 {
-
-                    varbind = py_netsnmp_construct_varbind();
-
-                    if (PyObject_HasAttrString(varbind, "oid"))
-                    {
-                        *str_buf = '.';
-                        *(str_buf + 1) = '\0';
-                        out_len = 0;
-                        buf_over = 0;
-                        str_bufp = str_buf;
-                        tp = netsnmp_sprint_realloc_objid_tree(&str_bufp,
-                                                               &str_buf_len,
-                                                               &out_len, 0,
-                                                               &buf_over,
-                                                               vars->name,
-                                                               vars->name_length);
-                        str_buf[sizeof(str_buf) - 1] = '\0';
-
-                        type = __translate_asn_type(vars->type);
-
-                        if (__is_leaf(tp))
-                        {
-                            getlabel_flag &= ~NON_LEAF_NAME;
-                            py_log_msg(DEBUG, "netsnmp_getbulk: is_leaf: %d", tp->type);
-                        }
-                        else
-                        {
-                            getlabel_flag |= NON_LEAF_NAME;
-                            py_log_msg(DEBUG, "netsnmp_getbulk: !is_leaf: %d", tp->type);
-                        }
-
-                        py_log_msg(DEBUG, "netsnmp_getbulk: str_buf: %s", str_buf);
-
-
-                        __get_label_iid((char *) str_buf, &tag, &iid,
-                                        getlabel_flag);
-
-                        py_netsnmp_attr_set_string(varbind, "oid", tag,
-                                                   STRLEN(tag));
-                        py_netsnmp_attr_set_string(varbind, "oid_index", iid,
-                                                   STRLEN(iid));
-
-                        __get_type_str(type, type_str, 1);
-
-                        py_netsnmp_attr_set_string(varbind, "snmp_type",
-                                                   type_str, strlen(type_str));
-
-                        len = __snprint_value((char *) str_buf,
-                                              sizeof(str_buf), vars, tp, type,
-                                              sprintval_flag);
-                        str_buf[len] = '\0';
-
-                        py_netsnmp_attr_set_string(varbind, "value",
-                                                   (char *) str_buf, len);
-
-                        /* push varbind onto varbinds */
-                        PyList_Append(varbinds, varbind);
-                    }
-                    else
+                    if (__add_decoded_varbind(&arena->decoded, vars) != SUCCESS)
                     {
-                        PyObject *none = Py_BuildValue(""); /* new ref */
-                        /* not sure why making vabind failed - should not happen */
-                        PyList_Append(varbinds, none); /* increments ref */
-                        /* Return None for this variable. */
-                        Py_DECREF(none);
+                        PyErr_NoMemory();
+                        error = 1;
+                        break;
                     }
+                }
 
-                    Py_XDECREF(varbind);
+                if (!error &&
+                    py_netsnmp_append_decoded(&arena->decoded, varbinds,
+                                              getlabel_flag, sprintval_flag,
+                                              (char *) str_buf,
+                                              sizeof(str_buf)) < 0)
+                {
+                    error = 1;
                 }
             }
 
-            /* Reset the library's behavior for numeric/symbolic OID's. */
-            netsnmp_ds_set_int(NETSNMP_DS_LIBRARY_ID,
-                               NETSNMP_DS_LIB_OID_OUTPUT_FORMAT,
-                               old_format);
-
             if (response)
             {
                 snmp_free_pdu(response);
@@ -3309,6 +4006,10 @@ static PyObject *netsnmp_getbulk(PyObject *self, PyObject *args)
     }
 
 done:
+    if (arena)
+    {
+        __arena_release(session_ctx, arena);
+    }
     Py_XDECREF(varbinds);
     Py_XDECREF(sess_ptr);
     SAFE_FREE(oid_arr);
@@ -3316,445 +4017,2111 @@ done:
     {
         return NULL;
     }
-    return Py_None;
+    Py_RETURN_NONE;
 }
 
-static PyObject *netsnmp_bulkwalk(PyObject *self, PyObject *args) {
-    PyObject *session = NULL;
-    PyObject *sess_ptr = NULL;
-    PyObject *varlist = NULL;
-    PyObject *varlist_iter = NULL;
-    PyObject *varbind = NULL;
-    PyObject *varbinds = NULL;
-    int varlist_len = 0;
-    int varlist_ind;
-
-    struct session_capsule_ctx *session_ctx = NULL;
-    netsnmp_session *ss = NULL;
-    netsnmp_pdu *pdu = NULL;
-    netsnmp_pdu *response = NULL;
-    netsnmp_variable_list *vars = NULL;
-
-    struct tree *tp = NULL;
-    int len;
-    oid **oid_arr = NULL;
-    int *oid_arr_len = NULL;
-    //char **initial_oid_str_arr = NULL;
-    char **oid_str_arr = NULL;
-    char **oid_idx_str_arr = NULL;
-    int type;
-    char type_str[MAX_TYPE_NAME_LEN];
-    int status;
-    u_char str_buf[STR_BUF_SIZE];
-    u_char *str_bufp = str_buf;
-    size_t str_buf_len = sizeof(str_buf);
-    size_t out_len = 0;
-    int buf_over = 0;
-    int getlabel_flag = NO_FLAGS;
-    int sprintval_flag = USE_BASIC;
-    int old_format;
-    int best_guess;
-    int retry_nosuch;
-    int err_ind;
-    int err_num;
-    char err_str[STR_BUF_SIZE];
-    int notdone = 1;
-    char *tmpstr = NULL;
-    Py_ssize_t tmplen;
-    int error = 0;
-    int nonrepeaters;
-    int maxrepetitions;
-
-    py_log_msg(DEBUG, "netsnmp_bulkwalk: Starting");
+/*
+ * Appends an OID given as a string or a tuple of integers to a request.
+ *
+ * @return 0, or -1 with an exception set
+ */
+static int __add_request_oid(netsnmp_pdu *pdu, PyObject *item, oid *oid_arr,
+                             int best_guess)
+{
+    PyObject *tag_bytes = NULL;
+    PyObject *subid;
+    char *tag;
+    char *label;
+    char *iid;
+    int oid_arr_len = 0;
+    Py_ssize_t subid_ind;
 
-    if (args)
+    if (PyTuple_Check(item))
     {
-        if (!PyArg_ParseTuple(args, "OiiO", &session, &nonrepeaters,
-                              &maxrepetitions, &varlist))
+        if (PyTuple_GET_SIZE(item) < 1 ||
+            PyTuple_GET_SIZE(item) > MAX_OID_LEN)
         {
-            goto done;
+            PyErr_Format(PyExc_ValueError,
+                         "OIDs must have between 1 and %d sub-identifiers",
+                         MAX_OID_LEN);
+            return -1;
         }
-
-        py_log_msg(DEBUG, "netsnmp_bulkwalk: nonreps (%d) max_reps (%d)",
-                   nonrepeaters, maxrepetitions);
-
-        if (!varlist)
+        for (subid_ind = 0; subid_ind < PyTuple_GET_SIZE(item); subid_ind++)
         {
-            goto done;
+            subid = PyTuple_GET_ITEM(item, subid_ind);
+            oid_arr[subid_ind] = PyLong_AsUnsignedLong(subid);
+            if (PyErr_Occurred())
+            {
+                return -1;
+            }
         }
-
-        if ((varbinds = PyObject_GetAttrString(varlist, "varbinds")) == NULL)
+        oid_arr_len = (int) PyTuple_GET_SIZE(item);
+    }
+    else
+    {
+        if (PyUnicode_Check(item))
         {
-            goto done;
+            tag_bytes = PyUnicode_AsEncodedString(item, "latin-1",
+                                                  "surrogateescape");
+            if (!tag_bytes)
+            {
+                return -1;
+            }
         }
-
-        sess_ptr = PyObject_GetAttrString(session, "sess_ptr");
-        session_ctx = get_session_handle_from_capsule(sess_ptr);
-
-        if (!session_ctx)
+        else if (PyBytes_Check(item))
         {
-            goto done;
+            Py_INCREF(item);
+            tag_bytes = item;
         }
-
-        ss = session_ctx->handle;
-
-        if (py_netsnmp_attr_string(session, "error_string", &tmpstr, &tmplen) < 0)
+        else
         {
-            goto done;
+            PyErr_SetString(PyExc_TypeError,
+                            "OIDs must be strings or tuples of integers");
+            return -1;
         }
-        memcpy(&err_str, tmpstr, tmplen);
-        err_num = py_netsnmp_attr_long(session, "error_number");
-        err_ind = py_netsnmp_attr_long(session, "error_index");
 
-        if (py_netsnmp_attr_long(session, "use_long_names"))
+        tag = PyBytes_AS_STRING(tag_bytes);
+        if (!strcmp(tag, "."))
         {
-            getlabel_flag |= USE_LONG_NAMES;
+            /* OID . is iso, as in build_varlist() */
+            __tag2oid("iso", NULL, oid_arr, &oid_arr_len, NULL, best_guess);
         }
-        if (py_netsnmp_attr_long(session, "use_numeric"))
+        else if (__is_numeric_oid(tag))
         {
-            getlabel_flag |= USE_NUMERIC_OIDS;
+            __tag2oid(tag, NULL, oid_arr, &oid_arr_len, NULL, best_guess);
         }
-        if (py_netsnmp_attr_long(session, "use_enums"))
+        else
         {
-            sprintval_flag = USE_ENUMS;
+            /*
+             * Split a symbolic OID from its index (e.g. sysDescr.0) at the
+             * first dot followed by a digit, as normalize_oid() does
+             */
+            for (iid = tag + 1; *iid; iid++)
+            {
+                if (iid[0] == '.' && isdigit((unsigned char) iid[1]))
+                {
+                    break;
+                }
+            }
+            label = PyMem_Malloc(iid - tag + 1);
+            if (!label)
+            {
+                PyErr_NoMemory();
+                Py_DECREF(tag_bytes);
+                return -1;
+            }
+            memcpy(label, tag, iid - tag);
+            label[iid - tag] = '\0';
+            __tag2oid(label, *iid ? iid + 1 : NULL, oid_arr, &oid_arr_len,
+                      NULL, best_guess);
+            PyMem_Free(label);
         }
-        if (py_netsnmp_attr_long(session, "use_sprint_value"))
+        if (!oid_arr_len)
         {
-            sprintval_flag = USE_SPRINT_VALUE;
+            PyErr_Format(EasySNMPUnknownObjectIDError,
+                         "unknown object id (%s)", tag);
+            Py_DECREF(tag_bytes);
+            return -1;
         }
+        Py_DECREF(tag_bytes);
+    }
 
-        best_guess = py_netsnmp_attr_long(session, "best_guess");
-        retry_nosuch = py_netsnmp_attr_long(session, "retry_no_such");
-
-        /* we need an initial count for memory allocation */
-        varlist_iter = PyObject_GetIter(varlist);
-        varlist_len = 0;
-        while (varlist_iter && (varbind = PyIter_Next(varlist_iter)))
-        {
-            varlist_len++;
-            Py_DECREF(varbind);
-        }
-        Py_XDECREF(varlist_iter);
+    snmp_add_null_var(pdu, oid_arr, oid_arr_len);
+    return 0;
+}
 
-        oid_arr_len = calloc(varlist_len, sizeof(int));
-        oid_arr = calloc(varlist_len, sizeof(oid *));
+/*
+ * Performs a GET, GETNEXT or GETBULK request of OIDs given as strings or
+ * tuples of integers, returning a new list of SNMPVariables.  Unlike
+ * netsnmp_get() and friends, no SNMPVariable is created for the OIDs
+ * requested.
+ *
+ * In SNMPv1, OIDs the agent reports as invalid are returned as variables
+ * of the OID requested with NOSUCHNAME as their type and value.
+ */
+static PyObject *__request_oids(PyObject *session, PyObject *oids,
+                                int command, int nonrepeaters,
+                                int maxrepetitions)
+{
+    PyObject *sess_ptr = NULL;
+    PyObject *oids_seq = NULL;
+    PyObject *varbinds = NULL;
+    PyObject *varbind;
+    struct session_capsule_ctx *session_ctx = NULL;
+    netsnmp_session *ss;
+    netsnmp_pdu *pdu = NULL;
+    netsnmp_pdu *request = NULL;
+    netsnmp_pdu *response = NULL;
+    netsnmp_variable_list *vars;
+    netsnmp_variable_list *request_vars;
+    netsnmp_variable_list *queued_vars;
+    struct session_arena scratch;
+    struct session_arena *arena = NULL;
+    bitarray *invalid_oids = NULL;
+    Py_ssize_t oids_len;
+    Py_ssize_t oids_ind;
+    int getlabel_flag = NO_FLAGS;
+    int sprintval_flag = USE_BASIC;
+    int best_guess;
+    int retry_nosuch;
+    int err_ind;
+    int err_num;
+    int status;
+    char *tmpstr;
+    Py_ssize_t tmplen;
+    unsigned long snmp_version;
+    int error = 0;
+
+    if (PyUnicode_Check(oids) || PyBytes_Check(oids))
+    {
+        PyErr_SetString(PyExc_TypeError, "OIDs must be a list or tuple");
+        error = 1;
+        goto done;
+    }
+    oids_seq = PySequence_Fast(oids, "OIDs must be a list or tuple");
+    if (!oids_seq)
+    {
+        error = 1;
+        goto done;
+    }
+    oids_len = PySequence_Fast_GET_SIZE(oids_seq);
+
+    sess_ptr = PyObject_GetAttrString(session, "sess_ptr");
+    session_ctx = get_session_handle_from_capsule(sess_ptr);
+    if (!session_ctx)
+    {
+        error = 1;
+        goto done;
+    }
+    ss = session_ctx->handle;
+
+    /* decode the response in the session's arena */
+    if (!(arena = __arena_acquire(session_ctx, &scratch, 0)))
+    {
+        PyErr_NoMemory();
+        error = 1;
+        goto done;
+    }
+
+    snmp_version = py_netsnmp_attr_long(session, "version");
+
+    if (py_netsnmp_attr_string(session, "error_string", &tmpstr, &tmplen) < 0)
+    {
+        error = 1;
+        goto done;
+    }
+
+    if (py_netsnmp_attr_long(session, "use_long_names"))
+    {
+        getlabel_flag |= USE_LONG_NAMES;
+    }
+    if (py_netsnmp_attr_long(session, "use_numeric"))
+    {
+        /* numeric OIDs are always rendered in full */
+        getlabel_flag |= USE_NUMERIC_OIDS | USE_LONG_NAMES;
+    }
+    if (py_netsnmp_attr_long(session, "use_enums"))
+    {
+        sprintval_flag = USE_ENUMS;
+    }
+    if (py_netsnmp_attr_long(session, "use_sprint_value"))
+    {
+        sprintval_flag = USE_SPRINT_VALUE;
+    }
+    best_guess = py_netsnmp_attr_long(session, "best_guess");
+    retry_nosuch = py_netsnmp_attr_long(session, "retry_no_such");
+
+    pdu = snmp_pdu_create(command);
+    if (command == SNMP_MSG_GETBULK)
+    {
+        pdu->non_repeaters = nonrepeaters;
+        pdu->max_repetitions = maxrepetitions;
+    }
+
+    for (oids_ind = 0; oids_ind < oids_len; oids_ind++)
+    {
+        if (__add_request_oid(pdu, PySequence_Fast_GET_ITEM(oids_seq,
+                                                           oids_ind),
+                              session_ctx->oid_arr, best_guess) < 0)
+        {
+            error = 1;
+            goto done;
+        }
+    }
+
+    /* invalid OIDs are only singled out in SNMPv1 */
+    if (snmp_version == 1 && command != SNMP_MSG_GETBULK)
+    {
+        invalid_oids = session_ctx->invalid_oids;
+        bitarray_clear_bits(invalid_oids, (size_t) oids_len);
+        request = snmp_clone_pdu(pdu);
+        if (!request)
+        {
+            PyErr_NoMemory();
+            error = 1;
+            goto done;
+        }
+    }
+
+    if (__py_netsnmp_before_pdu(session, session_ctx) < 0)
+    {
+        error = 1;
+        goto done;
+    }
+
+    status = __send_sync_pdu(ss, pdu, &response, retry_nosuch,
+                             session_ctx->err_str, &err_num, &err_ind,
+                             invalid_oids);
+    /* the request is freed by __send_sync_pdu */
+    pdu = NULL;
+    __py_netsnmp_after_pdu(session);
+
+    __py_netsnmp_update_session_errors(session, session_ctx->err_str,
+                                       err_num, err_ind);
+    if (status != 0)
+    {
+        error = 1;
+        goto done;
+    }
+
+    vars = response ? response->variables : NULL;
+    request_vars = request ? request->variables : NULL;
+    for (oids_ind = 0; command == SNMP_MSG_GETBULK || oids_ind < oids_len;
+         oids_ind++)
+    {
+        if (request && (!vars || bitarray_test_bit(invalid_oids, oids_ind)))
+        {
+            /* the OID requested stands in for the variable, see below */
+            bitarray_set_bit(invalid_oids, oids_ind);
+            queued_vars = request_vars;
+        }
+        else if (!vars)
+        {
+            break;
+        }
+        else
+        {
+            queued_vars = vars;
+            vars = vars->next_variable;
+        }
+        if (request_vars)
+        {
+            request_vars = request_vars->next_variable;
+        }
+
+        if (__add_decoded_varbind(&arena->decoded, queued_vars) != SUCCESS)
+        {
+            PyErr_NoMemory();
+            error = 1;
+            goto done;
+        }
+    }
+
+    varbinds = PyList_New(0);
+    if (!varbinds ||
+        py_netsnmp_append_decoded(&arena->decoded, varbinds, getlabel_flag,
+                                  sprintval_flag, (char *) session_ctx->buf,
+                                  sizeof(session_ctx->buf)) < 0)
+    {
+        error = 1;
+        goto done;
+    }
+
+    for (oids_ind = 0; request && oids_ind < oids_len; oids_ind++)
+    {
+        if (!bitarray_test_bit(invalid_oids, oids_ind))
+        {
+            continue;
+        }
+        varbind = PyList_GET_ITEM(varbinds, oids_ind);
+        if (py_netsnmp_attr_set_string(varbind, "snmp_type", "NOSUCHNAME",
+                                       strlen("NOSUCHNAME")) < 0 ||
+            py_netsnmp_attr_set_string(varbind, "value", "NOSUCHNAME",
+                                       strlen("NOSUCHNAME")) < 0)
+        {
+            error = 1;
+            goto done;
+        }
+    }
+
+done:
+    if (arena)
+    {
+        __arena_release(session_ctx, arena);
+    }
+    Py_XDECREF(oids_seq);
+    Py_XDECREF(sess_ptr);
+    if (pdu)
+    {
+        snmp_free_pdu(pdu);
+    }
+    if (request)
+    {
+        snmp_free_pdu(request);
+    }
+    if (response)
+    {
+        snmp_free_pdu(response);
+    }
+
+    if (error)
+    {
+        Py_XDECREF(varbinds);
+        return NULL;
+    }
+    return varbinds;
+}
+
+static PyObject *netsnmp_get_oids(PyObject *self, PyObject *args)
+{
+    PyObject *session;
+    PyObject *oids;
+
+    if (!PyArg_ParseTuple(args, "OO", &session, &oids))
+    {
+        return NULL;
+    }
+    return __request_oids(session, oids, SNMP_MSG_GET, 0, 0);
+}
+
+static PyObject *netsnmp_getnext_oids(PyObject *self, PyObject *args)
+{
+    PyObject *session;
+    PyObject *oids;
+
+    if (!PyArg_ParseTuple(args, "OO", &session, &oids))
+    {
+        return NULL;
+    }
+    return __request_oids(session, oids, SNMP_MSG_GETNEXT, 0, 0);
+}
+
+static PyObject *netsnmp_getbulk_oids(PyObject *self, PyObject *args)
+{
+    PyObject *session;
+    PyObject *oids;
+    int nonrepeaters;
+    int maxrepetitions;
+
+    if (!PyArg_ParseTuple(args, "OiiO", &session, &nonrepeaters,
+                          &maxrepetitions, &oids))
+    {
+        return NULL;
+    }
+    return __request_oids(session, oids, SNMP_MSG_GETBULK, nonrepeaters,
+                          maxrepetitions);
+}
+
+/*
+ * Record the raw value of a variable in the state of a change-only walk
+ * and compare it with its value in the state of the previous walk, so that
+ * unchanged variables may be skipped before any SNMPVariable is created
+ * for them. The state maps numeric OIDs to the variable's ASN type followed
+ * by its raw value.
+ *
+ * Returns 1 if the variable is new or changed (its key is then appended to
+ * changed_keys), 0 if it is unchanged or -1 with an exception set.
+ */
+static int __diff_varbind(netsnmp_variable_list *vars,
+                          PyObject *previous_state, PyObject *current_state,
+                          PyObject *changed_keys)
+{
+    char key_buf[STR_BUF_SIZE];
+    PyObject *key = NULL;
+    PyObject *value = NULL;
+    char *raw = NULL;
+    int changed = 1;
+
+    __sprint_num_objid(key_buf, vars->name, vars->name_length);
+    key = PyUnicode_Decode(key_buf, strlen(key_buf), "latin-1",
+                           "surrogateescape");
+    if (!key)
+    {
+        return -1;
+    }
+
+    value = PyDict_GetItem(previous_state, key);
+    if (value &&
+        PyBytes_GET_SIZE(value) == (Py_ssize_t) vars->val_len + 1 &&
+        PyBytes_AS_STRING(value)[0] == (char) vars->type &&
+        (!vars->val_len ||
+         memcmp(PyBytes_AS_STRING(value) + 1, vars->val.string,
+                vars->val_len) == 0))
+    {
+        /* share the previous walk's value rather than copying it */
+        Py_INCREF(value);
+        changed = 0;
+    }
+    else
+    {
+        value = PyBytes_FromStringAndSize(NULL, vars->val_len + 1);
+        if (!value)
+        {
+            Py_DECREF(key);
+            return -1;
+        }
+        raw = PyBytes_AS_STRING(value);
+        raw[0] = (char) vars->type;
+        if (vars->val_len)
+        {
+            memcpy(raw + 1, vars->val.string, vars->val_len);
+        }
+    }
+
+    if (PyDict_SetItem(current_state, key, value) < 0 ||
+        (changed && PyList_Append(changed_keys, key) < 0))
+    {
+        changed = -1;
+    }
+
+    Py_DECREF(key);
+    Py_DECREF(value);
+
+    return changed;
+}
+
+static PyObject *netsnmp_bulkwalk(PyObject *self, PyObject *args) {
+    PyObject *session = NULL;
+    PyObject *sess_ptr = NULL;
+    PyObject *varlist = NULL;
+    PyObject *varlist_iter = NULL;
+    PyObject *varbind = NULL;
+    PyObject *varbinds = NULL;
+    int varlist_len = 0;
+    int varlist_ind;
+
+    struct session_capsule_ctx *session_ctx = NULL;
+    netsnmp_session *ss = NULL;
+    netsnmp_pdu *pdu = NULL;
+    netsnmp_pdu *response = NULL;
+    netsnmp_variable_list *vars = NULL;
+
+    oid **oid_arr = NULL;
+    int *oid_arr_len = NULL;
+    //char **initial_oid_str_arr = NULL;
+    char **oid_str_arr = NULL;
+    char **oid_idx_str_arr = NULL;
+    oid *oid_buf;
+    int status;
+    u_char str_buf[STR_BUF_SIZE];
+    int getlabel_flag = NO_FLAGS;
+    int sprintval_flag = USE_BASIC;
+    int best_guess;
+    int retry_nosuch;
+    int err_ind;
+    int err_num;
+    char err_str[STR_BUF_SIZE];
+    int notdone = 1;
+    char *tmpstr = NULL;
+    Py_ssize_t tmplen;
+    int error = 0;
+    int nonrepeaters;
+    int maxrepetitions;
+    int check;
+    int abort_on_nonincreasing;
+    oid prev_oid[MAX_OID_LEN];
+    size_t prev_oid_len = 0;
+    PyObject *previous_state = NULL;
+    PyObject *current_state = NULL;
+    PyObject *changed_keys = NULL;
+    int changed;
+    struct session_arena scratch;
+    struct session_arena *arena = NULL;
+
+    py_log_msg(DEBUG, "netsnmp_bulkwalk: Starting");
+
+    if (args)
+    {
+        /*
+         * When given the states of a change-only walk, only variables
+         * which are new or changed since the previous walk are returned
+         */
+        if (!PyArg_ParseTuple(args, "OiiO|OOO", &session, &nonrepeaters,
+                              &maxrepetitions, &varlist, &previous_state,
+                              &current_state, &changed_keys))
+        {
+            goto done;
+        }
+
+        if (current_state == Py_None)
+        {
+            current_state = NULL;
+        }
+        if (current_state &&
+            (!previous_state || !PyDict_Check(previous_state) ||
+             !PyDict_Check(current_state) || !changed_keys ||
+             !PyList_Check(changed_keys)))
+        {
+            PyErr_SetString(PyExc_TypeError,
+                            "the states of a change-only walk must be dicts "
+                            "and the changed keys a list");
+            error = 1;
+            goto done;
+        }
+
+        py_log_msg(DEBUG, "netsnmp_bulkwalk: nonreps (%d) max_reps (%d)",
+                   nonrepeaters, maxrepetitions);
+
+        if (!varlist)
+        {
+            goto done;
+        }
+
+        if ((varbinds = PyObject_GetAttrString(varlist, "varbinds")) == NULL)
+        {
+            goto done;
+        }
+
+        sess_ptr = PyObject_GetAttrString(session, "sess_ptr");
+        session_ctx = get_session_handle_from_capsule(sess_ptr);
+
+        if (!session_ctx)
+        {
+            error = 1;
+            goto done;
+        }
+
+        ss = session_ctx->handle;
+
+        if (py_netsnmp_attr_string(session, "error_string", &tmpstr, &tmplen) < 0)
+        {
+            goto done;
+        }
+        memcpy(&err_str, tmpstr, tmplen);
+        err_num = py_netsnmp_attr_long(session, "error_number");
+        err_ind = py_netsnmp_attr_long(session, "error_index");
+
+        if (py_netsnmp_attr_long(session, "use_long_names"))
+        {
+            getlabel_flag |= USE_LONG_NAMES;
+        }
+        if (py_netsnmp_attr_long(session, "use_numeric"))
+        {
+            getlabel_flag |= USE_NUMERIC_OIDS;
+        }
+        if (py_netsnmp_attr_long(session, "use_enums"))
+        {
+            sprintval_flag = USE_ENUMS;
+        }
+        if (py_netsnmp_attr_long(session, "use_sprint_value"))
+        {
+            sprintval_flag = USE_SPRINT_VALUE;
+        }
+
+        best_guess = py_netsnmp_attr_long(session, "best_guess");
+        retry_nosuch = py_netsnmp_attr_long(session, "retry_no_such");
+        abort_on_nonincreasing = (
+            py_netsnmp_attr_long(session, "abort_on_nonincreasing") > 0);
+
+        /* we need an initial count for memory allocation */
+        varlist_iter = PyObject_GetIter(varlist);
+        varlist_len = 0;
+        while (varlist_iter && (varbind = PyIter_Next(varlist_iter)))
+        {
+            varlist_len++;
+            Py_DECREF(varbind);
+        }
+        Py_XDECREF(varlist_iter);
+
+        /* the working state of the walk is kept in the session's arena */
+        arena = __arena_acquire(
+            session_ctx, &scratch,
+            ARENA_ROUND(varlist_len * sizeof(int)) +
+            ARENA_ROUND(varlist_len * sizeof(oid *)) +
+            2 * ARENA_ROUND(varlist_len * sizeof(char *)) +
+            ARENA_ROUND(varlist_len * MAX_OID_LEN * sizeof(oid)));
+        if (!arena)
+        {
+            PyErr_NoMemory();
+            error = 1;
+            goto done;
+        }
+
+        oid_arr_len = __arena_alloc(arena, varlist_len * sizeof(int));
+        oid_arr = __arena_alloc(arena, varlist_len * sizeof(oid *));
         //initial_oid_str_arr = calloc(varlist_len, sizeof(char *));
-        oid_str_arr = calloc(varlist_len, sizeof(char *));
-        oid_idx_str_arr = calloc(varlist_len, sizeof(char *));
+        oid_str_arr = __arena_alloc(arena, varlist_len * sizeof(char *));
+        oid_idx_str_arr = __arena_alloc(arena, varlist_len * sizeof(char *));
+        oid_buf = __arena_alloc(arena,
+                                varlist_len * MAX_OID_LEN * sizeof(oid));
+
+        for (varlist_ind = 0; varlist_ind < varlist_len; varlist_ind++)
+        {
+            oid_arr[varlist_ind] = oid_buf + varlist_ind * MAX_OID_LEN;
+            oid_arr_len[varlist_ind] = MAX_OID_LEN;
+            oid_str_arr[varlist_ind] = NULL;
+            oid_idx_str_arr[varlist_ind] = NULL;
+        }
+
+        /* get the initial oids */
+        py_log_msg(DEBUG, "netsnmp_bulkwalk: Getting initial oids");
+        varlist_ind = 0;
+        varlist_iter = PyObject_GetIter(varlist);
+        while (varlist_iter && (varbind = PyIter_Next(varlist_iter)))
+        {
+            if (py_netsnmp_attr_string(varbind, "oid",
+                                       &oid_str_arr[varlist_ind],
+                                       NULL) >= 0 &&
+                py_netsnmp_attr_string(varbind, "oid_index",
+                                       &oid_idx_str_arr[varlist_ind],
+                                       NULL) >= 0
+            )
+            {
+
+                //initial_oid_str_arr[varlist_ind] = oid_str_arr[varlist_ind];
+
+                py_log_msg(DEBUG,
+                           "netsnmp_bulkwalk: Initial oid(%s) oid_idx(%s)",
+                           oid_str_arr[varlist_ind],
+                           oid_idx_str_arr[varlist_ind]);
+
+                // Get oid array len
+                __tag2oid(oid_str_arr[varlist_ind],
+                          oid_idx_str_arr[varlist_ind],
+                          oid_arr[varlist_ind],
+                          &oid_arr_len[varlist_ind], NULL, best_guess);
+            }
+            else
+            {
+                oid_arr_len[varlist_ind] = 0;
+            }
+
+            if (!oid_arr_len[varlist_ind])
+            {
+                PyErr_Format(EasySNMPUnknownObjectIDError,
+                             "unknown object id (%s)",
+                             (oid_str_arr[varlist_ind] ? oid_str_arr[varlist_ind] : "<null>"));
+                error = 1;
+                Py_DECREF(varbind);
+                Py_DECREF(varlist_iter);
+                goto done;
+            }
+
+            Py_DECREF(varbind);
+            varlist_ind++;
+        }
+
+        Py_XDECREF(varlist_iter);
+
+        if (PyErr_Occurred())
+        {
+            error = 1;
+            goto done;
+        }
+
+        /* numeric OIDs are always rendered in full */
+        if (getlabel_flag & USE_NUMERIC_OIDS)
+        {
+            getlabel_flag |= USE_LONG_NAMES;
+        }
+
+        /* delete the existing varbinds that we'll replace */
+        PySequence_DelSlice(varbinds, 0, PySequence_Length(varbinds));
+
+        if (PyErr_Occurred())
+        {
+            error = 1;
+            goto done;
+        }
+
+        py_log_msg(DEBUG, "netsnmp_bulkwalk: Starting bulk walk request");
+        for (varlist_ind = 0; varlist_ind < varlist_len; varlist_ind++)
+        {
+            pdu = snmp_pdu_create(SNMP_MSG_GETBULK);
+            pdu->non_repeaters = nonrepeaters;
+            pdu->max_repetitions = maxrepetitions;
+            snmp_add_null_var(pdu, oid_arr[varlist_ind], oid_arr_len[varlist_ind]);
+
+            /* each OID returned must follow the previous one */
+            memcpy(prev_oid, oid_arr[varlist_ind],
+                   oid_arr_len[varlist_ind] * sizeof(oid));
+            prev_oid_len = oid_arr_len[varlist_ind];
+
+            notdone = 1;
+            while (notdone)
+            {
+                if (__py_netsnmp_before_pdu(session, session_ctx) < 0)
+                {
+                    error = 1;
+                    snmp_free_pdu(pdu);
+                    pdu = NULL;
+                    goto done;
+                }
+
+                py_log_msg(DEBUG, "netsnmp_bulkwalk: Sending pdu req");
+                status = __send_sync_pdu(ss, pdu, &response, retry_nosuch,
+                                         err_str, &err_num, &err_ind, NULL);
+                __py_netsnmp_after_pdu(session);
+
+                __py_netsnmp_update_session_errors(session, err_str, err_num,
+                                                   err_ind);
+                if (status != 0) {
+                    error = 1;
+                    if (response)
+                    {
+                        snmp_free_pdu(response);
+                        response = NULL;
+                    }
+                    goto done;
+                }
+
+                if (!response ||
+                    !response->variables ||
+                    status != STAT_SUCCESS ||
+                    response->errstat != SNMP_ERR_NOERROR)
+                {
+                    notdone = 0;
+                }
+                else
+                {
+                    vars = (response ? response->variables : NULL);
+                    while (vars)
+                    {
+
+                        if ((vars->name_length < oid_arr_len[varlist_ind]) ||
+                            (memcmp(oid_arr[varlist_ind], vars->name,
+                                    oid_arr_len[varlist_ind] * sizeof(oid)) != 0))
+                        {
+                            py_log_msg(DEBUG,
+                                       "netsnmp_bulkwalk: encountered end condition "
+                                       "(next subtree iteration out of scope)");
+                            notdone = 0;
+                            break;
+                        }
+
+                        if ((vars->type == SNMP_ENDOFMIBVIEW) ||
+                            (vars->type == SNMP_NOSUCHOBJECT) ||
+                            (vars->type == SNMP_NOSUCHINSTANCE))
+                        {
+                            py_log_msg(DEBUG,
+                                      "netsnmp_bulkwalk: encountered end condition "
+                                      "(ENDOFMIBVIEW, NOSUCHOBJECT, NO SUCH "
+                                      "INSTANCE)");
+                            notdone = 0;
+                            break;
+                        }
+
+                        check = __check_oid_increasing(vars->name,
+                                                       vars->name_length,
+                                                       prev_oid, prev_oid_len,
+                                                       abort_on_nonincreasing);
+                        if (check <= 0)
+                        {
+                            py_log_msg(DEBUG,
+                                       "netsnmp_bulkwalk: encountered end condition "
+                                       "(non-increasing OID)");
+                            if (check < 0)
+                            {
+                                error = 1;
+                            }
+                            notdone = 0;
+                            break;
+                        }
+                        memcpy(prev_oid, vars->name,
+                               vars->name_length * sizeof(oid));
+                        prev_oid_len = vars->name_length;
+
+                        // Create next request if we've reached the end
+                        if (vars->next_variable == NULL) {
+                            pdu = snmp_pdu_create(SNMP_MSG_GETBULK);
+                            pdu->non_repeaters = nonrepeaters;
+                            pdu->max_repetitions = maxrepetitions;
+                            snmp_add_null_var(pdu, vars->name, vars->name_length);
+                        }
+
+                        if (current_state)
+                        {
+                            changed = __diff_varbind(vars, previous_state,
+                                                     current_state,
+                                                     changed_keys);
+                            if (changed < 0)
+                            {
+                                /* drop the next request created above */
+                                if (vars->next_variable == NULL)
+                                {
+                                    snmp_free_pdu(pdu);
+                                    pdu = NULL;
+                                }
+                                error = 1;
+                                notdone = 0;
+                                break;
+                            }
+                            if (!changed)
+                            {
+                                vars = vars->next_variable;
+                                continue;
+                            }
+                        }
+
+                        if (__add_decoded_varbind(&arena->decoded, vars) !=
+                            SUCCESS)
+                        {
+                            PyErr_NoMemory();
+                            error = 1;
+                            notdone = 0;
+                            break;
+                        }
+
+                        // Move on to next
+                        vars = vars->next_variable;
+                    }
+                    py_log_msg(DEBUG,
+                               "netsnmp_bulkwalk: Finished reading all "
+                               "variables for req");
+
+                    /* including those retrieved before an error */
+                    if (py_netsnmp_append_decoded(&arena->decoded, varbinds,
+                                                  getlabel_flag,
+                                                  sprintval_flag,
+                                                  (char *) str_buf,
+                                                  sizeof(str_buf)) < 0)
+                    {
+                        error = 1;
+                        notdone = 0;
+                    }
+                }
+
+                if (response)
+                {
+                    snmp_free_pdu(response);
+                    response = NULL;
+                }
+            }
+
+            if (error)
+            {
+                break;
+            }
+        }
+        py_log_msg(DEBUG, "netsnmp_bulkwalk: Ending bulk walk request");
+
+        if (PyErr_Occurred())
+        {
+            error = 1;
+        }
+    }
+
+done:
+    py_log_msg(DEBUG, "netsnmp_bulkwalk: Starting cleanup");
+    if (arena)
+    {
+        __arena_release(session_ctx, arena);
+    }
+    Py_XDECREF(varbinds);
+    Py_XDECREF(sess_ptr);
+    py_log_msg(DEBUG, "netsnmp_bulkwalk: End cleanup");
+
+    if (error)
+    {
+        return NULL;
+    }
+    Py_RETURN_NONE;
+}
+
+/*
+ * The types table indexes may be decoded into, see __decode_index().
+ */
+#define INDEX_INTEGER     (1)
+#define INDEX_IPADDR      (2)
+#define INDEX_OCTETSTR    (3)
+#define INDEX_OBJECTID    (4)
+#define INDEX_INETADDRESS (5)
+#define INDEX_MACADDR     (6)
+#define INDEX_PHYSADDR    (7)
+
+#define MAX_INDEX_PARTS   (16)
+
+struct index_part
+{
+    int type;
+    /* the last part of the index is IMPLIED (not length prefixed) */
+    int implied;
+    /* fixed size strings are not length prefixed either */
+    int fixed_len;
+};
+
+/*
+ * Parse an index schema given as a sequence of type names such as
+ * ('INTEGER', 'INETADDRESS') or ('IMPLIED OCTETSTR',); fixed size strings
+ * are given as e.g. 'OCTETSTR(6)'.
+ *
+ * Returns the number of parts or -1 with an exception set.
+ */
+static int __parse_index_schema(PyObject *schema, struct index_part *parts)
+{
+    PyObject *schema_iter;
+    PyObject *item;
+    PyObject *item_bytes;
+    char *name;
+    int num_parts = 0;
+
+    schema_iter = PyObject_GetIter(schema);
+    if (!schema_iter)
+    {
+        return -1;
+    }
+
+    while ((item = PyIter_Next(schema_iter)))
+    {
+        struct index_part *part = &parts[num_parts];
+
+        item_bytes = (PyUnicode_Check(item) ?
+                      PyUnicode_AsEncodedString(item, "latin-1", "strict") :
+                      NULL);
+        Py_DECREF(item);
+
+        if (!item_bytes || num_parts >= MAX_INDEX_PARTS)
+        {
+            Py_XDECREF(item_bytes);
+            Py_DECREF(schema_iter);
+            PyErr_SetString(PyExc_ValueError,
+                            "an index schema must be a sequence of at most "
+                            "16 type names");
+            return -1;
+        }
+
+        name = PyBytes_AsString(item_bytes);
+        memset(part, 0, sizeof(*part));
+
+        if (!strncmp(name, "IMPLIED ", 8))
+        {
+            part->implied = 1;
+            name += 8;
+        }
+
+        if (!strcmp(name, "INTEGER"))
+        {
+            part->type = INDEX_INTEGER;
+        }
+        else if (!strcmp(name, "IPADDR"))
+        {
+            part->type = INDEX_IPADDR;
+        }
+        else if (!strcmp(name, "OCTETSTR"))
+        {
+            part->type = INDEX_OCTETSTR;
+        }
+        else if (sscanf(name, "OCTETSTR(%d)", &part->fixed_len) == 1 &&
+                 part->fixed_len > 0)
+        {
+            part->type = INDEX_OCTETSTR;
+        }
+        else if (!strcmp(name, "OBJECTID"))
+        {
+            part->type = INDEX_OBJECTID;
+        }
+        else if (!strcmp(name, "INETADDRESS"))
+        {
+            part->type = INDEX_INETADDRESS;
+        }
+        else if (!strcmp(name, "MACADDR"))
+        {
+            part->type = INDEX_MACADDR;
+            part->fixed_len = 6;
+        }
+        else if (!strcmp(name, "PHYSADDR"))
+        {
+            part->type = INDEX_PHYSADDR;
+        }
+        else
+        {
+            PyErr_Format(PyExc_ValueError, "unknown index type (%s)",
+                         PyBytes_AsString(item_bytes));
+            Py_DECREF(item_bytes);
+            Py_DECREF(schema_iter);
+            return -1;
+        }
+
+        Py_DECREF(item_bytes);
+        num_parts++;
+    }
+
+    Py_DECREF(schema_iter);
+
+    if (PyErr_Occurred())
+    {
+        return -1;
+    }
+
+    return num_parts;
+}
+
+/*
+ * Work out the index schema of a table from the INDEX (or AUGMENTS) clause
+ * of its entry in the loaded MIBs.
+ *
+ * Returns the number of parts, or 0 if the table's entry is not known.
+ */
+static int __mib_index_schema(oid *table_oid, size_t table_oid_len,
+                              struct index_part *parts)
+{
+    oid entry_oid[MAX_OID_LEN];
+    struct tree *tp;
+    struct tree *index_tp;
+    struct index_list *index;
+    const char *tc;
+    int num_parts = 0;
+
+    if (table_oid_len + 1 > MAX_OID_LEN)
+    {
+        return 0;
+    }
+
+    memcpy(entry_oid, table_oid, table_oid_len * sizeof(oid));
+    entry_oid[table_oid_len] = 1;
+
+    tp = get_tree(entry_oid, table_oid_len + 1, get_tree_head());
+    if (!tp || tp->subid != 1 || !tp->parent ||
+        tp->parent->subid != table_oid[table_oid_len - 1])
+    {
+        return 0;
+    }
+
+    /* tables such as ifXTable share the index of the entry they augment */
+    if (!tp->indexes && tp->augments)
+    {
+        tp = find_tree_node(tp->augments, -1);
+    }
+
+    for (index = (tp ? tp->indexes : NULL);
+         index && num_parts < MAX_INDEX_PARTS;
+         index = index->next)
+    {
+        struct index_part *part = &parts[num_parts++];
+
+        memset(part, 0, sizeof(*part));
+        part->implied = index->isimplied;
+
+        index_tp = find_tree_node(index->ilabel, -1);
+        if (!index_tp)
+        {
+            return 0;
+        }
+
+        tc = (index_tp->tc_index >= 0 ?
+              get_tc_descriptor(index_tp->tc_index) : NULL);
+
+        switch (index_tp->type)
+        {
+            case TYPE_IPADDR:
+                part->type = INDEX_IPADDR;
+                break;
+
+            case TYPE_OCTETSTR:
+                if (tc && !strcmp(tc, "InetAddress"))
+                {
+                    part->type = INDEX_INETADDRESS;
+                }
+                else if (tc && !strcmp(tc, "MacAddress"))
+                {
+                    part->type = INDEX_MACADDR;
+                    part->fixed_len = 6;
+                }
+                else if (tc && !strcmp(tc, "PhysAddress"))
+                {
+                    part->type = INDEX_PHYSADDR;
+                }
+                else
+                {
+                    part->type = INDEX_OCTETSTR;
+                    /* SIZE (n) strings are not length prefixed */
+                    if (index_tp->ranges && !index_tp->ranges->next &&
+                        index_tp->ranges->low == index_tp->ranges->high)
+                    {
+                        part->fixed_len = index_tp->ranges->low;
+                    }
+                }
+                break;
+
+            case TYPE_OBJID:
+                part->type = INDEX_OBJECTID;
+                break;
+
+            default:
+                part->type = INDEX_INTEGER;
+                break;
+        }
+    }
+
+    return num_parts;
+}
+
+/*
+ * Decode the index of a table row (the sub-identifiers following the
+ * column) into a tuple according to an index schema.
+ *
+ * Returns a new tuple, or NULL without an exception set if the index does
+ * not match the schema.
+ */
+static PyObject *__decode_index(oid *index, size_t index_len,
+                                struct index_part *parts, int num_parts)
+{
+    PyObject *decoded;
+    PyObject *value = NULL;
+    char buf[STR_BUF_SIZE];
+    u_char octets[MAX_OID_LEN];
+    size_t pos = 0;
+    size_t len;
+    size_t i;
+    int part_ind;
+
+    decoded = PyTuple_New(num_parts);
+    if (!decoded)
+    {
+        return NULL;
+    }
+
+    for (part_ind = 0; part_ind < num_parts; part_ind++)
+    {
+        struct index_part *part = &parts[part_ind];
+
+        if (part->type == INDEX_INTEGER)
+        {
+            if (pos >= index_len)
+            {
+                goto malformed;
+            }
+            value = PyLong_FromUnsignedLong(index[pos++]);
+        }
+        else if (part->type == INDEX_IPADDR)
+        {
+            if (pos + 4 > index_len)
+            {
+                goto malformed;
+            }
+            snprintf(buf, sizeof(buf), "%lu.%lu.%lu.%lu",
+                     index[pos], index[pos + 1], index[pos + 2],
+                     index[pos + 3]);
+            pos += 4;
+            value = PyUnicode_FromString(buf);
+        }
+        else
+        {
+            /* the remaining types are variable length */
+            if (part->fixed_len)
+            {
+                len = part->fixed_len;
+            }
+            else if (part->implied)
+            {
+                len = index_len - pos;
+            }
+            else
+            {
+                if (pos >= index_len)
+                {
+                    goto malformed;
+                }
+                len = index[pos++];
+            }
+
+            /* agents' lengths are untrusted, so don't let them overflow */
+            if (len > index_len - pos)
+            {
+                goto malformed;
+            }
+            if (part->type != INDEX_OBJECTID && len > sizeof(octets))
+            {
+                goto malformed;
+            }
+
+            if (part->type == INDEX_OBJECTID)
+            {
+                __sprint_num_objid(buf, index + pos, len);
+                value = PyUnicode_FromString(buf);
+                pos += len;
+            }
+            else
+            {
+                for (i = 0; i < len; i++)
+                {
+                    if (index[pos + i] > 255)
+                    {
+                        goto malformed;
+                    }
+                    octets[i] = (u_char) index[pos + i];
+                }
+                pos += len;
+
+                if (part->type == INDEX_INETADDRESS &&
+                    (len == 4 || len == 16))
+                {
+                    inet_ntop((len == 4 ? AF_INET : AF_INET6), octets, buf,
+                              sizeof(buf));
+                    value = PyUnicode_FromString(buf);
+                }
+                else if (part->type == INDEX_OCTETSTR)
+                {
+                    value = PyUnicode_Decode((char *) octets, len, "latin-1",
+                                             "surrogateescape");
+                }
+                else
+                {
+                    /* addresses are shown as colon separated hex */
+                    buf[0] = '\0';
+                    for (i = 0; i < len; i++)
+                    {
+                        snprintf(buf + strlen(buf), sizeof(buf) - strlen(buf),
+                                 (i ? ":%02x" : "%02x"), octets[i]);
+                    }
+                    value = PyUnicode_FromString(buf);
+                }
+            }
+        }
+
+        if (!value)
+        {
+            Py_DECREF(decoded);
+            return NULL;
+        }
+
+        /* steals the reference */
+        PyTuple_SET_ITEM(decoded, part_ind, value);
+    }
+
+    if (pos != index_len)
+    {
+        goto malformed;
+    }
+
+    return decoded;
+
+malformed:
+    Py_DECREF(decoded);
+    return NULL;
+}
+
+/*
+ * interface.decode_index(oid_index, schema) decodes the dotted index of a
+ * walked variable (e.g. '1.4.10.0.0.1') according to an index schema.
+ */
+static PyObject *netsnmp_decode_index(PyObject *self, PyObject *args)
+{
+    char *oid_index;
+    PyObject *schema;
+    PyObject *decoded;
+    struct index_part parts[MAX_INDEX_PARTS];
+    int num_parts;
+    oid index[MAX_OID_LEN];
+    size_t index_len = MAX_OID_LEN;
+    size_t oid_len;
+    char *cp;
+
+    if (!PyArg_ParseTuple(args, "sO", &oid_index, &schema))
+    {
+        return NULL;
+    }
+
+    num_parts = __parse_index_schema(schema, parts);
+    if (num_parts < 0)
+    {
+        return NULL;
+    }
+
+    for (oid_len = 1, cp = oid_index; *cp; cp++)
+    {
+        oid_len += (*cp == '.');
+    }
+
+    if (!*oid_index)
+    {
+        index_len = 0;
+    }
+    else if (oid_len > MAX_OID_LEN ||
+             !__scan_num_objid(oid_index, index, &index_len))
+    {
+        PyErr_Format(PyExc_ValueError, "invalid index (%s)", oid_index);
+        return NULL;
+    }
+
+    decoded = __decode_index(index, index_len, parts, num_parts);
+    if (!decoded && !PyErr_Occurred())
+    {
+        PyErr_Format(PyExc_ValueError,
+                     "the index (%s) does not match the index schema",
+                     oid_index);
+    }
+
+    return decoded;
+}
+
+/*
+ * A single GETBULK (or GETNEXT) stream of a table walk; netsnmp_get_table
+ * requests one stream per column so that each response holds whole rows.
+ */
+struct table_stream
+{
+    oid root[MAX_OID_LEN];
+    size_t root_len;
+    oid last[MAX_OID_LEN];
+    size_t last_len;
+    int done;
+};
+
+static int __compare_subids(const void *a, const void *b)
+{
+    u_long subid_a = *(const u_long *)a;
+    u_long subid_b = *(const u_long *)b;
+
+    return (subid_a > subid_b) - (subid_a < subid_b);
+}
+
+/*
+ * Look up the accessible columns of a table in the loaded MIBs.
+ *
+ * Returns the number of columns stored in columns (sorted), or 0 if the
+ * table's entry is not known.
+ */
+static int __get_table_columns(oid *table_oid, size_t table_oid_len,
+                               u_long *columns, int max_columns)
+{
+    oid entry_oid[MAX_OID_LEN];
+    struct tree *tp;
+    int num_columns = 0;
 
-        for (varlist_ind = 0; varlist_ind < varlist_len; varlist_ind++)
+    if (table_oid_len + 1 > MAX_OID_LEN)
+    {
+        return 0;
+    }
+
+    memcpy(entry_oid, table_oid, table_oid_len * sizeof(oid));
+    entry_oid[table_oid_len] = 1;
+
+    tp = get_tree(entry_oid, table_oid_len + 1, get_tree_head());
+
+    /* get_tree returns the closest match; make sure it is the entry */
+    if (!tp || tp->subid != 1 || !tp->parent ||
+        tp->parent->subid != table_oid[table_oid_len - 1])
+    {
+        return 0;
+    }
+
+    for (tp = tp->child_list;
+         tp && num_columns < max_columns;
+         tp = tp->next_peer)
+    {
+        if (tp->access != MIB_ACCESS_NOACCESS)
         {
-            oid_arr[varlist_ind] = calloc(MAX_OID_LEN, sizeof(oid));
-            oid_arr_len[varlist_ind] = MAX_OID_LEN;
+            columns[num_columns++] = tp->subid;
         }
+    }
 
-        /* get the initial oids */
-        py_log_msg(DEBUG, "netsnmp_bulkwalk: Getting initial oids");
-        varlist_ind = 0;
-        varlist_iter = PyObject_GetIter(varlist);
-        while (varlist_iter && (varbind = PyIter_Next(varlist_iter)))
+    qsort(columns, num_columns, sizeof(u_long), __compare_subids);
+
+    return num_columns;
+}
+
+/*
+ * Create a column collected by get_table(as_arrays=True) starting with the
+ * type of its first variable: a list of [snmp_type, indexes, values,
+ * typecode, asn_type] where the values of integer columns are packed into
+ * a bytearray of native 64 bit integers (array typecode 'q' or 'Q') and
+ * those of other columns are a list of strings (typecode None).
+ */
+static PyObject *__new_table_column(netsnmp_variable_list *vars)
+{
+    char type_str[MAX_TYPE_NAME_LEN];
+    const char *typecode = NULL;
+
+    switch (vars->type)
+    {
+        case ASN_INTEGER:
+            typecode = "q";
+            break;
+
+        case ASN_COUNTER:
+        case ASN_GAUGE:
+        case ASN_TIMETICKS:
+        case ASN_COUNTER64:
+            typecode = "Q";
+            break;
+    }
+
+    __get_type_str(__translate_asn_type(vars->type), type_str, 0);
+
+    if (typecode)
+    {
+        return Py_BuildValue("[s[]Nsi]", type_str,
+                             PyByteArray_FromStringAndSize(NULL, 0),
+                             typecode, (int) vars->type);
+    }
+    return Py_BuildValue("[s[][]Oi]", type_str, Py_None, (int) vars->type);
+}
+
+/*
+ * Append the value of an integer variable to a bytearray of native 64 bit
+ * integers.
+ *
+ * Returns 0 on success or -1 with an exception set.
+ */
+static int __pack_integer(PyObject *values, netsnmp_variable_list *vars)
+{
+    union
+    {
+        uint64_t u;
+        int64_t s;
+    } packed;
+    Py_ssize_t size = PyByteArray_GET_SIZE(values);
+
+    switch (vars->type)
+    {
+        case ASN_COUNTER64:
+            packed.u = (((uint64_t) vars->val.counter64->high) << 32) |
+                       (vars->val.counter64->low & 0xffffffffUL);
+            break;
+
+        case ASN_INTEGER:
+            packed.s = *vars->val.integer;
+            break;
+
+        default:
+            packed.u = ((u_long) *vars->val.integer) & 0xffffffffUL;
+            break;
+    }
+
+    /* bytearrays over-allocate so appending stays amortised O(1) */
+    if (PyByteArray_Resize(values, size + sizeof(packed)) < 0)
+    {
+        return -1;
+    }
+    memcpy(PyByteArray_AS_STRING(values) + size, &packed, sizeof(packed));
+
+    return 0;
+}
+
+static PyObject *netsnmp_get_table(PyObject *self, PyObject *args)
+{
+    PyObject *session = NULL;
+    PyObject *sess_ptr = NULL;
+    PyObject *table_varlist = NULL;
+    PyObject *columns_varlist = NULL;
+    PyObject *index_schema = NULL;
+    PyObject *varlist_iter = NULL;
+    PyObject *varbind = NULL;
+    PyObject *rows = NULL;
+    PyObject *row = NULL;
+    PyObject *column_names = NULL;
+    PyObject *column_key = NULL;
+    PyObject *column_name = NULL;
+    PyObject *index = NULL;
+    PyObject *value = NULL;
+    PyObject *column_data = NULL;
+    PyObject *values = NULL;
+
+    struct session_capsule_ctx *session_ctx = NULL;
+    netsnmp_session *ss = NULL;
+    netsnmp_pdu *pdu = NULL;
+    netsnmp_pdu *response = NULL;
+    netsnmp_variable_list *vars = NULL;
+    struct tree *tp = NULL;
+
+    struct table_stream *streams = NULL;
+    int *active = NULL;
+    int num_streams = 0;
+    int num_active;
+    int stream_ind;
+    int var_ind;
+    u_long columns[MAX_OID_LEN];
+    int num_columns;
+    struct index_part index_parts[MAX_INDEX_PARTS];
+    int num_index_parts = -1;
+
+    oid table_oid[MAX_OID_LEN];
+    int table_oid_len = MAX_OID_LEN;
+    oid column_oid[MAX_OID_LEN];
+    int column_oid_len;
+    u_long column;
+
+    char *tag = NULL;
+    char *iid = NULL;
+    u_char *str_buf = NULL;
+    char index_buf[STR_BUF_SIZE];
+    int len;
+    int type;
+    int status;
+    int getlabel_flag = NO_FLAGS;
+    int sprintval_flag = USE_BASIC;
+    int best_guess;
+    int retry_nosuch;
+    int abort_on_nonincreasing;
+    int check;
+    int err_ind;
+    int err_num;
+    char err_str[STR_BUF_SIZE];
+    char *tmpstr;
+    Py_ssize_t tmplen;
+    int max_repetitions;
+    int use_getnext;
+    int as_arrays = 0;
+    int progress;
+    int error = 0;
+
+    if (!PyArg_ParseTuple(args, "OOOii|Oi", &session, &table_varlist,
+                          &columns_varlist, &max_repetitions, &use_getnext,
+                          &index_schema, &as_arrays))
+    {
+        return NULL;
+    }
+
+    if (index_schema == Py_None)
+    {
+        index_schema = NULL;
+    }
+
+    if (columns_varlist == Py_None)
+    {
+        columns_varlist = NULL;
+    }
+
+    sess_ptr = PyObject_GetAttrString(session, "sess_ptr");
+    session_ctx = get_session_handle_from_capsule(sess_ptr);
+
+    if (!session_ctx)
+    {
+        error = 1;
+        goto done;
+    }
+
+    ss = session_ctx->handle;
+    str_buf = session_ctx->buf;
+
+    if (py_netsnmp_attr_string(session, "error_string", &tmpstr, &tmplen) < 0)
+    {
+        error = 1;
+        goto done;
+    }
+    memcpy(&err_str, tmpstr, tmplen);
+    err_num = py_netsnmp_attr_long(session, "error_number");
+    err_ind = py_netsnmp_attr_long(session, "error_index");
+
+    if (py_netsnmp_attr_long(session, "use_long_names"))
+    {
+        getlabel_flag |= USE_LONG_NAMES;
+    }
+    if (py_netsnmp_attr_long(session, "use_numeric"))
+    {
+        getlabel_flag |= USE_LONG_NAMES;
+        getlabel_flag |= USE_NUMERIC_OIDS;
+    }
+    if (py_netsnmp_attr_long(session, "use_enums"))
+    {
+        sprintval_flag = USE_ENUMS;
+    }
+    if (py_netsnmp_attr_long(session, "use_sprint_value"))
+    {
+        sprintval_flag = USE_SPRINT_VALUE;
+    }
+    best_guess = py_netsnmp_attr_long(session, "best_guess");
+    retry_nosuch = py_netsnmp_attr_long(session, "retry_no_such");
+    abort_on_nonincreasing = (
+        py_netsnmp_attr_long(session, "abort_on_nonincreasing") > 0);
+
+    if (max_repetitions < 1)
+    {
+        max_repetitions = 1;
+    }
+
+    /* resolve the table OID */
+    varbind = PySequence_GetItem(table_varlist, 0);
+    if (varbind &&
+        py_netsnmp_attr_string(varbind, "oid", &tag, NULL) >= 0 &&
+        py_netsnmp_attr_string(varbind, "oid_index", &iid, NULL) >= 0)
+    {
+        __tag2oid(tag, iid, table_oid, &table_oid_len, NULL, best_guess);
+    }
+    else
+    {
+        table_oid_len = 0;
+    }
+
+    if (!table_oid_len)
+    {
+        if (!PyErr_Occurred())
         {
-            if (py_netsnmp_attr_string(varbind, "oid",
-                                       &oid_str_arr[varlist_ind],
-                                       NULL) >= 0 &&
-                py_netsnmp_attr_string(varbind, "oid_index",
-                                       &oid_idx_str_arr[varlist_ind],
-                                       NULL) >= 0
-            )
-            {
+            PyErr_Format(EasySNMPUnknownObjectIDError,
+                         "unknown object id (%s)", (tag ? tag : "<null>"));
+        }
+        Py_XDECREF(varbind);
+        error = 1;
+        goto done;
+    }
+    Py_DECREF(varbind);
 
-                //initial_oid_str_arr[varlist_ind] = oid_str_arr[varlist_ind];
+    if (table_oid_len + 2 >= MAX_OID_LEN)
+    {
+        PyErr_SetString(PyExc_ValueError, "table OID is too long");
+        error = 1;
+        goto done;
+    }
 
-                py_log_msg(DEBUG,
-                           "netsnmp_bulkwalk: Initial oid(%s) oid_idx(%s)",
-                           oid_str_arr[varlist_ind],
-                           oid_idx_str_arr[varlist_ind]);
+    /* rows are keyed by the raw dotted index unless a schema is given */
+    if (index_schema == Py_True)
+    {
+        num_index_parts = __mib_index_schema(table_oid, table_oid_len,
+                                             index_parts);
+        if (!num_index_parts)
+        {
+            PyErr_Format(PyExc_ValueError,
+                         "the index of %s is not defined in the loaded MIBs",
+                         tag);
+            error = 1;
+            goto done;
+        }
+    }
+    else if (index_schema)
+    {
+        num_index_parts = __parse_index_schema(index_schema, index_parts);
+        if (num_index_parts < 0)
+        {
+            error = 1;
+            goto done;
+        }
+    }
 
-                // Get oid array len
-                tp = __tag2oid(oid_str_arr[varlist_ind],
-                               oid_idx_str_arr[varlist_ind],
-                               oid_arr[varlist_ind],
-                               &oid_arr_len[varlist_ind], NULL, best_guess);
+    /*
+     * One stream per column; the columns are either those requested, those
+     * of the table's entry in the MIB or, failing both, the table is walked
+     * as a single stream.
+     */
+    num_columns = 0;
+    if (columns_varlist)
+    {
+        num_streams = PySequence_Length(columns_varlist);
+    }
+    else
+    {
+        num_columns = __get_table_columns(table_oid, table_oid_len, columns,
+                                          MAX_OID_LEN);
+        num_streams = (num_columns ? num_columns : 1);
+    }
+
+    if (num_streams <= 0)
+    {
+        PyErr_SetString(PyExc_ValueError, "no columns were requested");
+        error = 1;
+        goto done;
+    }
+
+    streams = calloc(num_streams, sizeof(struct table_stream));
+    active = calloc(num_streams, sizeof(int));
+    if (!streams || !active)
+    {
+        PyErr_NoMemory();
+        error = 1;
+        goto done;
+    }
+
+    for (stream_ind = 0; stream_ind < num_streams; stream_ind++)
+    {
+        struct table_stream *stream = &streams[stream_ind];
+
+        if (columns_varlist)
+        {
+            column_oid_len = 0;
+            varbind = PySequence_GetItem(columns_varlist, stream_ind);
+            if (varbind &&
+                py_netsnmp_attr_string(varbind, "oid", &tag, NULL) >= 0 &&
+                py_netsnmp_attr_string(varbind, "oid_index", &iid, NULL) >= 0)
+            {
+                __tag2oid(tag, iid, column_oid, &column_oid_len, NULL,
+                          best_guess);
             }
-            else
+
+            if (!column_oid_len)
             {
-                oid_arr_len[varlist_ind] = 0;
+                if (!PyErr_Occurred())
+                {
+                    PyErr_Format(EasySNMPUnknownObjectIDError,
+                                 "unknown object id (%s)",
+                                 (tag ? tag : "<null>"));
+                }
+                Py_XDECREF(varbind);
+                error = 1;
+                goto done;
             }
+            Py_DECREF(varbind);
 
-            if (!oid_arr_len[varlist_ind])
+            /* columns must be <table>.1.<column> */
+            if (column_oid_len != table_oid_len + 2 ||
+                memcmp(column_oid, table_oid,
+                       table_oid_len * sizeof(oid)) != 0 ||
+                column_oid[table_oid_len] != 1)
             {
-                PyErr_Format(EasySNMPUnknownObjectIDError,
-                             "unknown object id (%s)",
-                             (oid_str_arr[varlist_ind] ? oid_str_arr[varlist_ind] : "<null>"));
+                PyErr_Format(PyExc_ValueError,
+                             "%s is not a column of the table", tag);
                 error = 1;
-                Py_DECREF(varbind);
-                Py_DECREF(varlist_iter);
                 goto done;
             }
 
-            Py_DECREF(varbind);
-            varlist_ind++;
+            memcpy(stream->root, column_oid, column_oid_len * sizeof(oid));
+            stream->root_len = column_oid_len;
+        }
+        else if (num_columns)
+        {
+            memcpy(stream->root, table_oid, table_oid_len * sizeof(oid));
+            stream->root[table_oid_len] = 1;
+            stream->root[table_oid_len + 1] = columns[stream_ind];
+            stream->root_len = table_oid_len + 2;
+        }
+        else
+        {
+            memcpy(stream->root, table_oid, table_oid_len * sizeof(oid));
+            stream->root_len = table_oid_len;
         }
 
-        Py_XDECREF(varlist_iter);
+        memcpy(stream->last, stream->root, stream->root_len * sizeof(oid));
+        stream->last_len = stream->root_len;
+    }
 
-        if (PyErr_Occurred())
+    py_log_msg(DEBUG, "netsnmp_get_table: walking %d column(s)", num_streams);
+
+    rows = PyDict_New();
+    column_names = PyDict_New();
+    if (!rows || !column_names)
+    {
+        error = 1;
+        goto done;
+    }
+
+    while (!error)
+    {
+        /* request the next rows of every column still being walked */
+        num_active = 0;
+        for (stream_ind = 0; stream_ind < num_streams; stream_ind++)
         {
-            error = 1;
-            goto done;
+            if (!streams[stream_ind].done)
+            {
+                active[num_active++] = stream_ind;
+            }
+        }
+
+        if (!num_active)
+        {
+            break;
         }
 
-        /*
-         * Set up for numeric or full OID's, if necessary.  Save the old
-         * output format so that it can be restored when we finish -- this
-         * is a library-wide global, and has to be set/restored for each
-         * session.
-         */
-        old_format = netsnmp_ds_get_int(NETSNMP_DS_LIBRARY_ID,
-                                        NETSNMP_DS_LIB_OID_OUTPUT_FORMAT);
-
-        if (py_netsnmp_attr_long(session, "use_long_names"))
+        if (use_getnext)
         {
-            getlabel_flag |= USE_LONG_NAMES;
-            netsnmp_ds_set_int(NETSNMP_DS_LIBRARY_ID,
-                               NETSNMP_DS_LIB_OID_OUTPUT_FORMAT,
-                               NETSNMP_OID_OUTPUT_FULL);
+            pdu = snmp_pdu_create(SNMP_MSG_GETNEXT);
+        }
+        else
+        {
+            pdu = snmp_pdu_create(SNMP_MSG_GETBULK);
+            pdu->non_repeaters = 0;
+            pdu->max_repetitions = max_repetitions;
         }
 
-         /*
-          * Setting use_numeric forces use_long_names on so check for
-          * use_numeric after use_long_names (above) to make sure the final
-          * outcome of NETSNMP_DS_LIB_OID_OUTPUT_FORMAT is
-          * NETSNMP_OID_OUTPUT_NUMERIC
-          */
-        if (py_netsnmp_attr_long(session, "use_numeric"))
+        for (stream_ind = 0; stream_ind < num_active; stream_ind++)
         {
-            getlabel_flag |= USE_LONG_NAMES;
-            getlabel_flag |= USE_NUMERIC_OIDS;
+            struct table_stream *stream = &streams[active[stream_ind]];
 
-            netsnmp_ds_set_int(NETSNMP_DS_LIBRARY_ID,
-                               NETSNMP_DS_LIB_OID_OUTPUT_FORMAT,
-                               NETSNMP_OID_OUTPUT_NUMERIC);
+            snmp_add_null_var(pdu, stream->last, stream->last_len);
         }
 
-        /* delete the existing varbinds that we'll replace */
-        PySequence_DelSlice(varbinds, 0, PySequence_Length(varbinds));
+        if (__py_netsnmp_before_pdu(session, session_ctx) < 0)
+        {
+            snmp_free_pdu(pdu);
+            pdu = NULL;
+            error = 1;
+            break;
+        }
 
-        if (PyErr_Occurred())
+        status = __send_sync_pdu(ss, pdu, &response, retry_nosuch, err_str,
+                                 &err_num, &err_ind, NULL);
+        __py_netsnmp_after_pdu(session);
+        pdu = NULL;
+        __py_netsnmp_update_session_errors(session, err_str, err_num,
+                                           err_ind);
+        if (status != 0)
         {
             error = 1;
-            goto done;
+            break;
         }
 
-        py_log_msg(DEBUG, "netsnmp_bulkwalk: Starting bulk walk request");
-        for (varlist_ind = 0; varlist_ind < varlist_len; varlist_ind++)
+        if (!response || !response->variables ||
+            response->errstat != SNMP_ERR_NOERROR)
         {
-            pdu = snmp_pdu_create(SNMP_MSG_GETBULK);
-            pdu->non_repeaters = nonrepeaters;
-            pdu->max_repetitions = maxrepetitions;
-            snmp_add_null_var(pdu, oid_arr[varlist_ind], oid_arr_len[varlist_ind]);
+            break;
+        }
 
-            notdone = 1;
-            while (notdone)
+        /*
+         * The response holds the next row of each active column in turn,
+         * once per repetition.
+         */
+        progress = 0;
+        for (vars = response->variables, var_ind = 0;
+             vars;
+             vars = vars->next_variable, var_ind++)
+        {
+            struct table_stream *stream =
+                &streams[active[var_ind % num_active]];
+
+            if (stream->done)
             {
-                py_log_msg(DEBUG, "netsnmp_bulkwalk: Sending pdu req");
-                status = __send_sync_pdu(ss, pdu, &response, retry_nosuch,
-                                         err_str, &err_num, &err_ind, NULL);
+                continue;
+            }
 
-                __py_netsnmp_update_session_errors(session, err_str, err_num,
-                                                   err_ind);
-                if (status != 0) {
+            if (vars->type == SNMP_ENDOFMIBVIEW ||
+                vars->type == SNMP_NOSUCHOBJECT ||
+                vars->type == SNMP_NOSUCHINSTANCE ||
+                vars->name_length < table_oid_len + 3 ||
+                vars->name_length < stream->root_len ||
+                memcmp(stream->root, vars->name,
+                       stream->root_len * sizeof(oid)) != 0 ||
+                vars->name[table_oid_len] != 1)
+            {
+                stream->done = 1;
+                continue;
+            }
+
+            check = __check_oid_increasing(vars->name, vars->name_length,
+                                           stream->last, stream->last_len,
+                                           abort_on_nonincreasing);
+            if (check <= 0)
+            {
+                if (check < 0)
+                {
                     error = 1;
-                    if (response)
-                    {
-                        snmp_free_pdu(response);
-                        response = NULL;
-                    }
-                    goto done;
+                    break;
                 }
+                stream->done = 1;
+                continue;
+            }
 
-                if (!response ||
-                    !response->variables ||
-                    status != STAT_SUCCESS ||
-                    response->errstat != SNMP_ERR_NOERROR)
+            memcpy(stream->last, vars->name, vars->name_length * sizeof(oid));
+            stream->last_len = vars->name_length;
+            progress = 1;
+
+            /* the column name is only worked out once per column */
+            column = vars->name[table_oid_len + 1];
+            column_key = PyLong_FromUnsignedLong(column);
+            if (!column_key)
+            {
+                error = 1;
+                break;
+            }
+
+            column_name = PyDict_GetItem(column_names, column_key);
+            if (!column_name)
+            {
+                if (getlabel_flag & USE_NUMERIC_OIDS)
                 {
-                    notdone = 0;
+                    __sprint_num_objid((char *) str_buf, vars->name,
+                                       table_oid_len + 2);
+                    tag = (char *) str_buf;
                 }
                 else
                 {
-                    vars = (response ? response->variables : NULL);
-                    while (vars)
-                    {
-
-                        if ((vars->name_length < oid_arr_len[varlist_ind]) ||
-                            (memcmp(oid_arr[varlist_ind], vars->name,
-                                    oid_arr_len[varlist_ind] * sizeof(oid)) != 0))
-                        {
-                            py_log_msg(DEBUG,
-                                       "netsnmp_bulkwalk: encountered end condition "
-                                       "(next subtree iteration out of scope)");
-                            notdone = 0;
-                            break;
-                        }
-
-                        if ((vars->type == SNMP_ENDOFMIBVIEW) ||
-                            (vars->type == SNMP_NOSUCHOBJECT) ||
-                            (vars->type == SNMP_NOSUCHINSTANCE))
-                        {
-                            py_log_msg(DEBUG,
-                                      "netsnmp_bulkwalk: encountered end condition "
-                                      "(ENDOFMIBVIEW, NOSUCHOBJECT, NO SUCH "
-                                      "INSTANCE)");
-                            notdone = 0;
-                            break;
-                        }
-
-                        varbind = py_netsnmp_construct_varbind();
-
-                        if (PyObject_HasAttrString(varbind, "oid"))
-                        {
-                            str_buf[0] = '.';
-                            str_buf[1] = '\0';
-                            out_len = 0;
-                            tp = netsnmp_sprint_realloc_objid_tree(&str_bufp,
-                                                                   &str_buf_len,
-                                                                   &out_len, 0,
-                                                                   &buf_over,
-                                                                   vars->name,
-                                                                   vars->name_length);
-                            str_buf[sizeof(str_buf) - 1] = '\0';
-
-                            type = __translate_asn_type(vars->type);
-
-                            if (__is_leaf(tp))
-                            {
-                                getlabel_flag &= ~NON_LEAF_NAME;
-                                py_log_msg(DEBUG,
-                                           "netsnmp_bulkwalk: is_leaf: %d",
-                                           tp->type);
-                            }
-                            else
-                            {
-                                getlabel_flag |= NON_LEAF_NAME;
-                                py_log_msg(DEBUG,
-                                           "netsnmp_bulkwalk: !is_leaf: %d",
-                                           tp->type);
-                            }
-
-                            py_log_msg(DEBUG, "netsnmp_bulkwalk: str_buf: %s",
-                                       str_buf);
-
-                            /*
-                             * Part of adopted code. SNMPVariable does not have
-                             * a root_oid attribute. Maybe this could be added
-                             * in a future update; will not implement now in
-                             * case it breaks someone else's code
-                             */
-                            // py_netsnmp_attr_set_string(varbind, "root_oid",
-                            //                            initial_oid_str_arr[varlist_ind],
-                            //                           STRLEN(initial_oid_str_arr[varlist_ind]));
-
-                            __get_label_iid((char *)str_buf,
-                                            &oid_str_arr[varlist_ind],
-                                            &oid_idx_str_arr[varlist_ind],
-                                            getlabel_flag);
+                    tp = __sprint_objid((char *) str_buf, sizeof(session_ctx->buf),
+                                        vars->name, vars->name_length,
+                                        getlabel_flag);
 
-                            py_log_msg(DEBUG,
-                                       "netsnmp_bulkwalk: filling response: %s:%s",
-                                       oid_str_arr[varlist_ind],
-                                       oid_idx_str_arr[varlist_ind]);
+                    if (__is_leaf(tp))
+                    {
+                        getlabel_flag &= ~NON_LEAF_NAME;
+                    }
+                    else
+                    {
+                        getlabel_flag |= NON_LEAF_NAME;
+                    }
 
-                            py_netsnmp_attr_set_string(varbind, "oid",
-                                                       oid_str_arr[varlist_ind],
-                                                       STRLEN(oid_str_arr[varlist_ind]));
+                    __get_label_iid((char *) str_buf, &tag, &iid,
+                                    getlabel_flag);
+                }
 
-                            py_netsnmp_attr_set_string(varbind, "oid_index",
-                                                       oid_idx_str_arr[varlist_ind],
-                                                       STRLEN(oid_idx_str_arr[varlist_ind]));
+                column_name = PyUnicode_Decode(tag, STRLEN(tag), "latin-1",
+                                               "surrogateescape");
+                if (!column_name ||
+                    PyDict_SetItem(column_names, column_key, column_name) < 0)
+                {
+                    Py_XDECREF(column_name);
+                    Py_DECREF(column_key);
+                    error = 1;
+                    break;
+                }
+                /* column_names now holds the reference */
+                Py_DECREF(column_name);
+            }
+            Py_DECREF(column_key);
 
-                            __get_type_str(type, type_str, 1);
+            /* the index is the remainder of the OID after the column */
+            index = NULL;
+            if (num_index_parts >= 0)
+            {
+                index = __decode_index(vars->name + table_oid_len + 2,
+                                       vars->name_length - table_oid_len - 2,
+                                       index_parts, num_index_parts);
+            }
+            /* indexes not matching the schema are left undecoded */
+            if (!index && !PyErr_Occurred())
+            {
+                __sprint_num_objid(index_buf, vars->name + table_oid_len + 2,
+                                   vars->name_length - table_oid_len - 2);
+                index = PyUnicode_Decode(index_buf + 1,
+                                         STRLEN(index_buf + 1), "latin-1",
+                                         "surrogateescape");
+            }
+            if (!index)
+            {
+                error = 1;
+                break;
+            }
 
-                            py_netsnmp_attr_set_string(varbind, "snmp_type",
-                                                       type_str,
-                                                       strlen(type_str));
+            if (as_arrays)
+            {
+                column_data = PyDict_GetItem(rows, column_name);
+                if (!column_data)
+                {
+                    column_data = __new_table_column(vars);
+                    if (!column_data ||
+                        PyDict_SetItem(rows, column_name, column_data) < 0)
+                    {
+                        Py_XDECREF(column_data);
+                        Py_DECREF(index);
+                        error = 1;
+                        break;
+                    }
+                    /* rows now holds the reference */
+                    Py_DECREF(column_data);
+                }
 
-                            len = __snprint_value((char *)str_buf,
-                                                  sizeof(str_buf), vars, tp,
-                                                  type, sprintval_flag);
-                            str_buf[len] = '\0';
+                /*
+                 * Integer columns are packed without creating an object
+                 * per value; values of another type cannot be packed and
+                 * are left out along with their index.
+                 */
+                values = PyList_GET_ITEM(column_data, 2);
+                if (PyByteArray_Check(values))
+                {
+                    if (vars->type != PyLong_AsLong(
+                            PyList_GET_ITEM(column_data, 4)))
+                    {
+                        Py_DECREF(index);
+                        continue;
+                    }
+                    if (__pack_integer(values, vars) < 0)
+                    {
+                        Py_DECREF(index);
+                        error = 1;
+                        break;
+                    }
+                }
+                else
+                {
+                    tp = get_tree(vars->name, vars->name_length,
+                                  get_tree_head());
+                    type = __translate_asn_type(vars->type);
+                    len = __snprint_value((char *) str_buf,
+                                          sizeof(session_ctx->buf), vars, tp,
+                                          type, sprintval_flag,
+                                          getlabel_flag);
+                    str_buf[len] = '\0';
+
+                    value = PyUnicode_Decode((char *) str_buf, len,
+                                             "latin-1", "surrogateescape");
+                    if (!value || PyList_Append(values, value) < 0)
+                    {
+                        Py_XDECREF(value);
+                        Py_DECREF(index);
+                        error = 1;
+                        break;
+                    }
+                    Py_DECREF(value);
+                }
 
-                            py_netsnmp_attr_set_string(varbind, "value",
-                                                       (char *)str_buf, len);
+                if (PyList_Append(PyList_GET_ITEM(column_data, 1), index) < 0)
+                {
+                    error = 1;
+                }
+                Py_DECREF(index);
 
-                            /* push the varbind onto the return varbinds */
-                            PyList_Append(varbinds, varbind);
-                        }
-                        else
-                        {
-                            py_log_msg(DEBUG,
-                                       "netsnmp_bulkwalk: bad varbind (%d)",
-                                       varlist_ind);
-                        }
-                        Py_XDECREF(varbind);
+                if (error)
+                {
+                    break;
+                }
+                continue;
+            }
 
-                        // Create next request if we've reached the end
-                        if (vars->next_variable == NULL) {
-                            pdu = snmp_pdu_create(SNMP_MSG_GETBULK);
-                            pdu->non_repeaters = nonrepeaters;
-                            pdu->max_repetitions = maxrepetitions;
-                            snmp_add_null_var(pdu, vars->name, vars->name_length);
-                        }
+            tp = get_tree(vars->name, vars->name_length, get_tree_head());
+            type = __translate_asn_type(vars->type);
+            len = __snprint_value((char *) str_buf, sizeof(session_ctx->buf),
+                                  vars, tp, type, sprintval_flag,
+                                  getlabel_flag);
+            str_buf[len] = '\0';
 
-                        // Move on to next
-                        vars = vars->next_variable;
-                    }
-                    py_log_msg(DEBUG,
-                               "netsnmp_bulkwalk: Finished reading all "
-                               "variables for req");
-                }
+            value = PyUnicode_Decode((char *) str_buf, len, "latin-1",
+                                     "surrogateescape");
+            if (!value)
+            {
+                Py_DECREF(index);
+                error = 1;
+                break;
+            }
 
-                if (response)
+            row = PyDict_GetItem(rows, index);
+            if (!row)
+            {
+                row = PyDict_New();
+                if (!row || PyDict_SetItem(rows, index, row) < 0)
                 {
-                    snmp_free_pdu(response);
-                    response = NULL;
+                    Py_XDECREF(row);
+                    Py_DECREF(index);
+                    Py_DECREF(value);
+                    error = 1;
+                    break;
                 }
+                /* rows now holds the reference */
+                Py_DECREF(row);
+            }
+
+            if (PyDict_SetItem(row, column_name, value) < 0)
+            {
+                error = 1;
+            }
+            Py_DECREF(index);
+            Py_DECREF(value);
+
+            if (error)
+            {
+                break;
             }
         }
-        py_log_msg(DEBUG, "netsnmp_bulkwalk: Ending bulk walk request");
 
-        /* Reset the library's behavior for numeric/symbolic OID's. */
-        netsnmp_ds_set_int(NETSNMP_DS_LIBRARY_ID,
-                           NETSNMP_DS_LIB_OID_OUTPUT_FORMAT,
-                           old_format);
+        snmp_free_pdu(response);
+        response = NULL;
 
-        if (PyErr_Occurred())
+        /* give up on agents which keep responding without any new rows */
+        if (!progress)
         {
-            error = 1;
+            break;
         }
     }
 
+    if (PyErr_Occurred())
+    {
+        error = 1;
+    }
+
 done:
-    py_log_msg(DEBUG, "netsnmp_bulkwalk: Starting cleanup");
-    Py_XDECREF(varbinds);
     Py_XDECREF(sess_ptr);
-    //SAFE_FREE(initial_oid_str_arr);
-    SAFE_FREE(oid_arr_len);
-
-    for (varlist_ind = 0; varlist_ind < varlist_len; varlist_ind++)
+    Py_XDECREF(column_names);
+    SAFE_FREE(streams);
+    SAFE_FREE(active);
+    if (pdu)
     {
-        SAFE_FREE(oid_arr[varlist_ind]);
+        snmp_free_pdu(pdu);
+    }
+    if (response)
+    {
+        snmp_free_pdu(response);
     }
-
-    SAFE_FREE(oid_arr);
-    SAFE_FREE(oid_str_arr);
-    SAFE_FREE(oid_idx_str_arr);
-    py_log_msg(DEBUG, "netsnmp_bulkwalk: End cleanup");
 
     if (error)
     {
+        Py_XDECREF(rows);
         return NULL;
     }
-    return Py_None;
+    return rows;
 }
 
 static PyObject *netsnmp_set(PyObject *self, PyObject *args)
@@ -3801,6 +6168,7 @@ static PyObject *netsnmp_set(PyObject *self, PyObject *args)
 
         if (!session_ctx)
         {
+            error = 1;
             goto done;
         }
 
@@ -3932,8 +6300,17 @@ static PyObject *netsnmp_set(PyObject *self, PyObject *args)
             }
         }
 
+        if (__py_netsnmp_before_pdu(session, session_ctx) < 0)
+        {
+            error = 1;
+            snmp_free_pdu(pdu);
+            pdu = NULL;
+            goto done;
+        }
+
         status = __send_sync_pdu(ss, pdu, &response, NO_RETRY_NOSUCH,
                                  err_str, &err_num, &err_ind, NULL);
+        __py_netsnmp_after_pdu(session);
         __py_netsnmp_update_session_errors(session, err_str, err_num, err_ind);
 
         if (response)
@@ -3975,6 +6352,7 @@ static PyObject *py_get_logger(char *logger_name)
 {
     PyObject *logger = NULL;
     PyObject *null_handler = NULL;
+    PyObject *result = NULL;
 
     logger = PyObject_CallMethod(logging_import, "getLogger", "s", logger_name);
     if (logger == NULL)
@@ -4003,12 +6381,14 @@ static PyObject *py_get_logger(char *logger_name)
         goto done;
     }
 
-    if (PyObject_CallMethod(logger, "addHandler", "O", null_handler) == NULL)
+    result = PyObject_CallMethod(logger, "addHandler", "O", null_handler);
+    if (result == NULL)
     {
         const char *err_msg = "failed to call logger.addHandler(NullHandler())";
         PyErr_SetString(PyExc_RuntimeError, err_msg);
         goto done;
     }
+    Py_DECREF(result);
 
     /* we don't need the null_handler around anymore. */
     Py_DECREF(null_handler);
@@ -4026,8 +6406,17 @@ done:
 static void py_log_msg(int log_level, char *printf_fmt, ...)
 {
     PyObject *log_msg = NULL;
+    PyObject *result = NULL;
+    PyObject *err_type, *err_value, *err_traceback;
+    PyGILState_STATE gil_state;
     va_list fmt_args;
 
+    /* responses are decoded with the GIL released */
+    gil_state = PyGILState_Ensure();
+
+    /* logging may be called while an exception is pending; keep it intact */
+    PyErr_Fetch(&err_type, &err_value, &err_traceback);
+
     va_start(fmt_args, printf_fmt);
     log_msg = PyUnicode_FromFormatV(printf_fmt, fmt_args);
     va_end(fmt_args);
@@ -4035,6 +6424,9 @@ static void py_log_msg(int log_level, char *printf_fmt, ...)
     if (log_msg == NULL)
     {
         /* fail silently. */
+        PyErr_Clear();
+        PyErr_Restore(err_type, err_value, err_traceback);
+        PyGILState_Release(gil_state);
         return;
     }
 
@@ -4042,30 +6434,36 @@ static void py_log_msg(int log_level, char *printf_fmt, ...)
     switch (log_level)
     {
         case INFO:
-            PyObject_CallMethod(PyLogger, "info", "O", log_msg);
+            result = PyObject_CallMethod(PyLogger, "info", "O", log_msg);
             break;
 
         case WARNING:
-            PyObject_CallMethod(PyLogger, "warn", "O", log_msg);
+            result = PyObject_CallMethod(PyLogger, "warn", "O", log_msg);
             break;
 
         case ERROR:
-            PyObject_CallMethod(PyLogger, "error", "O", log_msg);
+            result = PyObject_CallMethod(PyLogger, "error", "O", log_msg);
             break;
 
         case DEBUG:
-            PyObject_CallMethod(PyLogger, "debug", "O", log_msg);
+            result = PyObject_CallMethod(PyLogger, "debug", "O", log_msg);
             break;
 
         case EXCEPTION:
-            PyObject_CallMethod(PyLogger, "exception", "O", log_msg);
+            result = PyObject_CallMethod(PyLogger, "exception", "O", log_msg);
             break;
 
         default:
             break;
     }
 
+    Py_XDECREF(result);
     Py_DECREF(log_msg);
+
+    /* drop any error raised by the logging call itself */
+    PyErr_Clear();
+    PyErr_Restore(err_type, err_value, err_traceback);
+    PyGILState_Release(gil_state);
 }
 
 /*
@@ -4082,12 +6480,24 @@ static void py_log_msg(int log_level, char *printf_fmt, ...)
  */
 static PyMethodDef interface_methods[] =
     {
+        {
+            "init",
+            netsnmp_init,
+            METH_VARARGS,
+            "initialise the netsnmp library."
+        },
         {
             "session",
             netsnmp_create_session,
             METH_VARARGS,
             "create a netsnmp session."
         },
+        {
+            "sessions_bulk",
+            netsnmp_create_sessions_bulk,
+            METH_VARARGS,
+            "create many netsnmp sessions sharing the same settings."
+        },
         {
             "session_v3",
             netsnmp_create_session_v3,
@@ -4118,6 +6528,24 @@ static PyMethodDef interface_methods[] =
             METH_VARARGS,
             "perform an SNMP GETBULK operation."
         },
+        {
+            "get_oids",
+            netsnmp_get_oids,
+            METH_VARARGS,
+            "perform an SNMP GET operation of a list of OIDs."
+        },
+        {
+            "getnext_oids",
+            netsnmp_getnext_oids,
+            METH_VARARGS,
+            "perform an SNMP GETNEXT operation of a list of OIDs."
+        },
+        {
+            "getbulk_oids",
+            netsnmp_getbulk_oids,
+            METH_VARARGS,
+            "perform an SNMP GETBULK operation of a list of OIDs."
+        },
         {
             "set",
             netsnmp_set,
@@ -4130,6 +6558,18 @@ static PyMethodDef interface_methods[] =
             METH_VARARGS,
             "perform an SNMP WALK operation."
         },
+        {
+            "get_table",
+            netsnmp_get_table,
+            METH_VARARGS,
+            "walk the columns of a table returning its rows by index."
+        },
+        {
+            "decode_index",
+            netsnmp_decode_index,
+            METH_VARARGS,
+            "decode a table index according to an index schema."
+        },
         {
             "bulkwalk",
             netsnmp_bulkwalk,
@@ -4227,6 +6667,8 @@ PyMODINIT_FUNC initinterface(void)
                                                        "EasySNMPNoSuchObjectError");
     EasySNMPUndeterminedTypeError = PyObject_GetAttrString(easysnmp_exceptions_import,
                                                            "EasySNMPUndeterminedTypeError");
+    EasySNMPNonIncreasingOIDError = PyObject_GetAttrString(easysnmp_exceptions_import,
+                                                           "EasySNMPNonIncreasingOIDError");
 
     /* Initialise logging (note: automatically has refcount 1) */
     PyLogger = py_get_logger("easysnmp.interface");
@@ -4236,8 +6678,7 @@ PyMODINIT_FUNC initinterface(void)
         goto done;
     }
 
-    /* initialise the netsnmp library */
-    __libraries_init("python");
+    /* the netsnmp library is initialised by init() before its first use */
 
     py_log_msg(DEBUG, "initialised easysnmp.interface");
 
@@ -4260,6 +6701,7 @@ done:
     Py_XDECREF(EasySNMPUnknownObjectIDError);
     Py_XDECREF(EasySNMPNoSuchObjectError);
     Py_XDECREF(EasySNMPUndeterminedTypeError);
+    Py_XDECREF(EasySNMPNonIncreasingOIDError);
     Py_XDECREF(PyLogger);
 
 #if PY_MAJOR_VERSION >= 3
@@ -0,0 +1,94 @@
+"""
+Copyright 2018, Oath Inc.
+Licensed under the terms of the BSD license. See LICENSE file in project root for terms.
+"""
+
+from __future__ import unicode_literals
+
+import logging
+import multiprocessing
+import os
+import sys
+import zlib
+
+logger = logging.getLogger(__name__)
+
+
+def shard(targets, shards, key=None):
+    """
+    Splits targets into shards by a stable hash, so that each target is
+    assigned to the same shard every time for the same number of shards.
+
+    :param targets: a list of targets
+    :param shards: the number of shards
+    :param key: a function returning the string identifying a target,
+                defaulting to the target itself
+    :return: a list of shards, each a list of targets in their original
+             order
+    """
+
+    if shards < 1:
+        raise ValueError('there must be at least one shard')
+
+    buckets = [[] for _ in range(shards)]
+    for target in targets:
+        identity = key(target) if key is not None else target
+        digest = zlib.crc32(str(identity).encode('utf-8')) & 0xffffffff
+        buckets[digest % shards].append(target)
+    return buckets
+
+
+def prefork(targets, worker, processes=None, key=None):
+    """
+    Shards targets across worker processes, forking a process per shard
+    which calls worker with its targets, and waits for them all to exit.
+
+    Workers should create the sessions of their targets themselves; sessions
+    opened before forking are reopened in each worker when first used. The
+    objects shared by sessions (e.g. RateLimits or CircuitBreakers) are
+    copied into each worker rather than shared, and forking while other
+    threads hold their locks leaves them locked in the workers, so fork
+    before starting any threads.
+
+    :param targets: a list of targets
+    :param worker: called with the list of targets of a shard in each worker
+                   process; the process exits with 0 if it returns or 1 if
+                   it raises an exception
+    :param processes: the number of worker processes, defaulting to the
+                      number of CPUs
+    :param key: see shard
+    :return: a list of the exit status of each worker process (negated
+             signal numbers for workers killed by a signal)
+    """
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+
+    # Don't have buffered output written by the workers as well
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    pids = []
+    for shard_targets in shard(targets, processes, key):
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                worker(shard_targets)
+                status = 0
+            except BaseException:
+                logger.exception('prefork worker %d failed', os.getpid())
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(status)
+        pids.append(pid)
+
+    statuses = []
+    for pid in pids:
+        _, status = os.waitpid(pid, 0)
+        if os.WIFSIGNALED(status):
+            statuses.append(-os.WTERMSIG(status))
+        else:
+            statuses.append(os.WEXITSTATUS(status))
+    return statuses
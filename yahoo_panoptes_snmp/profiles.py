@@ -0,0 +1,253 @@
+"""
+Copyright 2018, Oath Inc.
+Licensed under the terms of the BSD license. See LICENSE file in project root for terms.
+"""
+
+from __future__ import unicode_literals
+
+import json
+import os
+import threading
+import time
+
+# The weight given to each new round trip time measurement
+RTT_SMOOTHING = 0.125
+
+# The number of seconds a limit learned from a tooBig error is kept for;
+# requests then go back to asking for more, so that the limit is raised
+# again if the agent's responses no longer overflow (and learned anew
+# otherwise)
+LIMIT_TTL = 3600
+
+
+def subtree_key(oids):
+    """
+    Returns the key of the repetition limit of a bulk operation on one or
+    more OIDs.
+    """
+
+    if not isinstance(oids, list):
+        oids = [oids]
+    return ' '.join(
+        '{0}.{1}'.format(*oid) if isinstance(oid, tuple) else str(oid)
+        for oid in oids
+    )
+
+
+class AgentProfile(object):
+    """
+    The capabilities learned about a single SNMP agent, which sessions to
+    that agent use to start from tuned parameters rather than conservative
+    defaults.
+
+    :param bulk_walk_broken: the subtrees for which the agent's GETBULK
+                             implementation was found broken
+    :param repetition_limits: a dict mapping the OIDs of a bulk operation
+                              (see limit_repetitions) to a list containing
+                              the largest max_repetitions known to not
+                              cause a tooBig error and the time it was
+                              learned at
+    :param varbinds_limit: a list containing the largest number of
+                           variables known to fit in a single GET request
+                           and the time it was learned at, or None if not
+                           yet known
+    :param rtt: the smoothed round trip time of requests to the agent in
+                seconds, or None if not yet measured
+    :param limit_ttl: the number of seconds the limits are kept for
+    """
+
+    def __init__(self, bulk_walk_broken=None, repetition_limits=None,
+                 varbinds_limit=None, rtt=None, limit_ttl=LIMIT_TTL):
+        self.bulk_walk_broken = set(bulk_walk_broken or [])
+        self.repetition_limits = dict(
+            (subtree, list(limit))
+            for subtree, limit in (repetition_limits or {}).items()
+        )
+        self.varbinds_limit = list(varbinds_limit) if varbinds_limit else None
+        self.rtt = rtt
+        self.limit_ttl = limit_ttl
+
+    def __repr__(self):
+        return (
+            '<{0} bulk_walk_broken={1} repetition_limits={2} '
+            'varbinds_limit={3} rtt={4}>'.format(
+                self.__class__.__name__, sorted(self.bulk_walk_broken),
+                self.repetition_limits, self.varbinds_limit, self.rtt
+            )
+        )
+
+    def _current(self, limit):
+        if limit is None or time.time() - limit[1] >= self.limit_ttl:
+            return None
+        return limit[0]
+
+    def max_repetitions(self, oids):
+        """
+        Returns the largest max_repetitions known to fit in a response to a
+        bulk operation on the given OIDs.
+
+        :param oids: the OID or list of OIDs requested (see
+                     limit_repetitions)
+        :return: the limit, or None if not known or expired
+        """
+
+        return self._current(self.repetition_limits.get(subtree_key(oids)))
+
+    def limit_repetitions(self, oids, max_repetitions):
+        """
+        Records that bulk operations on the given OIDs with more repetitions
+        than max_repetitions cause a tooBig error. Limits are kept per
+        request, so that a wide table does not limit the walks of narrow
+        ones.
+
+        :param oids: the OID or list of OIDs requested (e.g. 'ifTable' or
+                     ['ifInOctets', 'ifOutOctets'])
+        :param max_repetitions: the largest max_repetitions which may fit
+        """
+
+        key = subtree_key(oids)
+        current = self._current(self.repetition_limits.get(key))
+        if current is None or max_repetitions < current:
+            self.repetition_limits[key] = [max_repetitions, time.time()]
+
+    def max_varbinds(self):
+        """
+        Returns the largest number of variables known to fit in a single GET
+        request, or None if not known or expired.
+        """
+
+        return self._current(self.varbinds_limit)
+
+    def limit_varbinds(self, max_varbinds):
+        """
+        Records that GET requests with more variables than max_varbinds
+        cause a tooBig error.
+        """
+
+        current = self._current(self.varbinds_limit)
+        if current is None or max_varbinds < current:
+            self.varbinds_limit = [max_varbinds, time.time()]
+
+    def record_rtt(self, rtt):
+        """
+        Updates the smoothed round trip time with a new measurement.
+
+        :param rtt: the time in seconds a request took to complete
+        """
+
+        if self.rtt is None:
+            self.rtt = rtt
+        else:
+            self.rtt += RTT_SMOOTHING * (rtt - self.rtt)
+
+    def to_dict(self):
+        # Sessions update the profile without the store's lock; copy the
+        # set and dict in one step before iterating over them
+        bulk_walk_broken = self.bulk_walk_broken.copy()
+        repetition_limits = self.repetition_limits.copy()
+        return {
+            'bulk_walk_broken': sorted(bulk_walk_broken),
+            'repetition_limits': repetition_limits,
+            'varbinds_limit': self.varbinds_limit,
+            'rtt': self.rtt
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            bulk_walk_broken=data.get('bulk_walk_broken'),
+            repetition_limits=data.get('repetition_limits'),
+            varbinds_limit=data.get('varbinds_limit'),
+            rtt=data.get('rtt')
+        )
+
+
+class ProfileStore(object):
+    """
+    A thread-safe collection of agent profiles keyed by target which may be
+    shared by all the sessions of a process; pass it to a Session as
+    profile_store to have the session use and update the profile of its
+    agent.
+
+    :param path: an optional JSON file the profiles are loaded from (if it
+                 exists) and saved to by save()
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._profiles = {}
+
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._profiles)
+
+    def __contains__(self, target):
+        with self._lock:
+            return target in self._profiles
+
+    def get(self, target):
+        """
+        Retrieves the profile of an agent, creating an empty one if the
+        agent is not yet known.
+
+        :param target: the agent the profile belongs to (a session's
+                       connect_hostname, e.g. 'udp:localhost:161')
+        :return: the AgentProfile of the agent
+        """
+
+        with self._lock:
+            profile = self._profiles.get(target)
+            if profile is None:
+                profile = self._profiles[target] = AgentProfile()
+            return profile
+
+    def forget(self, target):
+        """
+        Discards everything learned about an agent, e.g. after its firmware
+        was upgraded.
+        """
+
+        with self._lock:
+            self._profiles.pop(target, None)
+
+    def load(self, path=None):
+        """
+        Loads the profiles saved in a JSON file, replacing those of the
+        agents it contains.
+
+        :param path: the file to load, defaulting to the store's path
+        """
+
+        with open(path or self.path) as f:
+            data = json.load(f)
+
+        with self._lock:
+            for target, profile in data.items():
+                self._profiles[target] = AgentProfile.from_dict(profile)
+
+    def save(self, path=None):
+        """
+        Saves the profiles to a JSON file; the file is replaced atomically
+        so that it may be shared by several processes.
+
+        :param path: the file to save to, defaulting to the store's path
+        """
+
+        path = path or self.path
+        if not path:
+            raise ValueError('no path to save the agent profiles to')
+
+        with self._lock:
+            data = dict(
+                (target, profile.to_dict())
+                for target, profile in self._profiles.items()
+            )
+
+        tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.rename(tmp_path, path)
@@ -0,0 +1,173 @@
+"""
+Copyright 2018, Oath Inc.
+Licensed under the terms of the BSD license. See LICENSE file in project root for terms.
+"""
+
+from __future__ import division, unicode_literals
+
+import threading
+import time
+
+from .exceptions import EasySNMPDeadlineExceededError
+
+
+class RateLimiter(object):
+    """
+    A thread-safe token bucket limiting the rate at which PDUs are sent,
+    combined with a cap on the number of PDUs awaiting a response; it may
+    be shared by any number of sessions.
+
+    :param rate: the number of PDUs per second allowed on average, or None
+                 for no limit
+    :param burst: the number of PDUs which may be sent at once after a
+                  quiet period, defaulting to one second's worth (at least
+                  one)
+    :param max_in_flight: the number of PDUs which may await a response at
+                          the same time, or None for no limit
+    """
+
+    def __init__(self, rate=None, burst=None, max_in_flight=None):
+        if rate is not None and rate <= 0:
+            raise ValueError('the rate of a limiter must be positive')
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError('at least one PDU must be allowed in flight')
+
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate or 1, 1)
+        self.max_in_flight = max_in_flight
+
+        self._condition = threading.Condition()
+        self._tokens = self.burst
+        self._updated = time.time()
+        self._in_flight = 0
+
+    def __repr__(self):
+        return '<{0} rate={1} burst={2} max_in_flight={3}>'.format(
+            self.__class__.__name__, self.rate, self.burst,
+            self.max_in_flight
+        )
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def acquire(self, deadline=None):
+        """
+        Waits until a PDU may be sent and counts it as in flight until
+        release() is called.
+
+        :param deadline: the time (in seconds since the epoch) after which
+                         to stop waiting, or None to wait as long as it
+                         takes
+        :raises EasySNMPDeadlineExceededError: if the deadline passes first
+        """
+
+        with self._condition:
+            while True:
+                now = time.time()
+                if self.rate is not None:
+                    self._tokens = min(
+                        self.burst,
+                        self._tokens + (now - self._updated) * self.rate
+                    )
+                self._updated = now
+
+                # Wait for a PDU in flight to complete or a token to accrue
+                if (self.max_in_flight is not None and
+                        self._in_flight >= self.max_in_flight):
+                    wait = None
+                elif self.rate is not None and self._tokens < 1:
+                    wait = (1 - self._tokens) / self.rate
+                else:
+                    if self.rate is not None:
+                        self._tokens -= 1
+                    self._in_flight += 1
+                    return
+
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise EasySNMPDeadlineExceededError(
+                            'the operation did not complete before its '
+                            'deadline'
+                        )
+                    wait = remaining if wait is None else min(wait, remaining)
+
+                self._condition.wait(wait)
+
+    def release(self):
+        """
+        Records that a PDU counted by acquire() has completed.
+        """
+
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+
+class RateLimits(object):
+    """
+    The rate limiters shared by all the sessions of a process, one per
+    target and one per credential group (the community for SNMP versions 1
+    and 2 or the security name for version 3); pass it to a Session as
+    rate_limits to have every PDU the session sends wait for both.
+
+    :param rate: the PDUs per second allowed to each target (see
+                 RateLimiter)
+    :param burst: the burst allowed to each target
+    :param max_in_flight: the PDUs each target may have awaiting a response
+    :param group_rate: the PDUs per second allowed to each credential group
+    :param group_burst: the burst allowed to each credential group
+    :param group_max_in_flight: the PDUs each credential group may have
+                                awaiting a response
+    """
+
+    def __init__(self, rate=None, burst=None, max_in_flight=None,
+                 group_rate=None, group_burst=None, group_max_in_flight=None):
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self.group_max_in_flight = group_max_in_flight
+
+        self._lock = threading.Lock()
+        self._targets = {}
+        self._groups = {}
+
+    def limiters(self, session):
+        """
+        Retrieves the rate limiters which apply to a session, creating them
+        if the session's target or credential group is not yet known.
+
+        :param session: the Session
+        :return: a list of RateLimiter objects, which must be acquired in
+                 order
+        """
+
+        limiters = []
+
+        with self._lock:
+            if self.rate is not None or self.max_in_flight is not None:
+                limiter = self._targets.get(session.connect_hostname)
+                if limiter is None:
+                    limiter = self._targets[session.connect_hostname] = \
+                        RateLimiter(self.rate, self.burst, self.max_in_flight)
+                limiters.append(limiter)
+
+            if (self.group_rate is not None or
+                    self.group_max_in_flight is not None):
+                if session.version == 3:
+                    group = (3, session.security_username)
+                else:
+                    group = (session.version, session.community)
+
+                limiter = self._groups.get(group)
+                if limiter is None:
+                    limiter = self._groups[group] = RateLimiter(
+                        self.group_rate, self.group_burst,
+                        self.group_max_in_flight
+                    )
+                limiters.append(limiter)
+
+        return limiters
@@ -0,0 +1,262 @@
+"""
+Copyright 2018, Oath Inc.
+Licensed under the terms of the BSD license. See LICENSE file in project root for terms.
+"""
+
+from __future__ import division, unicode_literals
+
+import time
+
+from .helpers import Timestamp, deadline_to_timestamp
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The value at which counters of each SNMP type wrap back to zero
+COUNTER_MODULUS = {
+    'COUNTER': 2 ** 32,
+    'COUNTER64': 2 ** 64
+}
+
+NAN = float('nan')
+
+
+class CounterSample(object):
+    """
+    The columns of a table retrieved with get_table(as_arrays=True) along
+    with when they were retrieved, which rates may be computed from.
+
+    :param columns: a dict mapping column names to SNMPColumn objects
+    :param timestamp: the time the columns were retrieved at in seconds
+                      since the epoch
+    :param sys_uptime: the agent's sysUpTime when the columns were
+                       retrieved in hundredths of a second (the value of
+                       sysUpTime.0 as returned by get is accepted as is)
+    """
+
+    def __init__(self, columns, timestamp, sys_uptime):
+        self.columns = columns
+        self.timestamp = timestamp
+        self.sys_uptime = int(sys_uptime)
+
+    def __repr__(self):
+        return '<{0} columns={1} timestamp={2} sys_uptime={3}>'.format(
+            self.__class__.__name__, sorted(self.columns), self.timestamp,
+            self.sys_uptime
+        )
+
+    @classmethod
+    def take(cls, session, table_oid, columns=None, index_schema=None,
+             deadline=None, cancel=None):
+        """
+        Retrieves a sample of a table's counters together with the agent's
+        sysUpTime.
+
+        :param session: the Session to retrieve the sample with
+        :param table_oid: the OID of the table (e.g. 'ifXTable')
+        :param columns: the columns to retrieve (see Session.get_table)
+        :param index_schema: the index schema to decode the rows' indexes
+                             with (see Session.get_table)
+        :param deadline: the number of seconds from now, a
+                         helpers.Timestamp or a datetime object by which the
+                         whole sample must be retrieved (see
+                         Session.bulk_walk)
+        :param cancel: see Session.bulk_walk
+        :return: a CounterSample
+        """
+
+        # Both requests share the deadline rather than each starting afresh
+        if deadline is not None:
+            deadline = Timestamp(deadline_to_timestamp(deadline))
+
+        sys_uptime = session.get('sysUpTime.0', deadline=deadline,
+                                 cancel=cancel).value
+        timestamp = time.time()
+        table = session.get_table(table_oid, columns=columns,
+                                  index_schema=index_schema, as_arrays=True,
+                                  deadline=deadline, cancel=cancel)
+        return cls(table, timestamp, sys_uptime)
+
+
+class CounterRates(object):
+    """
+    The per-second rates of a counter column between two samples.
+
+    :param indexes: the index of each row, as in the later sample
+    :param rates: the rate of each row; a NumPy array if the samples' values
+                  were NumPy arrays or a list otherwise, with NaN for rows
+                  which have a discontinuity
+    :param discontinuities: whether the counter of each row was found
+                            discontinuous (reset or new since the earlier
+                            sample, the agent restarted, or the rate is
+                            beyond max_rate), as a NumPy array or a list
+    """
+
+    def __init__(self, indexes, rates, discontinuities):
+        self.indexes = indexes
+        self.rates = rates
+        self.discontinuities = discontinuities
+
+    def __repr__(self):
+        return '<{0} rows={1} discontinuities={2}>'.format(
+            self.__class__.__name__, len(self),
+            int(sum(self.discontinuities))
+        )
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def __iter__(self):
+        return iter(zip(self.indexes, self.rates))
+
+
+def counter_rates(previous, current, interval, restarted=False,
+                  max_rate=None):
+    """
+    Computes the per-second rates of a counter column between two samples.
+
+    Counter32 values which went backwards are taken to have wrapped once.
+    Counter64 values cannot realistically wrap, so those which went
+    backwards are taken to have been reset and flagged as discontinuous.
+
+    :param previous: the SNMPColumn of the earlier sample
+    :param current: the SNMPColumn of the later sample
+    :param interval: the number of seconds between the samples
+    :param restarted: whether the agent restarted between the samples, in
+                      which case every row is discontinuous
+    :param max_rate: an optional rate above which a row is flagged as
+                     discontinuous (e.g. the interface speed), which
+                     catches Counter32 resets mistaken for wraps
+    :return: a CounterRates for the rows of the later sample
+    """
+
+    modulus = COUNTER_MODULUS.get(current.snmp_type)
+    if modulus is None:
+        raise ValueError(
+            'rates cannot be computed for values of type {0}'.format(
+                current.snmp_type
+            )
+        )
+    if previous.snmp_type != current.snmp_type:
+        raise ValueError(
+            'the samples have different types ({0} and {1})'.format(
+                previous.snmp_type, current.snmp_type
+            )
+        )
+    if interval <= 0:
+        raise ValueError('the samples must be taken in order')
+
+    # Rows are usually in the same order in both samples, but interfaces may
+    # come and go between them
+    positions = None
+    if previous.indexes != current.indexes:
+        previous_positions = dict(
+            (index, position)
+            for position, index in enumerate(previous.indexes)
+        )
+        positions = [
+            previous_positions.get(index, -1) for index in current.indexes
+        ]
+
+    if numpy is not None and isinstance(current.values, numpy.ndarray):
+        rates, discontinuities = _numpy_rates(
+            previous.values, current.values, positions, modulus, interval,
+            restarted, max_rate
+        )
+    else:
+        rates, discontinuities = _python_rates(
+            previous.values, current.values, positions, modulus, interval,
+            restarted, max_rate
+        )
+
+    return CounterRates(current.indexes, rates, discontinuities)
+
+
+def sample_rates(previous, current, max_rate=None):
+    """
+    Computes the rates of every counter column present in two samples.
+
+    The agent is taken to have restarted if its sysUpTime went backwards or
+    is shorter than the time elapsed between the samples, and the rates are
+    computed over the time elapsed according to the samples' timestamps.
+
+    :param previous: the earlier CounterSample
+    :param current: the later CounterSample
+    :param max_rate: an optional rate above which a row is flagged as
+                     discontinuous (see counter_rates)
+    :return: a dict mapping column names to CounterRates
+    """
+
+    interval = current.timestamp - previous.timestamp
+
+    # sysUpTime wraps after 497 days, which is handled like any restart
+    restarted = (current.sys_uptime < previous.sys_uptime or
+                 current.sys_uptime / 100 < interval)
+
+    rates = {}
+    for name, column in current.columns.items():
+        if name not in previous.columns or \
+                column.snmp_type not in COUNTER_MODULUS:
+            continue
+        rates[name] = counter_rates(
+            previous.columns[name], column, interval, restarted, max_rate
+        )
+    return rates
+
+
+def _numpy_rates(previous, current, positions, modulus, interval,
+                 restarted, max_rate):
+    current = numpy.asarray(current, dtype=numpy.uint64)
+    previous = numpy.asarray(previous, dtype=numpy.uint64)
+    discontinuities = numpy.zeros(len(current), dtype=bool)
+
+    if positions is not None:
+        positions = numpy.asarray(positions, dtype=numpy.intp)
+        discontinuities |= positions < 0
+        if len(previous):
+            previous = previous[numpy.maximum(positions, 0)]
+        else:
+            # None of the rows were in the earlier sample
+            previous = numpy.zeros_like(current)
+        previous = numpy.where(positions < 0, current, previous)
+
+    # Unsigned subtraction wraps modulo 2 ** 64 already
+    deltas = current - previous
+    if modulus == 2 ** 64:
+        discontinuities |= current < previous
+    else:
+        deltas &= numpy.uint64(modulus - 1)
+
+    rates = deltas / float(interval)
+    if restarted:
+        discontinuities[:] = True
+    if max_rate is not None:
+        discontinuities |= rates > max_rate
+    rates[discontinuities] = numpy.nan
+
+    return rates, discontinuities
+
+
+def _python_rates(previous, current, positions, modulus, interval,
+                  restarted, max_rate):
+    rates = []
+    discontinuities = []
+
+    for row, value in enumerate(current):
+        position = row if positions is None else positions[row]
+        discontinuous = restarted or position < 0
+
+        if not discontinuous:
+            last = previous[position]
+            if value < last and modulus == 2 ** 64:
+                discontinuous = True
+            else:
+                rate = ((value - last) % modulus) / interval
+                discontinuous = max_rate is not None and rate > max_rate
+
+        rates.append(NAN if discontinuous else rate)
+        discontinuities.append(discontinuous)
+
+    return rates, discontinuities
@@ -0,0 +1,133 @@
+"""
+Copyright 2018, Oath Inc.
+Licensed under the terms of the BSD license. See LICENSE file in project root for terms.
+"""
+
+from __future__ import unicode_literals
+
+import socket
+import threading
+import time
+
+try:
+    import queue
+except ImportError:  # Python 2
+    import Queue as queue
+
+from .exceptions import EasySNMPConnectionError
+
+
+class Resolver(object):
+    """
+    A thread-safe cache of the addresses hostnames resolve to, which may be
+    shared by any number of sessions; pass it to a Session (or the easy
+    functions) as resolver to have the session connect to the cached
+    address instead of Net-SNMP resolving the hostname each time a session
+    is opened.
+
+    IPv4 addresses are preferred when a hostname resolves to several.
+
+    :param ttl: the number of seconds an address is cached for
+    :param negative_ttl: the number of seconds a failure to resolve a
+                         hostname is cached for
+    """
+
+    def __init__(self, ttl=300, negative_ttl=30):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+        self._lock = threading.Lock()
+        self._cache = {}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._cache)
+
+    def resolve(self, hostname):
+        """
+        Retrieves the address a hostname resolves to, resolving it if it is
+        not cached or its cached address has expired.
+
+        :param hostname: the hostname or IP address
+        :return: the IP address
+        :raises EasySNMPConnectionError: if the hostname can't be resolved
+        """
+
+        now = time.time()
+        with self._lock:
+            cached = self._cache.get(hostname)
+        if cached is None or cached[1] <= now:
+            cached = self._lookup(hostname)
+
+        address, _, error = cached
+        if address is None:
+            raise EasySNMPConnectionError(
+                'unable to resolve {0} ({1})'.format(hostname, error)
+            )
+        return address
+
+    def resolve_many(self, hostnames, workers=16):
+        """
+        Resolves many hostnames concurrently, filling the cache; hostnames
+        with a cached address are not resolved again.
+
+        :param hostnames: a list of hostnames
+        :param workers: the number of threads resolving hostnames at the same
+                        time
+        :return: a dict of the address (or None if it can't be resolved) of
+                 each hostname
+        """
+
+        now = time.time()
+        pending = queue.Queue()
+        with self._lock:
+            for hostname in set(hostnames):
+                cached = self._cache.get(hostname)
+                if cached is None or cached[1] <= now:
+                    pending.put(hostname)
+
+        threads = []
+        for _ in range(min(workers, pending.qsize())):
+            thread = threading.Thread(target=self._work, args=(pending,))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+
+        with self._lock:
+            return dict(
+                (hostname, self._cache.get(hostname, (None,))[0])
+                for hostname in hostnames
+            )
+
+    def clear(self):
+        """
+        Forgets every cached address.
+        """
+
+        with self._lock:
+            self._cache.clear()
+
+    def _work(self, pending):
+        while True:
+            try:
+                hostname = pending.get_nowait()
+            except queue.Empty:
+                return
+            self._lookup(hostname)
+
+    def _lookup(self, hostname):
+        try:
+            addresses = socket.getaddrinfo(hostname, None, 0,
+                                           socket.SOCK_DGRAM)
+        except (socket.error, UnicodeError) as e:
+            cached = (None, time.time() + self.negative_ttl, e)
+        else:
+            inet = [a for a in addresses if a[0] == socket.AF_INET]
+            address = (inet or addresses)[0][4][0]
+            cached = (address, time.time() + self.ttl, None)
+
+        with self._lock:
+            self._cache[hostname] = cached
+        return cached
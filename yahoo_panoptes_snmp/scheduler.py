@@ -0,0 +1,303 @@
+"""
+Copyright 2018, Oath Inc.
+Licensed under the terms of the BSD license. See LICENSE file in project root for terms.
+"""
+
+from __future__ import unicode_literals
+
+import logging
+import random
+import threading
+import time
+
+try:
+    import queue
+except ImportError:  # Python 2
+    import Queue as queue
+
+from .helpers import Timestamp, deadline_to_timestamp
+
+logger = logging.getLogger(__name__)
+
+# The Session attributes which must match for the OIDs of two jobs to be
+# polled together: those identifying the target and the credentials used,
+# and those changing how the variables retrieved are rendered
+TARGET_ATTRIBUTES = (
+    'connect_hostname', 'version', 'community', 'security_level',
+    'security_username', 'privacy_protocol', 'privacy_password',
+    'auth_protocol', 'auth_password', 'context_engine_id',
+    'security_engine_id', 'context', 'our_identity', 'their_identity',
+    'their_hostname', 'trust_cert', 'use_long_names', 'use_numeric',
+    'use_sprint_value', 'use_enums', 'best_guess', 'retry_no_such',
+    'abort_on_nonexistent', 'abort_on_nonincreasing', 'bulk_walk_fallback'
+)
+
+
+def target_key(session):
+    """
+    Identifies the target polled by a session, so that jobs created with
+    different sessions for the same target are polled together.
+    """
+
+    return tuple(getattr(session, name) for name in TARGET_ATTRIBUTES)
+
+
+class PollJob(object):
+    """
+    A set of OIDs polled from a target at a regular interval.
+
+    :param session: the Session of the target to poll
+    :param interval: the number of seconds between polls
+    :param callback: called with the job, a list of the SNMPVariable
+                     objects retrieved (the scalars followed by the
+                     variables walked) and the exception raised by the poll
+                     (or None) after each poll
+    :param scalars: a list of scalar OIDs to retrieve (e.g. 'sysUpTime.0')
+    :param walks: a list of OIDs to walk (e.g. 'ifHCInOctets')
+    :param deadline: the number of seconds each poll must complete within,
+                     defaulting to the interval so that a slow target can't
+                     hold up a worker past the job's next run
+    """
+
+    def __init__(self, session, interval, callback, scalars=None,
+                 walks=None, deadline=None):
+        if interval <= 0:
+            raise ValueError('the interval of a job must be positive')
+        if not scalars and not walks:
+            raise ValueError('a job must have scalars or OIDs to walk')
+
+        self.session = session
+        self.interval = interval
+        self.callback = callback
+        self.scalars = list(scalars or [])
+        self.walks = list(walks or [])
+        self.deadline = deadline if deadline is not None else interval
+
+        #: the time the job is next due at
+        self.next_run = None
+
+    def __repr__(self):
+        return '<{0} target={1} interval={2} scalars={3} walks={4}>'.format(
+            self.__class__.__name__, self.session.connect_hostname,
+            self.interval, self.scalars, self.walks
+        )
+
+
+class PollScheduler(object):
+    """
+    Runs poll jobs at their intervals, coalescing the OIDs of all the jobs
+    due for the same target into shared requests: the scalars of every job
+    are sent as non-repeaters in the first GETBULK walking the OIDs of
+    every job (see Session.bulk_walk_with_scalars).
+
+    Jobs are of the same target when their sessions connect to the same
+    address with the same credentials and options (see TARGET_ATTRIBUTES),
+    even if they are different Session objects; the target is then polled
+    with the session of one of the jobs. Each poll is bounded by the
+    smallest deadline of its jobs.
+
+    Each target is polled by at most one worker thread at a time, as
+    sessions may not be shared between threads, while different targets
+    are polled concurrently.
+
+    :param workers: the number of threads polling targets concurrently
+    :param jitter: the fraction of its interval by which the first run of
+                   each job is randomly delayed, to spread the load on
+                   agents and the network
+    :param coalesce_window: the number of seconds by which jobs due soon are
+                            brought forward to run with a job of the same
+                            target which is already due
+    :param max_repetitions: the max_repetitions used to walk (see
+                            Session.bulk_walk)
+    """
+
+    def __init__(self, workers=4, jitter=0.1, coalesce_window=1.0,
+                 max_repetitions=None):
+        self.workers = workers
+        self.jitter = jitter
+        self.coalesce_window = coalesce_window
+        self.max_repetitions = max_repetitions
+
+        self._lock = threading.Lock()
+        self._jobs = []
+        self._busy = set()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._jobs)
+
+    def add_job(self, session, interval, callback, scalars=None, walks=None,
+                deadline=None):
+        """
+        Schedules a new job; see PollJob for the parameters.
+
+        :return: the PollJob
+        """
+
+        job = PollJob(session, interval, callback, scalars, walks, deadline)
+        job.next_run = time.time() + random.uniform(
+            0, self.jitter * interval
+        )
+
+        with self._lock:
+            self._jobs.append(job)
+        return job
+
+    def remove_job(self, job):
+        """
+        Unschedules a job; a poll of the job already running completes.
+        """
+
+        with self._lock:
+            self._jobs.remove(job)
+
+    def run_pending(self, now=None):
+        """
+        Polls every target with jobs due in the calling thread.
+
+        :param now: the current time, defaulting to time.time()
+        :return: the number of targets polled
+        """
+
+        batches = self._take_due(time.time() if now is None else now)
+        for session, jobs in batches:
+            self._poll(session, jobs)
+        return len(batches)
+
+    def run(self, stop):
+        """
+        Polls targets as their jobs become due using worker threads, until
+        stop is set.
+
+        :param stop: an object with is_set() and wait() methods, such as a
+                     threading.Event
+        """
+
+        batches = queue.Queue()
+        threads = []
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._work, args=(batches,))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+
+        try:
+            while not stop.is_set():
+                for batch in self._take_due(time.time()):
+                    batches.put(batch)
+                stop.wait(self._next_wait())
+        finally:
+            for _ in threads:
+                batches.put(None)
+            for thread in threads:
+                thread.join()
+
+    def _next_wait(self):
+        with self._lock:
+            next_runs = [job.next_run for job in self._jobs]
+        if not next_runs:
+            return 1.0
+        return min(max(min(next_runs) - time.time(), 0.01), 1.0)
+
+    def _take_due(self, now):
+        """
+        Groups the jobs due by target, marking the targets busy and
+        scheduling each job's next run.
+
+        :return: a list of (session, jobs) tuples
+        """
+
+        batches = []
+
+        with self._lock:
+            keys = [target_key(job.session) for job in self._jobs]
+
+            due = {}
+            for job, key in zip(self._jobs, keys):
+                if key not in self._busy and job.next_run <= now:
+                    due.setdefault(key, (job.session, []))
+
+            for job, key in zip(self._jobs, keys):
+                batch = due.get(key)
+                if batch is not None and \
+                        job.next_run <= now + self.coalesce_window:
+                    batch[1].append(job)
+
+                    # Keep to the schedule, skipping the runs missed
+                    while job.next_run <= now + self.coalesce_window:
+                        job.next_run += job.interval
+
+            for key, (session, jobs) in due.items():
+                self._busy.add(key)
+                batches.append((session, jobs))
+
+        return batches
+
+    def _work(self, batches):
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+            self._poll(*batch)
+
+    def _poll(self, session, jobs):
+        """
+        Polls the OIDs of several jobs of the same target together and
+        hands each job the variables it asked for.
+        """
+
+        scalars = []
+        walks = []
+        for job in jobs:
+            for scalar in job.scalars:
+                if scalar not in scalars:
+                    scalars.append(scalar)
+            for oid in job.walks:
+                if oid not in walks:
+                    walks.append(oid)
+
+        # The requests of the poll share its deadline
+        deadline = Timestamp(deadline_to_timestamp(
+            min(job.deadline for job in jobs)
+        ))
+
+        error = None
+        try:
+            if session.version == 1:
+                scalar_results = session.get(
+                    scalars, deadline=deadline
+                ) if scalars else []
+                subtrees = [
+                    session.walk(oid, deadline=deadline) for oid in walks
+                ]
+            else:
+                scalar_results, subtrees = session.bulk_walk_with_scalars(
+                    scalars, walks, max_repetitions=self.max_repetitions,
+                    by_oid=True, deadline=deadline
+                )
+        except Exception as e:
+            # A failed poll must neither stop the worker nor leave the
+            # target busy
+            logger.debug('polling %s failed: %s', session.connect_hostname,
+                         e)
+            error = e
+            scalar_results = []
+            subtrees = []
+        finally:
+            with self._lock:
+                self._busy.discard(target_key(session))
+
+        scalar_results = dict(zip(scalars, scalar_results))
+        subtrees = dict(zip(walks, subtrees))
+
+        for job in jobs:
+            variables = []
+            if error is None:
+                variables = [scalar_results[s] for s in job.scalars]
+                for oid in job.walks:
+                    variables.extend(subtrees[oid])
+
+            try:
+                job.callback(job, variables, error)
+            except Exception:
+                logger.exception('the callback of %r failed', job)
@@ -5,16 +5,26 @@ Licensed under the terms of the BSD license. See LICENSE file in project root fo
 
 from __future__ import unicode_literals
 
+import copy
 import os
+import time
+from contextlib import contextmanager
 
 # Don't attempt to import the C interface if building docs on RTD
 if not os.environ.get('READTHEDOCS', False):  # noqa
     from . import interface
 
 from .exceptions import (
-    EasySNMPError, EasySNMPNoSuchObjectError, EasySNMPNoSuchInstanceError
+    EasySNMPError, EasySNMPNoSuchObjectError, EasySNMPNoSuchInstanceError,
+    EasySNMPUnknownObjectIDError, EasySNMPDeadlineExceededError,
+    EasySNMPCancelledError, EasySNMPNonIncreasingOIDError
+)
+from .helpers import (
+    deadline_to_timestamp, oid_to_tuple, parse_timeticks, unpack_integers
+)
+from .variables import (
+    SNMPChanges, SNMPColumn, SNMPVariable, SNMPVariableList
 )
-from .variables import SNMPVariable, SNMPVariableList
 
 # Mapping between security level strings and their associated integer values.
 # Here we provide camelCase naming as per the original spec but also more
@@ -29,6 +39,40 @@ SECURITY_LEVEL_MAPPING = {
 }
 
 
+# The variable types which indicate that there is nothing more to walk
+END_OF_WALK_TYPES = ('ENDOFMIBVIEW', 'NOSUCHOBJECT', 'NOSUCHINSTANCE')
+
+# The error status returned by agents when a response would not fit into a
+# single message
+SNMP_ERR_TOOBIG = 1
+
+# The max_repetitions used by bulk_walk when nothing is known of the agent
+DEFAULT_MAX_REPETITIONS = 10
+
+# The environment variable which, when set to 1, has the Net-SNMP library
+# initialised in fast mode (see init)
+FAST_INIT_VARIABLE = 'PANOPTES_SNMP_FAST_INIT'
+
+
+def init(fast=None):
+    """
+    Initialises the Net-SNMP library, which otherwise happens when the first
+    session is opened; the library is only initialised once per process.
+
+    In fast mode, Net-SNMP's configuration and persistent files are not read
+    and no MIBs are loaded, so that only numeric OIDs (e.g.
+    '.1.3.6.1.2.1.1.3.0') may be used.
+
+    :param fast: whether to initialise in fast mode, defaulting to whether
+                 the PANOPTES_SNMP_FAST_INIT environment variable is set to 1
+    :return: True if the library was initialised, False if it already was
+    """
+
+    if fast is None:
+        fast = os.environ.get(FAST_INIT_VARIABLE) == '1'
+    return interface.init(bool(fast))
+
+
 def build_varlist(oids):
     """
     Prepare the variable binding list which will be used by the
@@ -88,6 +132,118 @@ def validate_results(varlist):
             )
 
 
+def full_oid(variable):
+    """
+    Join the OID and OID index of a variable back into a single OID string
+    which may be passed to any of the Session methods.
+
+    :param variable: an SNMPVariable object
+    :return: the OID string (e.g. '.1.3.6.1.2.1.2.2.1.2.1' or 'ifDescr.1')
+    """
+
+    if variable.oid_index:
+        return '{0}.{1}'.format(variable.oid, variable.oid_index)
+    return variable.oid
+
+
+def scalar_object(oid):
+    """
+    Determines the OID to request as a GETBULK non-repeater (which behaves
+    like GETNEXT) to retrieve a scalar, i.e. the OID of its object.
+
+    :param oid: the OID of the scalar as a string or tuple (e.g.
+                'sysUpTime.0' or ('sysUpTime', 0))
+    :return: the OID of the scalar's object (e.g. 'sysUpTime')
+    """
+
+    if isinstance(oid, tuple):
+        oid = '{0}.{1}'.format(*oid)
+    if oid.endswith('.0'):
+        return oid[:-2]
+    return oid
+
+
+def oid_follows(current, previous, seen):
+    """
+    Determines whether an OID returned while walking follows the previous
+    one, as agents are required to return OIDs in increasing order.
+
+    Numeric OIDs are compared lexicographically. Symbolic OIDs cannot be
+    ordered without the MIB so they are instead checked against the set of
+    OIDs already seen during the walk, which still detects loops.
+
+    :param current: the tuple of sub-identifiers returned by the agent
+    :param previous: the tuple of sub-identifiers previously requested
+    :param seen: a set of the symbolic OID tuples seen so far, updated as
+                 OIDs are accepted
+    :return: a boolean indicating whether the walk may continue
+    """
+
+    if all(isinstance(part, int) for part in current + previous):
+        return current > previous
+
+    if current in seen:
+        return False
+    seen.add(current)
+    return True
+
+
+def build_index_schema(index_schema):
+    """
+    Prepare an index schema for the C interface, which accepts a single
+    type as well as a list of them.
+    """
+
+    if index_schema is None or index_schema is True:
+        return index_schema
+    if isinstance(index_schema, (list, tuple)):
+        return tuple(index_schema)
+    return (index_schema,)
+
+
+def decode_index(oid_index, index_schema):
+    """
+    Decodes the index of a table row, such as the oid_index of a variable
+    retrieved by walk (e.g. '1.4.10.0.0.1'), into a tuple of typed values.
+
+    The index schema lists the type of each object in the table's INDEX
+    clause: 'INTEGER', 'IPADDR', 'OCTETSTR' (or 'OCTETSTR(n)' for a fixed
+    size string), 'OBJECTID', 'INETADDRESS', 'MACADDR' or 'PHYSADDR'; the
+    last type may be prefixed by 'IMPLIED ' when it is not length prefixed.
+    Strings are decoded as latin-1, IP addresses to their usual notation
+    and hardware addresses to colon separated hex.
+
+    :param oid_index: the dotted index to decode
+    :param index_schema: a list of index types or a single one
+    :return: a tuple of the decoded values (e.g. (1, 4, '10.0.0.1') given
+             ('INTEGER', 'INTEGER', 'INETADDRESS'))
+    """
+
+    return interface.decode_index(oid_index, build_index_schema(index_schema))
+
+
+def attach_partial_results(error, results, resume_from=None):
+    """
+    Attaches the results collected before a walk failed to the exception
+    which interrupted it, so that the walk may be resumed later on.
+
+    The exception receives a partial_results attribute containing the
+    SNMPVariable objects retrieved so far and a resume_from attribute
+    containing the OID which should be passed as resume_from to continue
+    the walk (or None if nothing was retrieved).
+
+    :param error: the exception raised while walking
+    :param results: a list of SNMPVariable objects retrieved before the
+                    error occurred
+    :param resume_from: the OID the walk was resumed from, if any
+    """
+
+    error.partial_results = list(results)
+    error.resume_from = (
+        full_oid(results[-1]) if results else resume_from
+    )
+
+
 class Session(object):
     """
     A Net-SNMP session which may be setup once and then used to query and
@@ -163,6 +319,39 @@ class Session(object):
     :param abort_on_nonexistent: raise an exception if no object or no
                                  instance is found for the given oid and
                                  oid index
+    :param abort_on_nonincreasing: raise an exception if the agent returns
+                                   an OID which does not follow the one
+                                   requested while walking, instead of
+                                   silently ending the walk
+    :param bulk_walk_fallback: set to True to have bulk_walk complete a
+                               subtree using GETNEXT when the agent's
+                               GETBULK responses are broken (tooBig at a
+                               single repetition, no variables or
+                               non-increasing OIDs); such subtrees are
+                               remembered in bulk_walk_broken and walked
+                               with GETNEXT from then on
+    :param profile_store: a ProfileStore holding what is known about SNMP
+                          agents; the session starts from the profile of
+                          its agent (e.g. the subtrees GETBULK is broken
+                          for, the max_repetitions and number of variables
+                          per GET which fit in a response) and updates it
+                          as it learns more
+    :param rate_limits: a RateLimits shared by the sessions of a process;
+                        every PDU the session sends then waits for the rate
+                        and in-flight limits of its target and credential
+                        group
+    :param circuit_breakers: a CircuitBreakers shared by the sessions of a
+                             process; requests to the agent then fail
+                             immediately with EasySNMPCircuitOpenError
+                             while its breaker is open after consecutive
+                             timeouts
+    :param resolver: a Resolver shared by the sessions of a process; the
+                     session then connects to the address cached for its
+                     hostname rather than having Net-SNMP resolve it (not
+                     used by tunneled transports, which need the hostname)
+    :param lazy: set to True to only open the Net-SNMP session (its socket
+                 and security setup) when the session is first used, or
+                 open() is called
     :param transport: the SNMP transport to use. Supported values depend on
                       underlying net-snmp library. Defaults to 'udp', but
                       some sample values are 'tcp', 'tlstcp', 'dtlsudp' and
@@ -179,7 +368,10 @@ class Session(object):
         our_identity='', their_identity='', their_hostname='',
         trust_cert='', use_long_names=False, use_numeric=False,
         use_sprint_value=False, use_enums=False, best_guess=0,
-        retry_no_such=False, abort_on_nonexistent=False, transport='udp'
+        retry_no_such=False, abort_on_nonexistent=False, transport='udp',
+        abort_on_nonincreasing=False, bulk_walk_fallback=False,
+        profile_store=None, rate_limits=None, circuit_breakers=None,
+        resolver=None, lazy=False
     ):
         # Validate and extract the remote port
         if ':' in hostname:
@@ -222,12 +414,16 @@ class Session(object):
         self.retry_no_such = retry_no_such
         self.abort_on_nonexistent = abort_on_nonexistent
         self.transport = transport
+        self.abort_on_nonincreasing = abort_on_nonincreasing
+        self.bulk_walk_fallback = bulk_walk_fallback
 
         # The following variables are required for internal use as they are
         # passed to the C interface
 
-        #: internal field used to cache a created session structure
-        self.sess_ptr = None
+        #: internal field used to cache a created session structure (see
+        #: sess_ptr) and the process it was created in
+        self._sess_ptr = None
+        self._pid = None
 
         #: read-only, holds the error message assoc. w/ last request
         self.error_string = ''
@@ -238,16 +434,196 @@ class Session(object):
         #: read-only, holds the snmp_err_index when appropriate
         self.error_index = 0
 
-        # Check for transports that may be tunneled
-        tunneled = transport in ['tlstcp', 'dtlsudp', 'ssh']
+        #: read-only, the profile of the agent shared with other sessions
+        #: through profile_store (or None)
+        self.profile = None
+        if profile_store is not None:
+            self.profile = profile_store.get(self.connect_hostname)
+
+        #: read-only, the subtrees bulk_walk found GETBULK to be broken for
+        #: and now walks using GETNEXT (see bulk_walk_fallback)
+        if self.profile is not None:
+            self.bulk_walk_broken = self.profile.bulk_walk_broken
+        else:
+            self.bulk_walk_broken = set()
+
+        #: internal fields used to bound operations spanning multiple PDUs
+        #: and to rate limit PDUs; the C interface calls _check_pdu() before
+        #: and _pdu_done() after each PDU when _pdu_checks is set
+        self._pdu_checks = False
+        self._deadline = None
+        self._cancel = None
+        self._limiters = []
+        self._acquired = []
+        if rate_limits is not None:
+            self._limiters = rate_limits.limiters(self)
+        self._breaker_allowed = False
+        self._breaker_probe = False
+
+        #: read-only, the circuit breaker of the agent shared with other
+        #: sessions through circuit_breakers (or None)
+        self.circuit_breaker = None
+        if circuit_breakers is not None:
+            self.circuit_breaker = circuit_breakers.get(self.connect_hostname)
+
+        self._update_pdu_checks()
+
+        #: internal field holding the walks cached by bulk_walk_if_changed
+        #: along with the change indicator they were retrieved at
+        self._walk_cache = {}
+
+        #: read-only, the address the session connects to (the hostname
+        #: unless a resolver is used)
+        self.address = self.hostname
+        if resolver is not None and not self.tunneled:
+            self.address = resolver.resolve(self.hostname)
+
+        if not lazy:
+            self.open()
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def sess_ptr(self):
+        """
+        The Net-SNMP session structure used by the C interface, opening the
+        session if it isn't open yet.
+        """
+
+        self.open()
+        return self._sess_ptr
+
+    @property
+    def is_open(self):
+        """
+        Whether the session is open; false for lazy sessions not opened
+        yet and for sessions inherited across a fork.
+        """
+
+        return self._sess_ptr is not None and self._pid == os.getpid()
+
+    def open(self):
+        """
+        Opens the Net-SNMP session (creating its socket) if it isn't open
+        already; lazy sessions are otherwise opened when first used.
+
+        A session opened before the process forked is reopened in the child,
+        as its socket is shared with the parent and responses could be
+        delivered to either process.
+
+        :return: the Session
+        """
+
+        if self._sess_ptr is not None and self._pid != os.getpid():
+            self._sess_ptr = None
+        if self._sess_ptr is None:
+            self._set_handle(self._open_handle())
+        return self
+
+    def close(self):
+        """
+        Closes the Net-SNMP session, releasing its socket; using the session
+        again reopens it.
+        """
+
+        self._sess_ptr = None
+
+    def _set_handle(self, sess_ptr):
+        self._sess_ptr = sess_ptr
+        self._pid = os.getpid()
+
+    @classmethod
+    def create_many(cls, configs):
+        """
+        Creates many sessions, opening all the SNMP version 1 and 2c
+        sessions which share the same settings but for their agent with a
+        single call to the C interface.
+
+        :param configs: a list of dicts of the keyword arguments of each
+                        session (see Session); sessions with lazy set are
+                        created without being opened
+        :return: a list holding the Session created for each config, or
+                 the exception raised creating it
+        """
+
+        # Resolve the hostnames of all the sessions at once, so that each
+        # session finds its address cached
+        resolvers = {}
+        for config in configs:
+            resolver = config.get('resolver')
+            if resolver is None:
+                continue
+            hostname = config.get('hostname', 'localhost').split(':')[0]
+            resolvers.setdefault(id(resolver), (resolver, []))[1].append(
+                hostname
+            )
+        for resolver, hostnames in resolvers.values():
+            resolver.resolve_many(hostnames)
+
+        sessions = []
+        groups = {}
+        for config in configs:
+            try:
+                session = cls(**dict(config, lazy=True))
+            except Exception as e:
+                sessions.append(e)
+                continue
+
+            sessions.append(session)
+            if config.get('lazy'):
+                continue
+            elif session.version in (1, 2) and not session.tunneled:
+                key = (session.version, session.community,
+                       session.local_port, session.retries,
+                       session.timeout)
+                groups.setdefault(key, []).append(len(sessions) - 1)
+            else:
+                try:
+                    session.open()
+                except (EasySNMPError, ValueError) as e:
+                    sessions[-1] = e
+
+        if groups:
+            init()
+        for (version, community, local_port, retries, timeout), positions in \
+                groups.items():
+            handles = interface.sessions_bulk(
+                version, community,
+                [sessions[i].connect_address for i in positions],
+                local_port, retries, int(timeout * 1000000)
+            )
+            for i, handle in zip(positions, handles):
+                if isinstance(handle, Exception):
+                    sessions[i] = handle
+                else:
+                    sessions[i]._set_handle(handle)
+
+        return sessions
+
+    @property
+    def tunneled(self):
+        return self.transport in ['tlstcp', 'dtlsudp', 'ssh']
+
+    def _open_handle(self):
+        """
+        Creates the Net-SNMP session of the agent.
+
+        :return: the session capsule for sess_ptr
+        """
+
+        init()
 
         # Calculate our timeout in microseconds
         timeout_microseconds = int(self.timeout * 1000000)
 
         # Tunneled
-        if tunneled:
+        if self.tunneled:
             # TODO: Determine the best way to test this
-            self.sess_ptr = interface.session_tunneled(
+            return interface.session_tunneled(
                 self.version,
                 self.connect_hostname,
                 self.local_port,
@@ -265,9 +641,9 @@ class Session(object):
 
         # SNMP v3
         elif self.version == 3:
-            self.sess_ptr = interface.session_v3(
+            return interface.session_v3(
                 self.version,
-                self.connect_hostname,
+                self.connect_address,
                 self.local_port,
                 self.retries,
                 timeout_microseconds,
@@ -286,10 +662,10 @@ class Session(object):
 
         # SNMP v1 & v2
         else:
-            self.sess_ptr = interface.session(
+            return interface.session(
                 self.version,
                 self.community,
-                self.connect_hostname,
+                self.connect_address,
                 self.local_port,
                 self.retries,
                 timeout_microseconds
@@ -302,7 +678,135 @@ class Session(object):
         else:
             return '{0}:{1}'.format(self.transport, self.hostname)
 
-    def get(self, oids):
+    @property
+    def connect_address(self):
+        transport, address = self.transport, self.address
+        if ':' in address and not address.startswith('['):
+            # An IPv6 address from the resolver
+            if transport in ('udp', 'tcp'):
+                transport += '6'
+            address = '[{0}]'.format(address)
+
+        if self.remote_port:
+            return '{0}:{1}:{2}'.format(transport, address, self.remote_port)
+        else:
+            return '{0}:{1}'.format(transport, address)
+
+    def _update_pdu_checks(self):
+        self._pdu_checks = bool(
+            self._deadline is not None or self._cancel is not None or
+            self._limiters or self.circuit_breaker is not None
+        )
+
+    def _check_pdu(self):
+        """
+        Called by the C interface before each request PDU is sent while
+        _pdu_checks is set; checks the circuit breaker of the agent, waits
+        for the session's rate limiters and checks the deadline and
+        cancellation of the current operation.
+
+        :return: the timeout in microseconds to use for the next PDU or None
+                 to use the session timeout
+        """
+
+        if self._cancel is not None and self._cancel.is_set():
+            raise EasySNMPCancelledError('the operation was cancelled')
+
+        # Fail fast rather than wait for agents which are down
+        if self.circuit_breaker is not None:
+            self._breaker_probe = self.circuit_breaker.allow()
+            self._breaker_allowed = True
+
+        # Wait for the rate limiters, which are released by _pdu_done()
+        try:
+            for limiter in self._limiters:
+                limiter.acquire(self._deadline)
+                self._acquired.append(limiter)
+
+            if self._deadline is not None:
+                remaining = self._deadline - time.time()
+                if remaining <= 0:
+                    raise EasySNMPDeadlineExceededError(
+                        'the operation did not complete before its deadline'
+                    )
+        except EasySNMPError:
+            self._pdu_abandoned()
+            raise
+
+        if self._deadline is not None:
+            # Fold the deadline into the per PDU timeout so that all retries
+            # of the next PDU also complete in time
+            timeout = min(self.timeout, remaining / (self.retries + 1))
+            return max(int(timeout * 1000000), 1)
+
+        return None
+
+    def _pdu_done(self, timed_out=False):
+        """
+        Called by the C interface after each request PDU sent while
+        _pdu_checks is set, whether it succeeded or not.
+
+        :param timed_out: whether the request timed out
+        """
+
+        if self._breaker_allowed:
+            self._breaker_allowed = False
+            self.circuit_breaker.record(timed_out, self._breaker_probe)
+
+        while self._acquired:
+            self._acquired.pop().release()
+
+    def _pdu_abandoned(self):
+        """
+        Releases what _check_pdu() acquired for a PDU which is not sent.
+        """
+
+        if self._breaker_allowed:
+            self._breaker_allowed = False
+            self.circuit_breaker.abandon(self._breaker_probe)
+
+        while self._acquired:
+            self._acquired.pop().release()
+
+    @contextmanager
+    def _operation(self, deadline=None, cancel=None):
+        """
+        Bounds all the PDUs sent within the block by a deadline and/or a
+        cancellation event; nested operations never extend the deadline of
+        the operation enclosing them.
+
+        :param deadline: the number of seconds from now, a Timestamp or a
+                         datetime object by which the operation must
+                         complete
+        :param cancel: an object with an is_set() method, such as a
+                       threading.Event, which cancels the operation when set
+        """
+
+        if deadline is None and cancel is None:
+            yield
+            return
+
+        previous = self._deadline, self._cancel
+
+        deadline = deadline_to_timestamp(deadline)
+        if deadline is None or (previous[0] is not None and
+                                previous[0] < deadline):
+            deadline = previous[0]
+
+        self._deadline = deadline
+        self._cancel = cancel if cancel is not None else previous[1]
+        self._update_pdu_checks()
+        try:
+            yield
+        finally:
+            self._deadline, self._cancel = previous
+            self._update_pdu_checks()
+
+    def _record_rtt(self, started):
+        if self.profile is not None:
+            self.profile.record_rtt(time.time() - started)
+
+    def get(self, oids, deadline=None, cancel=None):
         """
         Perform an SNMP GET operation using the prepared session to
         retrieve a particular piece of information.
@@ -312,6 +816,10 @@ class Session(object):
                      (e.g. 'sysDescr.0') or may be a tuple containing the
                      name as its first item and index as its second
                      (e.g. ('sysDescr', 0))
+        :param deadline: see bulk_walk; it bounds all the requests the GET
+                         is split into when the agent's profile limits the
+                         number of variables per request
+        :param cancel: see bulk_walk
         :return: an SNMPVariable object containing the value that was
                  retrieved or a list of objects when you send in a list of
                  OIDs
@@ -321,7 +829,11 @@ class Session(object):
         varlist, is_list = build_varlist(oids)
 
         # Perform the SNMP GET operation
-        interface.get(self, varlist)
+        with self._operation(deadline, cancel):
+            if self.profile is None:
+                interface.get(self, varlist)
+            else:
+                self._get_chunked(varlist)
 
         # Validate the variable list returned
         if self.abort_on_nonexistent:
@@ -410,7 +922,9 @@ class Session(object):
         varlist, is_list = build_varlist(oids)
 
         # Perform the SNMP GET operation
+        started = time.time()
         interface.getnext(self, varlist)
+        self._record_rtt(started)
 
         # Validate the variable list returned
         if self.abort_on_nonexistent:
@@ -446,7 +960,9 @@ class Session(object):
         # Build our variable bindings for the C interface
         varlist, _ = build_varlist(oids)
 
+        started = time.time()
         interface.getbulk(self, non_repeaters, max_repetitions, varlist)
+        self._record_rtt(started)
 
         # Validate the variable list returned
         if self.abort_on_nonexistent:
@@ -455,16 +971,111 @@ class Session(object):
         # Return a list of variables
         return varlist
 
-    def walk(self, oids='.1.3.6.1.2.1'):
+    def get_oids(self, oids):
+        """
+        Performs an SNMP GET operation like get, but without creating an
+        SNMPVariable for each OID requested, which makes it cheaper when
+        requesting many OIDs at a time.
+
+        :param oids: a list or tuple of OIDs, each a string representing the
+                     entire OID (e.g. 'sysDescr.0' or '.1.3.6.1.2.1.1.1.0') or
+                     a tuple of integers (e.g. (1, 3, 6, 1, 2, 1, 1, 1, 0))
+        :return: a list of SNMPVariable objects containing the values that
+                 were retrieved, in the order of the OIDs
+        """
+
+        started = time.time()
+        varlist = interface.get_oids(self, oids)
+        self._record_rtt(started)
+
+        if self.abort_on_nonexistent:
+            validate_results(varlist)
+
+        return varlist
+
+    def get_next_oids(self, oids):
+        """
+        Performs an SNMP GETNEXT operation like get_next, but without
+        creating an SNMPVariable for each OID requested.
+
+        :param oids: see get_oids
+        :return: a list of SNMPVariable objects containing the next variable
+                 after each OID, in the order of the OIDs
+        """
+
+        started = time.time()
+        varlist = interface.getnext_oids(self, oids)
+        self._record_rtt(started)
+
+        if self.abort_on_nonexistent:
+            validate_results(varlist)
+
+        return varlist
+
+    def get_bulk_oids(self, oids, non_repeaters, max_repetitions):
+        """
+        Performs an SNMP GETBULK operation like get_bulk, but without
+        creating an SNMPVariable for each OID requested.
+
+        :param oids: see get_oids
+        :param non_repeaters: see get_bulk
+        :param max_repetitions: see get_bulk
+        :return: a list of SNMPVariable objects containing the values that
+                 were retrieved via SNMP
+        """
+
+        if self.version == 1:
+            raise EasySNMPError(
+                'you cannot perform a bulk GET operation for SNMP version 1'
+            )
+
+        started = time.time()
+        varlist = interface.getbulk_oids(self, non_repeaters, max_repetitions,
+                                         oids)
+        self._record_rtt(started)
+
+        if self.abort_on_nonexistent:
+            validate_results(varlist)
+
+        return SNMPVariableList(varlist)
+
+    def walk(self, oids='.1.3.6.1.2.1', return_partial=False,
+             resume_from=None, deadline=None, cancel=None):
         """
         Uses SNMP GETNEXT operation using the prepared session to
         automatically retrieve multiple pieces of information in an OID.
 
+        The walk ends when the agent returns an OID outside of the subtree
+        being walked or one which does not follow the OID requested (see
+        abort_on_nonincreasing).
+
+        Should the walk fail part way through (e.g. due to a timeout), the
+        exception raised carries a partial_results attribute with the
+        variables retrieved so far and a resume_from attribute with the OID
+        to pass as resume_from when retrying.
+
         :param oids: you may pass in a single item (multiple values currently
                      experimental) which may be a string representing the
                      entire OID (e.g. 'sysDescr.0') or may be a tuple
                      containing the name as its first item and index as its
                      second (e.g. ('sysDescr', 0))
+        :param return_partial: set to True to return the variables retrieved
+                               so far instead of raising an exception when
+                               the walk fails part way through; the error is
+                               still recorded in error_string and
+                               error_number
+        :param resume_from: the last OID retrieved by a previous walk of the
+                            same (single) OID; the walk continues after it
+                            instead of starting from the beginning
+        :param deadline: the number of seconds from now, a
+                         helpers.Timestamp or a datetime object by which
+                         the whole walk must complete; it is checked
+                         between PDUs and shortens the timeout of each PDU
+                         as it approaches, after which
+                         EasySNMPDeadlineExceededError is raised
+        :param cancel: an object with an is_set() method, such as a
+                       threading.Event, which may be set from another
+                       thread to stop the walk with EasySNMPCancelledError
         :return: a list of SNMPVariable objects containing the values that
                  were retrieved via SNMP
         """
@@ -472,8 +1083,25 @@ class Session(object):
         # Build our variable bindings for the C interface
         varlist, _ = build_varlist(oids)
 
+        start_varlist = None
+        if resume_from is not None:
+            if len(varlist) != 1:
+                raise ValueError(
+                    'resume_from may only be used when walking a single OID'
+                )
+            start_varlist, _ = build_varlist(resume_from)
+
         # Perform the SNMP walk using GETNEXT operations
-        interface.walk(self, varlist)
+        try:
+            with self._operation(deadline, cancel):
+                interface.walk(self, varlist, start_varlist)
+        except EasySNMPUnknownObjectIDError:
+            raise
+        except EasySNMPError as e:
+            attach_partial_results(e, varlist, resume_from)
+            if not return_partial:
+                raise
+            return e.partial_results
 
         # Validate the variable list returned
         if self.abort_on_nonexistent:
@@ -482,11 +1110,25 @@ class Session(object):
         # Return a list of variables
         return list(varlist)
 
-    def bulk_walk(self, oids, non_repeaters=0, max_repetitions=10):
+    def bulk_walk(self, oids, non_repeaters=0, max_repetitions=None,
+                  return_partial=False, resume_from=None, deadline=None,
+                  cancel=None):
         """
         Performs a series of bulk SNMP GET operation using the prepared session to
         retrieve multiple pieces of information in a single packet.
 
+        Each OID is walked until the agent returns an OID outside of its
+        subtree or one which does not follow the OID previously returned
+        (see abort_on_nonincreasing); numeric OIDs (use_numeric) are compared
+        by sub-identifier while symbolic OIDs are only checked for loops.
+        With bulk_walk_fallback enabled, subtrees for which the agent's
+        GETBULK responses are broken are completed using GETNEXT instead.
+
+        Should the walk fail part way through (e.g. due to a timeout), the
+        exception raised carries a partial_results attribute with the
+        variables retrieved so far and a resume_from attribute with the OID
+        to pass as resume_from when retrying.
+
         :param oids: you may pass in a list of OIDs or single item; each item
                      may be a string representing the entire OID
                      (e.g. 'sysDescr.0') or may be a tuple containing the
@@ -496,7 +1138,27 @@ class Session(object):
                               return a single GETNEXT instance, not multiple
                               instances
         :param max_repetitions: the number of objects that should be returned
-                                for all the repeating OIDs
+                                for all the repeating OIDs; defaults to the
+                                largest known to fit in a response from the
+                                agent (see profile_store) or 10, and is
+                                halved whenever the agent responds tooBig
+        :param return_partial: set to True to return the variables retrieved
+                               so far instead of raising an exception when
+                               the walk fails part way through; the error is
+                               still recorded in error_string and
+                               error_number
+        :param resume_from: the last OID retrieved by a previous walk of the
+                            same (single) OID; the walk continues after it
+                            instead of starting from the beginning
+        :param deadline: the number of seconds from now, a
+                         helpers.Timestamp or a datetime object by which
+                         the whole walk must complete; it is checked
+                         between PDUs and shortens the timeout of each PDU
+                         as it approaches, after which
+                         EasySNMPDeadlineExceededError is raised
+        :param cancel: an object with an is_set() method, such as a
+                       threading.Event, which may be set from another
+                       thread to stop the walk with EasySNMPCancelledError
         :return: a list of SNMPVariable objects containing the values that
                  were retrieved via SNMP
         """
@@ -505,19 +1167,489 @@ class Session(object):
         if not isinstance(oids, list):
             oids = [oids]
 
-        for oid in oids:
-            base_oid = oid
-            running = True
-
-            while running:
-                results = self.get_bulk(oids=oid, non_repeaters=non_repeaters,
-                                        max_repetitions=max_repetitions)
-                for result in results:
-                    if not result.oid.startswith(base_oid):
-                        running = False
-                        break
-                    varlist.append(result)
-                if running:
-                    oid = result.oid + '.' + result.oid_index
+        if resume_from is not None and len(oids) != 1:
+            raise ValueError(
+                'resume_from may only be used when walking a single OID'
+            )
+
+        try:
+            with self._operation(deadline, cancel):
+                for oid in oids:
+                    # OIDs specified as a tuple (e.g. ('ifDescr', 1))
+                    if isinstance(oid, tuple):
+                        oid = '{0}.{1}'.format(*oid)
+
+                    # Skip GETBULK for subtrees it was already found broken
+                    # for during a previous walk
+                    if (self.bulk_walk_fallback and
+                            oid in self.bulk_walk_broken):
+                        self._walk_into(varlist, oid, resume_from)
+                        continue
+
+                    broken, last_oid = self._bulk_walk_subtree(
+                        varlist, oid, resume_from, non_repeaters,
+                        self._max_repetitions(max_repetitions, oid)
+                    )
+                    if broken:
+                        self.bulk_walk_broken.add(oid)
+                        self._walk_into(varlist, oid, last_oid)
+        except EasySNMPUnknownObjectIDError:
+            raise
+        except EasySNMPError as e:
+            attach_partial_results(e, varlist, resume_from)
+            if not return_partial:
+                raise
+            return e.partial_results
 
         return varlist
+
+    def bulk_walk_with_scalars(self, scalars, oids, max_repetitions=None,
+                               by_oid=False, deadline=None, cancel=None):
+        """
+        Retrieves scalars and walks one or more OIDs starting with a single
+        GETBULK, in which the scalars are requested as non-repeaters ahead
+        of the first repetitions of each OID. This saves a round trip over
+        a separate GET and retrieves the scalars (e.g. sysUpTime.0) at the
+        same time as the first variables walked.
+
+        Each OID is then walked as bulk_walk would from where the first
+        GETBULK left it. As non-repeaters behave like GETNEXT, each scalar
+        ending in .0 is requested as its object (e.g. sysUpTime) and the
+        variable following it is returned if the agent lacks the scalar.
+
+        :param scalars: a list of scalar OIDs (e.g. ['sysUpTime.0'])
+        :param oids: the OIDs to walk (see bulk_walk)
+        :param max_repetitions: see bulk_walk
+        :param by_oid: set to True to have the variables retrieved by the
+                       walk returned as a separate list for each OID
+        :param deadline: see bulk_walk
+        :param cancel: see bulk_walk
+        :return: a tuple containing a list of SNMPVariable objects for the
+                 scalars and a list of those retrieved by the walk (or, with
+                 by_oid, a list of such lists)
+        """
+
+        if not isinstance(scalars, list):
+            scalars = [scalars]
+        if not isinstance(oids, list):
+            oids = [oids]
+
+        # OIDs specified as a tuple (e.g. ('ifDescr', 1))
+        oids = [
+            '{0}.{1}'.format(*oid) if isinstance(oid, tuple) else oid
+            for oid in oids
+        ]
+        requested = [scalar_object(scalar) for scalar in scalars]
+
+        first_repetitions = self._max_repetitions(
+            max_repetitions, requested + oids
+        )
+        subtrees = []
+
+        with self._operation(deadline, cancel):
+            while True:
+                try:
+                    results = self.get_bulk(
+                        oids=requested + oids, non_repeaters=len(requested),
+                        max_repetitions=first_repetitions
+                    )
+                except EasySNMPError:
+                    if (self.error_number != SNMP_ERR_TOOBIG or
+                            first_repetitions == 1):
+                        raise
+
+                    first_repetitions //= 2
+                    if self.profile is not None:
+                        self.profile.limit_repetitions(requested + oids,
+                                                       first_repetitions)
+                    continue
+                break
+
+            # The repetitions of the OIDs walked follow the non-repeaters,
+            # interleaved
+            repetitions = results[len(requested):]
+
+            for position, oid in enumerate(oids):
+                varlist = []
+                subtrees.append(varlist)
+
+                if (self.bulk_walk_fallback and
+                        oid in self.bulk_walk_broken):
+                    self._walk_into(varlist, oid, None)
+                    continue
+
+                broken, last_oid = self._bulk_walk_subtree(
+                    varlist, oid, None, 0,
+                    self._max_repetitions(max_repetitions, oid),
+                    repetitions[position::len(oids)]
+                )
+                if broken:
+                    self.bulk_walk_broken.add(oid)
+                    self._walk_into(varlist, oid, last_oid)
+
+        scalar_results = list(results[:len(requested)])
+        if by_oid:
+            return scalar_results, subtrees
+        return scalar_results, [
+            variable for subtree in subtrees for variable in subtree
+        ]
+
+    def bulk_walk_changes(self, oids, state=None, non_repeaters=0,
+                          max_repetitions=None, deadline=None, cancel=None):
+        """
+        Walks one or more OIDs using GETBULK operations like bulk_walk, but
+        only returns the variables which changed since a previous walk.
+
+        The C interface compares the raw value of each variable retrieved
+        with the walk's previous state before creating an SNMPVariable for
+        it, so unchanged variables cost little more than their OID. Walks
+        stop at the end of each subtree or at non-increasing OIDs, but
+        neither bulk_walk_fallback nor resume_from are supported.
+
+        :param oids: the OIDs to walk (see bulk_walk)
+        :param state: the state of the previous walk of the same OIDs (the
+                      state attribute of its result), or None to return
+                      every variable as added
+        :param non_repeaters: see bulk_walk
+        :param max_repetitions: see bulk_walk
+        :param deadline: see bulk_walk
+        :param cancel: see bulk_walk
+        :return: an SNMPChanges object listing the variables added, changed
+                 and removed since the previous walk along with the state
+                 to pass to the next one
+        """
+
+        if state is None:
+            state = {}
+
+        max_repetitions = self._max_repetitions(max_repetitions, oids)
+
+        with self._operation(deadline, cancel):
+            while True:
+                # The C interface replaces the OIDs with the results
+                varlist, _ = build_varlist(oids)
+                current_state = {}
+                changed_keys = []
+                try:
+                    interface.bulkwalk(
+                        self, non_repeaters, max_repetitions, varlist, state,
+                        current_state, changed_keys
+                    )
+                except EasySNMPError:
+                    if (self.error_number != SNMP_ERR_TOOBIG or
+                            max_repetitions == 1):
+                        raise
+
+                    max_repetitions //= 2
+                    if self.profile is not None:
+                        self.profile.limit_repetitions(oids, max_repetitions)
+                    continue
+                break
+
+        changes = SNMPChanges(state=current_state)
+        for variable, key in zip(varlist, changed_keys):
+            if key in state:
+                changes.changed.append(variable)
+            else:
+                changes.added.append(variable)
+        changes.removed = [key for key in state if key not in current_state]
+
+        return changes
+
+    def bulk_walk_if_changed(self, oids, change_oid, non_repeaters=0,
+                             max_repetitions=None, refresh=False,
+                             deadline=None, cancel=None):
+        """
+        Walks one or more OIDs like bulk_walk unless a change indicator
+        shows that they have not changed since the session last walked
+        them, in which case the cached variables are returned instead; a
+        mostly static table then costs a single GET rather than a walk.
+
+        The change indicator is retrieved along with sysUpTime.0 and the
+        cache is only used if the indicator is unchanged and the agent has
+        not restarted since (i.e. its sysUpTime did not go backwards); the
+        OIDs are always walked if the agent lacks the change indicator or
+        sysUpTime.0. The variables returned are copies, so changing them
+        doesn't change the cache.
+
+        :param oids: the OIDs to walk (see bulk_walk)
+        :param change_oid: the OID of a variable which changes whenever the
+                           walked OIDs do (e.g. 'ifTableLastChange.0' for
+                           ifTable or 'entLastChangeTime.0' for
+                           entPhysicalTable)
+        :param non_repeaters: see bulk_walk
+        :param max_repetitions: see bulk_walk
+        :param refresh: set to True to walk the OIDs regardless of the
+                        change indicator
+        :param deadline: see bulk_walk
+        :param cancel: see bulk_walk
+        :return: a list of SNMPVariable objects
+        """
+
+        if not isinstance(oids, list):
+            oids = [oids]
+
+        # Results depend on how the session formats OIDs and values
+        key = (
+            tuple(oids), change_oid, self.use_long_names, self.use_numeric,
+            self.use_sprint_value, self.use_enums
+        )
+
+        with self._operation(deadline, cancel):
+            change, uptime = self.get([change_oid, 'sysUpTime.0'])
+            indicator = (change.snmp_type, change.value)
+            uptime = parse_timeticks(uptime.value)
+
+            cached = self._walk_cache.get(key)
+            if (not refresh and cached is not None and
+                    uptime is not None and cached[0] == indicator and
+                    cached[1] <= uptime):
+                self._walk_cache[key] = (indicator, uptime, cached[2])
+                return [copy.copy(variable) for variable in cached[2]]
+
+            varlist = self.bulk_walk(
+                oids, non_repeaters=non_repeaters,
+                max_repetitions=max_repetitions
+            )
+
+        # Without an uptime, a restart of the agent can't be detected
+        if change.snmp_type in END_OF_WALK_TYPES or uptime is None:
+            self._walk_cache.pop(key, None)
+        else:
+            self._walk_cache[key] = (indicator, uptime, varlist)
+        return [copy.copy(variable) for variable in varlist]
+
+    def get_table(self, table_oid, columns=None, max_repetitions=None,
+                  index_schema=None, as_arrays=False, deadline=None,
+                  cancel=None):
+        """
+        Retrieves the rows of an SNMP table by walking its columns side by
+        side, so that each GETBULK response carries whole rows (GETNEXT is
+        used for SNMP version 1). The rows are assembled by the C interface
+        without creating an SNMPVariable for each value.
+
+        :param table_oid: the OID of the table (e.g. 'ifTable' or
+                          '.1.3.6.1.2.1.2.2')
+        :param columns: a list of the columns to retrieve, each either the
+                        name of the column (e.g. 'ifDescr') or its number
+                        within the table's entry (e.g. 2); defaults to all
+                        the accessible columns defined in the MIB, or the
+                        entire table walked column after column if the
+                        table is not in the loaded MIBs
+        :param max_repetitions: the number of rows requested per GETBULK;
+                                defaults to the largest known to fit in a
+                                response from the agent (see profile_store)
+                                or 10, and is halved whenever the agent
+                                responds tooBig
+        :param index_schema: set to True to decode each row's index into a
+                             tuple according to the INDEX clause of the
+                             table in the loaded MIBs, or to a list of index
+                             types to decode it with (see decode_index);
+                             indexes which do not match the schema are left
+                             undecoded
+        :param as_arrays: set to True to return the table column by column,
+                          with the values of integer columns packed into
+                          arrays rather than converted to strings one by one
+                          (see SNMPColumn); rows whose value does not have
+                          the type of the column's first value are left out
+        :param deadline: see bulk_walk; it bounds the retries with a smaller
+                         max_repetitions too
+        :param cancel: see bulk_walk
+        :return: a dict mapping each row's index (e.g. '1' or '1.4.10.0.0.1'
+                 or, with an index schema, a tuple such as (1, 4,
+                 '10.0.0.1')) to a dict mapping the column names (as
+                 returned by walk, e.g. 'ifDescr') to their values
+                 or, with as_arrays, a dict mapping the column names to
+                 SNMPColumn objects
+        """
+
+        table_varlist, _ = build_varlist(table_oid)
+
+        columns_varlist = None
+        if columns is not None:
+            columns_varlist = SNMPVariableList()
+            for column in columns:
+                # Columns specified by number (e.g. 2 for ifDescr)
+                if isinstance(column, int):
+                    columns_varlist.append(SNMPVariable(
+                        table_varlist[0].oid, '1.{0}'.format(column)
+                    ))
+                else:
+                    columns_varlist.append(SNMPVariable(column))
+
+        # The limit depends on the width of the rows requested
+        requested = [table_oid] + [str(column) for column in columns or []]
+        max_repetitions = self._max_repetitions(max_repetitions, requested)
+
+        with self._operation(deadline, cancel):
+            while True:
+                try:
+                    result = interface.get_table(
+                        self, table_varlist, columns_varlist,
+                        max_repetitions, self.version == 1,
+                        build_index_schema(index_schema), as_arrays
+                    )
+                except EasySNMPError:
+                    if (self.error_number != SNMP_ERR_TOOBIG or
+                            max_repetitions == 1):
+                        raise
+
+                    max_repetitions //= 2
+                    if self.profile is not None:
+                        self.profile.limit_repetitions(requested,
+                                                       max_repetitions)
+                    continue
+                break
+
+        if not as_arrays:
+            return result
+
+        columns = {}
+        for name, (snmp_type, indexes, values, typecode, _) in \
+                result.items():
+            if typecode is not None:
+                values = unpack_integers(values, typecode)
+            columns[name] = SNMPColumn(snmp_type, indexes, values)
+        return columns
+
+    def _max_repetitions(self, max_repetitions, oids):
+        """
+        Works out the max_repetitions to start a bulk operation on oids
+        with, which is limited to what is known to fit in a response from
+        the agent.
+        """
+
+        limit = None
+        if self.profile is not None:
+            limit = self.profile.max_repetitions(oids)
+
+        if not limit:
+            if max_repetitions is None:
+                return DEFAULT_MAX_REPETITIONS
+            return max_repetitions
+
+        if max_repetitions is None:
+            return limit
+        return min(max_repetitions, limit)
+
+    def _bulk_walk_subtree(self, varlist, oid, resume_from, non_repeaters,
+                           max_repetitions, results=None):
+        """
+        Walks a single subtree using GETBULK operations, appending the
+        variables retrieved to varlist; results may hold the variables of
+        the subtree already retrieved by a first GETBULK.
+
+        max_repetitions is halved each time the agent responds with a
+        tooBig error. When bulk_walk_fallback is enabled, responses which
+        indicate that the agent's GETBULK implementation is broken end the
+        walk early so that it may be completed using GETNEXT instead: a
+        tooBig error even once max_repetitions is reduced to 1, an empty
+        varbind list or non-increasing OIDs.
+
+        :return: a tuple containing a boolean indicating whether GETBULK was
+                 found broken and the last OID retrieved (or resume_from)
+        """
+
+        subtree = oid
+        root = oid_to_tuple(oid)
+        last_oid = resume_from
+        if resume_from is not None:
+            oid = resume_from
+
+        previous = oid_to_tuple(oid)
+        seen = set()
+
+        while True:
+            try:
+                if not results:
+                    results = self.get_bulk(
+                        oids=oid, non_repeaters=non_repeaters,
+                        max_repetitions=max_repetitions
+                    )
+            except EasySNMPError:
+                if self.error_number != SNMP_ERR_TOOBIG:
+                    raise
+
+                # Ask for fewer repetitions until even one is too big
+                if max_repetitions > 1:
+                    max_repetitions //= 2
+                    if self.profile is not None:
+                        self.profile.limit_repetitions(subtree,
+                                                       max_repetitions)
+                    continue
+
+                if not self.bulk_walk_fallback:
+                    raise
+                return True, last_oid
+
+            if not results:
+                return self.bulk_walk_fallback, last_oid
+
+            for result in results:
+                if result.snmp_type in END_OF_WALK_TYPES:
+                    return False, last_oid
+
+                # Stop once we leave the subtree being walked
+                current = oid_to_tuple(full_oid(result))
+                if current[:len(root)] != root:
+                    return False, last_oid
+
+                # Stop agents returning the same or earlier OIDs which would
+                # otherwise make us loop forever
+                if not oid_follows(current, previous, seen):
+                    if self.bulk_walk_fallback:
+                        return True, last_oid
+                    if self.abort_on_nonincreasing:
+                        raise EasySNMPNonIncreasingOIDError(
+                            'the agent returned a non-increasing OID '
+                            '({0})'.format(full_oid(result))
+                        )
+                    return False, last_oid
+
+                previous = current
+                last_oid = full_oid(result)
+                varlist.append(result)
+
+            oid = last_oid
+            results = None
+
+    def _walk_into(self, varlist, oid, resume_from):
+        """
+        Walks a single subtree using GETNEXT operations on behalf of
+        bulk_walk, appending the variables retrieved to varlist (including
+        those retrieved before an error occurs).
+        """
+
+        try:
+            varlist.extend(self.walk(oid, resume_from=resume_from))
+        except EasySNMPError as e:
+            varlist.extend(getattr(e, 'partial_results', []))
+            raise
+
+    def _get_chunked(self, varlist):
+        """
+        Performs an SNMP GET operation on behalf of get, splitting the
+        variables into as many requests as needed for the responses to fit
+        in a message; the number of variables per request is learned from
+        tooBig errors and kept in the agent's profile.
+        """
+
+        chunk_size = self.profile.max_varbinds() or len(varlist)
+        start = 0
+
+        while start < len(varlist):
+            chunk = SNMPVariableList(varlist[start:start + chunk_size])
+
+            started = time.time()
+            try:
+                interface.get(self, chunk)
+            except EasySNMPError:
+                if self.error_number != SNMP_ERR_TOOBIG or len(chunk) == 1:
+                    raise
+
+                chunk_size = len(chunk) // 2
+                self.profile.limit_varbinds(chunk_size)
+                continue
+            self._record_rtt(started)
+
+            start += len(chunk)
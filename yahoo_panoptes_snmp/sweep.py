@@ -0,0 +1,477 @@
+"""
+Copyright 2018, Oath Inc.
+Licensed under the terms of the BSD license. See LICENSE file in project root for terms.
+"""
+
+from __future__ import division, unicode_literals
+
+import errno
+import heapq
+import random
+import select
+import socket
+import time
+
+from .exceptions import EasySNMPConnectionError
+
+# sysUpTime.0, the variable requested from each target
+SYS_UPTIME_OID = (1, 3, 6, 1, 2, 1, 1, 3, 0)
+
+# The BER tags used by the requests and responses of a sweep
+TAG_INTEGER = 0x02
+TAG_OCTET_STRING = 0x04
+TAG_NULL = 0x05
+TAG_OBJECT_IDENTIFIER = 0x06
+TAG_SEQUENCE = 0x30
+TAG_TIMETICKS = 0x43
+TAG_GET_REQUEST = 0xa0
+TAG_RESPONSE = 0xa2
+
+# The message version field for each SNMP version
+MESSAGE_VERSIONS = {1: 0, 2: 1}
+
+# Responses are small, but leave room for agents padding them
+MAX_RESPONSE_SIZE = 65535
+
+# The number of seconds to wait before sending again when the interface's
+# queue is full (ENOBUFS), which select() doesn't tell the end of
+SEND_RETRY_DELAY = 0.01
+
+
+class SweepResult(object):
+    """
+    The outcome of probing a single target during a sweep.
+
+    :param target: the target as given to sweep()
+    :param reachable: whether the agent responded
+    :param rtt: the round trip time of the request answered in seconds, or
+                None if the agent did not respond
+    :param sys_uptime: the agent's sysUpTime in hundredths of a second, or
+                       None if the agent did not respond or return it
+    :param error: a description of why the agent is not reachable or did
+                  not return sysUpTime, or None
+    """
+
+    def __init__(self, target, reachable=False, rtt=None, sys_uptime=None,
+                 error=None):
+        self.target = target
+        self.reachable = reachable
+        self.rtt = rtt
+        self.sys_uptime = sys_uptime
+        self.error = error
+
+    def __repr__(self):
+        return (
+            '<{0} target={1} reachable={2} rtt={3} sys_uptime={4} '
+            'error={5}>'.format(
+                self.__class__.__name__, self.target, self.reachable,
+                self.rtt, self.sys_uptime, self.error
+            )
+        )
+
+
+def sweep(targets, community='public', version=2, port=161, timeout=1.0,
+          retries=1, sockets=4, max_in_flight=1000, resolver=None):
+    """
+    Checks which of many targets answer SNMP by sending each a GET of
+    sysUpTime.0, with many requests in flight at once over a handful of
+    non-blocking UDP sockets rather than a Net-SNMP session per target.
+
+    Only SNMP versions 1 and 2c are supported, as version 3 requires
+    engine discovery and per-user keys. IPv4 addresses are preferred when
+    a target's hostname resolves to several.
+
+    :param targets: a list of targets, each a hostname or IP address
+                    (optionally followed by :port), a (host, port) tuple or
+                    a (host, port, community) tuple
+    :param community: the community of the targets which do not specify one
+    :param version: the SNMP version to use; 1 or 2 (equivalent to 2c)
+    :param port: the port of the targets which do not specify one
+    :param timeout: the number of seconds to wait for each response
+    :param retries: the number of times each request is retried
+    :param sockets: the number of UDP sockets to spread the requests over
+    :param max_in_flight: the number of requests which may await a
+                          response at the same time
+    :param resolver: a Resolver to resolve the hostnames of the targets
+                     through, concurrently and using its cached addresses
+    :return: a list of SweepResult objects in the order of targets
+    """
+
+    if version not in MESSAGE_VERSIONS:
+        raise ValueError('sweeps only support SNMP versions 1 and 2c')
+
+    results = []
+    parsed = []
+    for target in targets:
+        result = SweepResult(target)
+        results.append(result)
+
+        try:
+            parsed.append((result, _parse_target(target, port, community)))
+        except ValueError as e:
+            result.error = 'unable to resolve the target ({0})'.format(e)
+
+    if resolver is not None:
+        resolver.resolve_many([host for _, (host, _, _) in parsed])
+
+    probes = []
+    for result, (host, target_port, target_community) in parsed:
+        try:
+            if resolver is not None:
+                host = resolver.resolve(host)
+            address = _resolve(host, target_port)
+        except (EasySNMPConnectionError, socket.error) as e:
+            result.error = 'unable to resolve the target ({0})'.format(e)
+            continue
+
+        probes.append(_Probe(result, address, target_community))
+
+    if probes:
+        _Sweep(probes, version, timeout, retries, sockets,
+               max_in_flight).run()
+
+    return results
+
+
+class _Probe(object):
+    """
+    The state of the request sent to a single target.
+    """
+
+    def __init__(self, result, address, community):
+        self.result = result
+        self.address = address
+        self.community = community
+        self.attempts = 0
+        self.request_id = None
+        self.sent = None
+
+
+class _Sweep(object):
+    """
+    Sends the requests of a sweep and matches the responses to them.
+    """
+
+    def __init__(self, probes, version, timeout, retries, sockets,
+                 max_in_flight):
+        self.version = version
+        self.timeout = timeout
+        self.retries = retries
+        self.max_in_flight = max_in_flight
+
+        self.waiting = list(reversed(probes))
+        self.in_flight = {}
+        self.deadlines = []
+        self.request_id = random.randint(1, 2 ** 30)
+
+        families = set(probe.address[0] for probe in probes)
+        self.sockets = dict(
+            (family, [_open_socket(family) for _ in range(sockets)])
+            for family in families
+        )
+        self.next_socket = 0
+
+    def run(self):
+        try:
+            while self.waiting or self.in_flight:
+                blocked, error = self._send()
+
+                # Wait for a response or a request to time out and, when
+                # sending was blocked, for the socket buffers to drain
+                now = time.time()
+                wait = self.deadlines[0][0] - now if self.deadlines else None
+                writable = []
+                if error == errno.ENOBUFS:
+                    if wait is None or wait > SEND_RETRY_DELAY:
+                        wait = SEND_RETRY_DELAY
+                elif blocked is not None:
+                    writable = [blocked]
+                elif wait is None:
+                    wait = 0
+                readable, _, _ = select.select(
+                    [s for group in self.sockets.values() for s in group],
+                    writable, [], None if wait is None else max(wait, 0)
+                )
+                for sock in readable:
+                    self._receive(sock)
+
+                self._expire(time.time())
+        finally:
+            for group in self.sockets.values():
+                for sock in group:
+                    sock.close()
+
+    def _send(self):
+        """
+        Sends the requests waiting, up to max_in_flight requests in flight.
+
+        :return: a tuple containing the socket which could not send a
+                 request as its buffers are full and the errno it failed
+                 with, or a tuple of Nones
+        """
+
+        while self.waiting and len(self.in_flight) < self.max_in_flight:
+            probe = self.waiting[-1]
+            family, address = probe.address
+
+            self.request_id = self.request_id % (2 ** 31 - 1) + 1
+            message = _encode_get(self.version, probe.community,
+                                  self.request_id)
+
+            group = self.sockets[family]
+            sock = group[self.next_socket % len(group)]
+            self.next_socket += 1
+
+            try:
+                sock.sendto(message, address)
+            except socket.error as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK, errno.ENOBUFS):
+                    # Let the socket buffers drain
+                    return sock, e.errno
+                self.waiting.pop()
+                probe.result.error = 'unable to send the request ({0})'.format(
+                    e
+                )
+                continue
+
+            self.waiting.pop()
+            probe.attempts += 1
+            probe.request_id = self.request_id
+            probe.sent = time.time()
+            self.in_flight[probe.request_id] = probe
+            heapq.heappush(self.deadlines,
+                           (probe.sent + self.timeout, probe.request_id))
+
+        return None, None
+
+    def _receive(self, sock):
+        while True:
+            try:
+                data, address = sock.recvfrom(MAX_RESPONSE_SIZE)
+            except socket.error as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return
+                # e.g. ICMP errors reported on some platforms
+                continue
+
+            received = time.time()
+            try:
+                request_id, error_status, value_tag, value = \
+                    _decode_response(data)
+            except ValueError:
+                continue
+
+            probe = self.in_flight.get(request_id)
+            if probe is None or probe.address[1][:2] != address[:2]:
+                continue
+            del self.in_flight[request_id]
+
+            result = probe.result
+            result.reachable = True
+            result.rtt = received - probe.sent
+            if error_status:
+                result.error = 'the agent returned error status {0}'.format(
+                    error_status
+                )
+            elif value_tag != TAG_TIMETICKS:
+                result.error = 'the agent did not return sysUpTime'
+            else:
+                result.sys_uptime = value
+
+    def _expire(self, now):
+        while self.deadlines and self.deadlines[0][0] <= now:
+            _, request_id = heapq.heappop(self.deadlines)
+            probe = self.in_flight.pop(request_id, None)
+            if probe is None:
+                continue
+
+            if probe.attempts <= self.retries:
+                self.waiting.append(probe)
+            else:
+                probe.result.error = 'timed out'
+
+
+def _parse_target(target, port, community):
+    if isinstance(target, tuple):
+        if len(target) == 3:
+            return target
+        return target[0], target[1], community
+
+    # IPv6 addresses may only specify a port within brackets
+    if target.startswith('['):
+        host, _, rest = target[1:].partition(']')
+        if rest.startswith(':'):
+            port = int(rest[1:])
+        return host, port, community
+
+    if target.count(':') == 1:
+        host, target_port = target.split(':')
+        return host, int(target_port), community
+
+    return target, port, community
+
+
+def _resolve(host, port):
+    addresses = socket.getaddrinfo(host, port, 0, socket.SOCK_DGRAM)
+    for family, _, _, _, address in addresses:
+        if family == socket.AF_INET:
+            return family, address
+    family, _, _, _, address = addresses[0]
+    return family, address
+
+
+def _open_socket(family):
+    sock = socket.socket(family, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    return sock
+
+
+def _encode_length(length):
+    if length < 0x80:
+        return bytearray([length])
+
+    encoded = bytearray()
+    while length:
+        encoded.insert(0, length & 0xff)
+        length >>= 8
+    return bytearray([0x80 | len(encoded)]) + encoded
+
+
+def _encode_tlv(tag, value):
+    return bytearray([tag]) + _encode_length(len(value)) + value
+
+
+def _encode_integer(value):
+    encoded = bytearray()
+    while True:
+        encoded.insert(0, value & 0xff)
+        value >>= 8
+        if value == 0 and not encoded[0] & 0x80:
+            break
+    return _encode_tlv(TAG_INTEGER, encoded)
+
+
+def _encode_oid(oid):
+    encoded = bytearray([oid[0] * 40 + oid[1]])
+    for sub_id in oid[2:]:
+        parts = bytearray([sub_id & 0x7f])
+        sub_id >>= 7
+        while sub_id:
+            parts.insert(0, 0x80 | (sub_id & 0x7f))
+            sub_id >>= 7
+        encoded += parts
+    return _encode_tlv(TAG_OBJECT_IDENTIFIER, encoded)
+
+
+def _encode_get(version, community, request_id):
+    """
+    Encodes an SNMP version 1 or 2c GetRequest message for sysUpTime.0.
+    """
+
+    if not isinstance(community, bytes):
+        community = community.encode('latin-1')
+
+    varbind = _encode_tlv(
+        TAG_SEQUENCE, _encode_oid(SYS_UPTIME_OID) + bytearray([TAG_NULL, 0])
+    )
+    pdu = _encode_tlv(
+        TAG_GET_REQUEST,
+        _encode_integer(request_id) + _encode_integer(0) +
+        _encode_integer(0) + _encode_tlv(TAG_SEQUENCE, varbind)
+    )
+    message = _encode_tlv(
+        TAG_SEQUENCE,
+        _encode_integer(MESSAGE_VERSIONS[version]) +
+        _encode_tlv(TAG_OCTET_STRING, bytearray(community)) + pdu
+    )
+    return bytes(message)
+
+
+def _decode_tlv(data, offset):
+    """
+    Decodes the tag and length at an offset of a message.
+
+    :return: a tuple containing the tag, the offset of the value and the
+             offset following it
+    """
+
+    if offset + 2 > len(data):
+        raise ValueError('truncated message')
+
+    tag = data[offset]
+    length = data[offset + 1]
+    offset += 2
+
+    if length & 0x80:
+        size = length & 0x7f
+        if not size or size > 4 or offset + size > len(data):
+            raise ValueError('invalid length')
+        length = 0
+        for byte in data[offset:offset + size]:
+            length = (length << 8) | byte
+        offset += size
+
+    if offset + length > len(data):
+        raise ValueError('truncated message')
+    return tag, offset, offset + length
+
+
+def _decode_integer(data, start, end):
+    if start == end:
+        raise ValueError('empty integer')
+
+    value = 0
+    for byte in data[start:end]:
+        value = (value << 8) | byte
+    if data[start] & 0x80:
+        value -= 1 << (8 * (end - start))
+    return value
+
+
+def _decode_response(data):
+    """
+    Decodes a Response message to a sweep's GetRequest.
+
+    :return: a tuple containing the request ID, the error status and the
+             tag and value (an integer for integer types, None otherwise)
+             of the first variable
+    """
+
+    data = bytearray(data)
+
+    tag, offset, _ = _decode_tlv(data, 0)
+    if tag != TAG_SEQUENCE:
+        raise ValueError('not an SNMP message')
+
+    # Skip the version and community
+    for expected in (TAG_INTEGER, TAG_OCTET_STRING):
+        tag, _, offset = _decode_tlv(data, offset)
+        if tag != expected:
+            raise ValueError('not an SNMP message')
+
+    tag, offset, _ = _decode_tlv(data, offset)
+    if tag != TAG_RESPONSE:
+        raise ValueError('not a response')
+
+    fields = []
+    for _ in range(3):
+        tag, start, offset = _decode_tlv(data, offset)
+        if tag != TAG_INTEGER:
+            raise ValueError('invalid response')
+        fields.append(_decode_integer(data, start, offset))
+    request_id, error_status, _ = fields
+
+    value_tag = value = None
+    tag, offset, _ = _decode_tlv(data, offset)
+    if tag == TAG_SEQUENCE and offset < len(data):
+        tag, offset, _ = _decode_tlv(data, offset)
+        if tag == TAG_SEQUENCE:
+            # Skip the OID
+            _, _, offset = _decode_tlv(data, offset)
+            value_tag, start, end = _decode_tlv(data, offset)
+            if value_tag in (TAG_INTEGER, TAG_TIMETICKS):
+                value = _decode_integer(data, start, end)
+                if value_tag == TAG_TIMETICKS and value < 0:
+                    value += 1 << (8 * (end - start))
+
+    return request_id, error_status, value_tag, value
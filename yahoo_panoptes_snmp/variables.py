@@ -44,6 +44,69 @@ class SNMPVariable(object):
         self.__dict__[name] = tostr(value)
 
 
+class SNMPColumn(object):
+    """
+    A column of an SNMP table retrieved with get_table(as_arrays=True),
+    holding the index and value of each row in two parallel sequences.
+
+    :param snmp_type: the snmp_type of the column's values
+    :param indexes: a list of the index of each row
+    :param values: the value of each row; integer columns (INTEGER,
+                   COUNTER, GAUGE, TICKS and COUNTER64) are a NumPy array
+                   if NumPy is installed or an array.array of 64 bit
+                   integers otherwise, other columns are a list of strings
+    """
+
+    def __init__(self, snmp_type=None, indexes=None, values=None):
+        self.snmp_type = snmp_type
+        self.indexes = indexes if indexes is not None else []
+        self.values = values if values is not None else []
+
+    def __repr__(self):
+        return '<{0} snmp_type={1} rows={2}>'.format(
+            self.__class__.__name__, urepr(self.snmp_type), len(self)
+        )
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def __iter__(self):
+        return iter(zip(self.indexes, self.values))
+
+
+class SNMPChanges(object):
+    """
+    The variables of a walk which changed since a previous walk, as
+    returned by Session.bulk_walk_changes.
+
+    :param added: a list of the SNMPVariable objects which were not
+                  retrieved by the previous walk
+    :param changed: a list of the SNMPVariable objects whose type or value
+                    changed since the previous walk
+    :param removed: a list of the numeric OIDs (e.g. '.1.3.6.1.2.1.2.2.1.2.3')
+                    which were retrieved by the previous walk but are now
+                    gone
+    :param state: the compact state of the walk to pass to the next one
+    """
+
+    def __init__(self, added=None, changed=None, removed=None, state=None):
+        self.added = added if added is not None else []
+        self.changed = changed if changed is not None else []
+        self.removed = removed if removed is not None else []
+        self.state = state if state is not None else {}
+
+    def __repr__(self):
+        return '<{0} added={1} changed={2} removed={3}>'.format(
+            self.__class__.__name__, len(self.added), len(self.changed),
+            len(self.removed)
+        )
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+    __nonzero__ = __bool__
+
+
 class SNMPVariableList(list):
     """
     An slight variation of a list which is used internally by the